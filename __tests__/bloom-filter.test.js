@@ -0,0 +1,62 @@
+const { BloomFilter, RotatingBloomFilter } = require('../bloom-filter');
+
+describe('BloomFilter', () => {
+    test('never forgets a key it was given', () => {
+        const filter = BloomFilter.forCapacity(10000);
+        for (let i = 0; i < 10000; i++) filter.add(`BRIC-24|sensor-${i}`);
+        for (let i = 0; i < 10000; i++) {
+            expect(filter.mightContain(`BRIC-24|sensor-${i}`)).toBe(true);
+        }
+    });
+
+    test('stays near its false positive rate at capacity', () => {
+        const filter = BloomFilter.forCapacity(10000, 0.01);
+        for (let i = 0; i < 10000; i++) filter.add(`seen-${i}`);
+
+        let falsePositives = 0;
+        for (let i = 0; i < 10000; i++) {
+            if (filter.mightContain(`unseen-${i}`)) falsePositives++;
+        }
+        expect(falsePositives / 10000).toBeLessThan(0.02);
+        expect(filter.falsePositiveRate).toBeCloseTo(0.01, 2);
+    });
+
+    test('clear() empties the filter', () => {
+        const filter = BloomFilter.forCapacity(100);
+        filter.add('key');
+        filter.clear();
+        expect(filter.mightContain('key')).toBe(false);
+        expect(filter.count).toBe(0);
+    });
+});
+
+describe('RotatingBloomFilter', () => {
+    const window = 1000;
+
+    test('remembers keys for at least one window and forgets them after two', () => {
+        const filter = new RotatingBloomFilter(100, window, 0.01, 0);
+        filter.add('key', 100);
+
+        expect(filter.mightContain('key', 900)).toBe(true);
+        expect(filter.mightContain('key', 1500)).toBe(true);
+        expect(filter.mightContain('key', 2600)).toBe(false);
+    });
+
+    test('drops both generations after a long gap', () => {
+        const filter = new RotatingBloomFilter(100, window, 0.01, 0);
+        filter.add('key', 100);
+        expect(filter.mightContain('key', 5000)).toBe(false);
+        expect(filter.count).toBe(0);
+    });
+
+    test('reports the combined false positive rate', () => {
+        const filter = new RotatingBloomFilter(1000, window, 0.01, 0);
+        for (let i = 0; i < 1000; i++) filter.add(`old-${i}`, 10);
+        for (let i = 0; i < 1000; i++) filter.add(`new-${i}`, 1010);
+
+        const { falsePositiveRate, keys, rotations } = filter.stats();
+        expect(keys).toBe(2000);
+        expect(rotations).toBe(1);
+        expect(falsePositiveRate).toBeCloseTo(1 - 0.99 * 0.99, 2);
+    });
+});
@@ -0,0 +1,75 @@
+const { Readable } = require('stream');
+const { detectFormat, importStream } = require('../data-import');
+
+// Accepts every record except nulls (unparseable lines) and ones without an
+// experimentId, as DataProcessor.ingestBatch reports them
+function ingestInto(received) {
+    return batch => {
+        received.push(batch);
+        return Promise.resolve(batch.map(record => (record && record.experimentId
+            ? { status: 'created' }
+            : { status: 'invalid', error: 'experimentId is required' })));
+    };
+}
+
+describe('detectFormat', () => {
+    test('recognises CSV and NDJSON by extension or type', () => {
+        expect(detectFormat({ originalname: 'readings.CSV' })).toBe('csv');
+        expect(detectFormat({ originalname: 'upload', mimetype: 'text/csv' })).toBe('csv');
+        expect(detectFormat({ originalname: 'readings.jsonl' })).toBe('ndjson');
+        expect(detectFormat({ originalname: 'upload', mimetype: 'application/x-ndjson' })).toBe('ndjson');
+        expect(detectFormat({ originalname: 'readings.xlsx', mimetype: 'application/octet-stream' })).toBeNull();
+    });
+});
+
+describe('importStream', () => {
+    test('streams NDJSON in batches and reports unreadable lines', async () => {
+        const lines = [
+            '{"experimentId":"BRIC-24","measurementType":"temperature","value":22}',
+            '',
+            '{"experimentId":"BRIC-24","measurementType":"temperature","value":23}',
+            '{not json',
+            '{"measurementType":"temperature","value":24}'
+        ];
+        const received = [];
+        const progress = [];
+
+        const summary = await importStream(Readable.from([lines.join('\n')]), 'ndjson', {
+            ingest: ingestInto(received),
+            batchSize: 2,
+            onProgress: ({ rows }) => progress.push(rows)
+        });
+
+        expect(received.map(batch => batch.length)).toEqual([2, 2]);
+        expect(received[1][0]).toBeNull();
+        expect(progress).toEqual([2, 4]);
+        expect(summary).toMatchObject({ rows: 4, created: 2, invalid: 2 });
+        expect(summary.errors.map(({ row }) => row)).toEqual([3, 4]);
+        expect(summary.bytes).toBe(Buffer.byteLength(lines.join('\n')));
+    });
+
+    test('converts CSV cells', async () => {
+        const csv = 'experimentId, measurementType ,value,unit\nBRIC-24,temperature,22.5,°C\nBRIC-24,note,warm,\n';
+        const received = [];
+
+        const summary = await importStream(Readable.from([csv]), 'csv', { ingest: ingestInto(received) });
+
+        expect(received).toEqual([[
+            { experimentId: 'BRIC-24', measurementType: 'temperature', value: 22.5, unit: '°C' },
+            { experimentId: 'BRIC-24', measurementType: 'note', value: 'warm' }
+        ]]);
+        expect(summary).toMatchObject({ rows: 2, created: 2 });
+    });
+
+    test('attaches the summary so far when ingest fails', async () => {
+        const input = Readable.from(['{"experimentId":"BRIC-24"}\n{"experimentId":"RR-1"}\n']);
+        let calls = 0;
+        const ingest = batch => (++calls === 1
+            ? Promise.resolve(batch.map(() => ({ status: 'created' })))
+            : Promise.reject(new Error('MongoDB is down')));
+
+        const error = await importStream(input, 'ndjson', { ingest, batchSize: 1 }).catch(e => e);
+        expect(error.message).toBe('MongoDB is down');
+        expect(error.summary).toMatchObject({ rows: 1, created: 1 });
+    });
+});
@@ -0,0 +1,117 @@
+const { DataQualityAggregator, EXACT_TIMESTAMP_LIMIT } = require('../data-quality');
+
+const start = Date.UTC(2024, 0, 1);
+
+// count points, one per second, with `duplicates` of them repeating the
+// previous timestamp
+function points(count, duplicates = 0, offset = 0) {
+    return Array.from({ length: count }, (_, i) => {
+        const second = i < duplicates ? 0 : i - duplicates;
+        return {
+            experimentId: 'BRIC-24',
+            value: i % 50,
+            timestamp: new Date(start + (offset + second) * 1000)
+        };
+    });
+}
+
+describe('DataQualityAggregator', () => {
+    test('counts a handful of duplicate timestamps exactly in small sets', () => {
+        const aggregator = DataQualityAggregator.fromPoints(points(300, 3));
+        expect(aggregator.summary().duplicateTimestamps).toBe(3);
+        expect(aggregator.summary().issues).toContain('Duplicate timestamps detected');
+        expect(DataQualityAggregator.fromPoints(points(300)).summary().duplicateTimestamps).toBe(0);
+    });
+
+    test('switches to the sketch past the exact limit', () => {
+        const aggregator = DataQualityAggregator.fromPoints(points(EXACT_TIMESTAMP_LIMIT + 1));
+        expect(aggregator.timestamps).toBeNull();
+        // Sketch noise on all-distinct timestamps is not reported
+        expect(aggregator.estimateDuplicateTimestamps()).toBe(0);
+
+        const distinct = aggregator.estimateDistinctTimestamps();
+        expect(Math.abs(distinct - (EXACT_TIMESTAMP_LIMIT + 1)) / distinct).toBeLessThan(0.05);
+    });
+
+    test('reports heavy duplication beyond the limit from the sketch', () => {
+        const repeated = points(EXACT_TIMESTAMP_LIMIT).concat(points(EXACT_TIMESTAMP_LIMIT));
+        const aggregator = DataQualityAggregator.fromPoints(repeated);
+        expect(aggregator.timestamps).toBeNull();
+        const duplicates = aggregator.estimateDuplicateTimestamps();
+        expect(Math.abs(duplicates - EXACT_TIMESTAMP_LIMIT) / EXACT_TIMESTAMP_LIMIT).toBeLessThan(0.1);
+    });
+
+    test('merges counts, extremes and timestamp sets', () => {
+        const merged = DataQualityAggregator.fromPoints(points(100))
+            .merge(DataQualityAggregator.fromPoints(points(100, 0, 90)));
+
+        const summary = merged.summary();
+        expect(summary.totalPoints).toBe(200);
+        expect(summary.duplicateTimestamps).toBe(10);
+        expect(summary.variation).toMatchObject({ min: 0, max: 49 });
+    });
+
+    test('drops the exact set when a merge passes the limit', () => {
+        const half = Math.ceil(EXACT_TIMESTAMP_LIMIT / 2) + 1;
+        const merged = DataQualityAggregator.fromPoints(points(half))
+            .merge(DataQualityAggregator.fromPoints(points(half, 0, half)));
+        expect(merged.timestamps).toBeNull();
+    });
+
+    test('rebuilds exact counts from a stored document', () => {
+        const doc = {
+            count: 4,
+            timestamped: 4,
+            distinctTimestamps: [new Date(start), new Date(start + 1000), new Date(start + 2000)]
+        };
+        expect(DataQualityAggregator.fromDocument(doc).estimateDuplicateTimestamps()).toBe(1);
+
+        // Written before distinctTimestamps existed: only the sketch is known
+        expect(DataQualityAggregator.fromDocument({ count: 4, timestamped: 4 }).timestamps).toBeNull();
+    });
+
+    describe('toUpdate', () => {
+        test('is a single $set pipeline stage adding to the stored counters', () => {
+            const update = DataQualityAggregator.fromPoints(points(10, 2)).toUpdate();
+
+            expect(update).toHaveLength(1);
+            const set = update[0].$set;
+            expect(set.count).toEqual({ $add: [{ $ifNull: ['$count', 0] }, 10] });
+            expect(set.timestamped).toEqual({ $add: [{ $ifNull: ['$timestamped', 0] }, 10] });
+            expect(set.min).toEqual({ $min: ['$min', 0] });
+            expect(set.max).toEqual({ $max: ['$max', 9] });
+            expect(set.lastUpdated).toBeInstanceOf(Date);
+
+            const registers = Object.keys(set).filter(field => field.startsWith('hll.'));
+            expect(registers.length).toBeGreaterThan(0);
+            for (const field of registers) {
+                expect(set[field].$max[0]).toBe(`$${field}`);
+            }
+        });
+
+        test('extends the stored timestamp set only while it is complete and under the limit', () => {
+            const set = DataQualityAggregator.fromPoints(points(10, 2)).toUpdate()[0].$set;
+            const [condition, whenKept, whenDropped] = set.distinctTimestamps.$cond;
+
+            expect(condition.$and[0]).toEqual({ $lte: [set.timestamped, EXACT_TIMESTAMP_LIMIT] });
+            expect(condition.$and[1].$or).toEqual([
+                { $isArray: '$distinctTimestamps' },
+                { $eq: [{ $ifNull: ['$timestamped', 0] }, 0] }
+            ]);
+            expect(whenKept.$setUnion[0]).toEqual({ $ifNull: ['$distinctTimestamps', []] });
+            expect(whenKept.$setUnion[1]).toHaveLength(8);
+            expect(whenDropped).toBe('$$REMOVE');
+        });
+
+        test('removes the stored set once the batch alone passes the limit', () => {
+            const set = DataQualityAggregator.fromPoints(points(EXACT_TIMESTAMP_LIMIT + 1)).toUpdate()[0].$set;
+            expect(set.distinctTimestamps).toBe('$$REMOVE');
+        });
+
+        test('leaves min and max alone without numeric values', () => {
+            const set = DataQualityAggregator.fromPoints([{ value: 'n/a', timestamp: new Date(start) }]).toUpdate()[0].$set;
+            expect(set.min).toBeUndefined();
+            expect(set.max).toBeUndefined();
+        });
+    });
+});
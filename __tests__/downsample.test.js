@@ -0,0 +1,52 @@
+const { lttb, rollupResolution } = require('../downsample');
+
+function series(length, f = x => Math.sin(x / 5)) {
+    return Array.from({ length }, (_, x) => ({ x, y: f(x) }));
+}
+
+describe('lttb', () => {
+    test('returns short series unchanged', () => {
+        const points = series(10);
+        expect(lttb(points, 10)).toBe(points);
+        expect(lttb(points, 50)).toBe(points);
+    });
+
+    test('handles thresholds below three', () => {
+        const points = series(10);
+        expect(lttb(points, 2)).toEqual(points.slice(0, 2));
+        expect(lttb(points, 0)).toEqual([]);
+        expect(lttb(points, -1)).toEqual([]);
+    });
+
+    test('keeps both endpoints and returns exactly threshold points in order', () => {
+        const points = series(1000);
+        const sampled = lttb(points, 100);
+
+        expect(sampled).toHaveLength(100);
+        expect(sampled[0]).toBe(points[0]);
+        expect(sampled[sampled.length - 1]).toBe(points[points.length - 1]);
+        for (let i = 1; i < sampled.length; i++) {
+            expect(sampled[i].x).toBeGreaterThan(sampled[i - 1].x);
+        }
+    });
+
+    test('keeps an isolated spike', () => {
+        const points = series(1000, x => (x === 503 ? 100 : 0));
+        expect(lttb(points, 20).some(point => point.x === 503)).toBe(true);
+    });
+});
+
+describe('rollupResolution', () => {
+    const day = 24 * 60 * 60 * 1000;
+    const range = span => ({ from: new Date(0), to: new Date(span) });
+
+    test('uses raw readings when buckets are narrower than a minute', () => {
+        expect(rollupResolution(range(60 * 60 * 1000), 2000)).toBeNull();
+    });
+
+    test('picks the coarsest resolution no wider than a bucket', () => {
+        expect(rollupResolution(range(30 * day), 2000).name).toBe('minute');
+        expect(rollupResolution(range(365 * day), 2000).name).toBe('hour');
+        expect(rollupResolution(range(20 * 365 * day), 2000).name).toBe('day');
+    });
+});
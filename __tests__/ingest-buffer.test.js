@@ -0,0 +1,149 @@
+const fs = require('fs');
+const os = require('os');
+const path = require('path');
+const { BufferFullError, DeriveQueue, IngestBuffer } = require('../ingest-buffer');
+
+function storeAll(points) {
+    return Promise.resolve({
+        results: points.map(() => ({ status: 'created' })),
+        inserted: points
+    });
+}
+
+function segments(dir) {
+    return fs.readdirSync(dir).filter(name => name.endsWith('.ndjson'));
+}
+
+describe('IngestBuffer', () => {
+    let dir;
+    let buffer;
+
+    beforeEach(() => {
+        dir = fs.mkdtempSync(path.join(os.tmpdir(), 'ingest-wal-'));
+        jest.spyOn(console, 'log').mockImplementation(() => {});
+        jest.spyOn(console, 'error').mockImplementation(() => {});
+    });
+
+    afterEach(async () => {
+        if (buffer) await buffer.close();
+        buffer = null;
+        fs.rmSync(dir, { recursive: true, force: true });
+        jest.restoreAllMocks();
+    });
+
+    test('replays segments left by a crash, skipping a torn last line', async () => {
+        fs.writeFileSync(
+            path.join(dir, 'segment-1700000000000-0.ndjson'),
+            '{"experimentId":"BRIC-24","value":1}\n{"experimentId":"BRIC-24","value":2}\n{"experimentId":"BRI'
+        );
+        fs.writeFileSync(
+            path.join(dir, 'segment-1700000000000-1.ndjson'),
+            '{"experimentId":"RR-1","value":3}\n'
+        );
+        const store = jest.fn(storeAll);
+
+        buffer = new IngestBuffer(store, { dir, flushIntervalMs: 60000 });
+        await buffer.open();
+        await buffer.flush();
+
+        expect(store).toHaveBeenCalledTimes(1);
+        expect(store.mock.calls[0][0]).toEqual([
+            { experimentId: 'BRIC-24', value: 1 },
+            { experimentId: 'BRIC-24', value: 2 },
+            { experimentId: 'RR-1', value: 3 }
+        ]);
+        expect(segments(dir)).toHaveLength(1); // only the new, empty segment
+        expect(buffer.stats().flushedPoints).toBe(3);
+    });
+
+    test('acknowledged points survive until they are stored', async () => {
+        buffer = new IngestBuffer(() => Promise.reject(new Error('MongoDB is down')), { dir, flushIntervalMs: 60000 });
+        await buffer.open();
+        await buffer.enqueue({ experimentId: 'BRIC-24', value: 1 });
+        await buffer.enqueue({ experimentId: 'BRIC-24', value: 2 });
+        await buffer.close();
+        buffer = null;
+
+        const store = jest.fn(storeAll);
+        buffer = new IngestBuffer(store, { dir, flushIntervalMs: 60000 });
+        await buffer.open();
+        await buffer.flush({ force: true });
+
+        expect(store.mock.calls[0][0]).toEqual([
+            { experimentId: 'BRIC-24', value: 1 },
+            { experimentId: 'BRIC-24', value: 2 }
+        ]);
+    });
+
+    test('retries a failed derive step without storing the batch again', async () => {
+        const store = jest.fn(storeAll);
+        const derive = jest.fn()
+            .mockRejectedValueOnce(new Error('rollup update failed'))
+            .mockResolvedValue();
+
+        buffer = new IngestBuffer(store, { dir, derive, flushIntervalMs: 10000 });
+        await buffer.open();
+        await buffer.enqueue({ experimentId: 'BRIC-24', value: 1 });
+        await buffer.flush();
+        expect(buffer.stats().underivedPoints).toBe(1);
+        expect(buffer.stats().retryDelayMs).toBe(10000);
+
+        await buffer.flush({ force: true });
+        expect(store).toHaveBeenCalledTimes(1);
+        expect(derive).toHaveBeenCalledTimes(2);
+        expect(derive.mock.calls[1][0]).toEqual([{ experimentId: 'BRIC-24', value: 1 }]);
+        expect(buffer.stats().underivedPoints).toBe(0);
+        expect(buffer.stats().retryDelayMs).toBe(0);
+    });
+
+    test('rejects points beyond maxPending', async () => {
+        buffer = new IngestBuffer(storeAll, { dir, maxPending: 2, flushIntervalMs: 60000 });
+        await buffer.open();
+        await buffer.enqueue({ value: 1 });
+        await buffer.enqueue({ value: 2 });
+
+        await expect(buffer.enqueue({ value: 3 })).rejects.toThrow(BufferFullError);
+        expect(buffer.stats().rejected).toBe(1);
+    });
+});
+
+describe('DeriveQueue', () => {
+    beforeEach(() => {
+        jest.spyOn(console, 'error').mockImplementation(() => {});
+    });
+
+    afterEach(() => {
+        jest.restoreAllMocks();
+    });
+
+    test('retries failed derive steps until they succeed', async () => {
+        const derive = jest.fn()
+            .mockRejectedValueOnce(new Error('rollup update failed'))
+            .mockResolvedValue();
+        const queue = new DeriveQueue(derive, { initialDelayMs: 10000 });
+
+        queue.push([{ value: 1 }]);
+        queue.push([{ value: 2 }]);
+        expect(queue.stats().retryDelayMs).toBe(10000);
+
+        await queue.retry();
+        expect(queue.stats()).toMatchObject({ pending: 2, failures: 1 });
+
+        await queue.retry();
+        expect(derive).toHaveBeenCalledTimes(2);
+        expect(derive.mock.calls[1][0]).toEqual([{ value: 1 }, { value: 2 }]);
+        expect(queue.stats()).toMatchObject({ pending: 0, derivedPoints: 2, retryDelayMs: 0 });
+        await queue.close();
+    });
+
+    test('drops the oldest points beyond maxPending', async () => {
+        const derive = jest.fn().mockResolvedValue();
+        const queue = new DeriveQueue(derive, { initialDelayMs: 60000, maxPending: 2 });
+
+        queue.push([{ value: 1 }, { value: 2 }, { value: 3 }]);
+        await queue.close();
+
+        expect(derive.mock.calls[0][0]).toEqual([{ value: 2 }, { value: 3 }]);
+        expect(queue.stats().droppedPoints).toBe(1);
+    });
+});
@@ -0,0 +1,87 @@
+const mongoose = require('mongoose');
+const {
+    InvalidCursorError,
+    pageSize,
+    encodeCursor,
+    decodeCursor,
+    keysetFilter
+} = require('../pagination');
+
+const id = new mongoose.Types.ObjectId();
+
+describe('pageSize', () => {
+    test('falls back on missing or invalid values', () => {
+        expect(pageSize(undefined)).toBe(20);
+        expect(pageSize('abc', 50)).toBe(50);
+        expect(pageSize('0', 50)).toBe(50);
+        expect(pageSize('-3', 50)).toBe(50);
+    });
+
+    test('caps at the maximum', () => {
+        expect(pageSize('30')).toBe(30);
+        expect(pageSize('1000')).toBe(100);
+        expect(pageSize('1000', 20, 5000)).toBe(1000);
+    });
+});
+
+describe('cursor encoding', () => {
+    test('round-trips dates, numbers and strings', () => {
+        const date = new Date('2024-05-01T12:00:00.000Z');
+        for (const value of [date, 87.5, 'ISS']) {
+            const decoded = decodeCursor(encodeCursor({ _id: id, field: value }, 'field'));
+            expect(decoded.value).toEqual(value);
+            expect(decoded.id.equals(id)).toBe(true);
+        }
+    });
+
+    test('keeps a missing sort key as null', () => {
+        const decoded = decodeCursor(encodeCursor({ _id: id, relevance: null }, 'relevance'));
+        expect(decoded.value).toBeNull();
+        expect(decodeCursor(encodeCursor({ _id: id }, 'relevance')).value).toBeNull();
+    });
+
+    test('rejects malformed cursors', () => {
+        expect(() => decodeCursor('not a cursor')).toThrow(InvalidCursorError);
+        const badId = Buffer.from(JSON.stringify([1, 'nope'])).toString('base64url');
+        expect(() => decodeCursor(badId)).toThrow(InvalidCursorError);
+    });
+});
+
+describe('keysetFilter', () => {
+    test('is empty without a cursor', () => {
+        expect(keysetFilter('timestamp', -1, undefined)).toEqual({});
+    });
+
+    test('continues after the cursor and includes missing keys when descending', () => {
+        const value = new Date('2024-05-01T00:00:00.000Z');
+        const cursor = encodeCursor({ _id: id, timestamp: value }, 'timestamp');
+        expect(keysetFilter('timestamp', -1, cursor)).toEqual({
+            $or: [
+                { timestamp: { $lt: value } },
+                { timestamp: value, _id: { $lt: id } },
+                { timestamp: null }
+            ]
+        });
+    });
+
+    test('does not include missing keys when ascending', () => {
+        const cursor = encodeCursor({ _id: id, relevance: 40 }, 'relevance');
+        expect(keysetFilter('relevance', 1, cursor)).toEqual({
+            $or: [
+                { relevance: { $gt: 40 } },
+                { relevance: 40, _id: { $gt: id } }
+            ]
+        });
+    });
+
+    test('moves by _id alone among missing keys', () => {
+        const cursor = encodeCursor({ _id: id, relevance: null }, 'relevance');
+        expect(keysetFilter('relevance', -1, cursor)).toEqual({ relevance: null, _id: { $lt: id } });
+        expect(keysetFilter('relevance', 1, cursor)).toEqual({
+            $or: [
+                { relevance: null, _id: { $gt: id } },
+                { relevance: { $ne: null } }
+            ]
+        });
+    });
+});
@@ -0,0 +1,36 @@
+const { PrefixIndex } = require('../prefix-index');
+
+function index(topN) {
+    const prefixIndex = new PrefixIndex({ topN });
+    for (let i = 0; i < 30; i++) {
+        prefixIndex.add({ key: `bone-${i}`, type: 'experiment', text: `Bone density study ${i}`, ref: i, popularity: i });
+    }
+    prefixIndex.add({ key: 'rare', type: 'experiment', text: 'Bone marrow in mice', ref: 'rare', popularity: 0 });
+    return prefixIndex;
+}
+
+describe('PrefixIndex', () => {
+    test('completes the last word, most popular first', () => {
+        const suggestions = index(5).suggest('bo', 3);
+        expect(suggestions.map(({ popularity }) => popularity)).toEqual([29, 28, 27]);
+    });
+
+    test('clamps the limit to [1, topN]', () => {
+        const prefixIndex = index(5);
+        expect(prefixIndex.suggest('bone', 50)).toHaveLength(5);
+        expect(prefixIndex.suggest('bone', -3)).toHaveLength(1);
+        expect(prefixIndex.suggest('bone', 0)).toHaveLength(5);
+    });
+
+    test('finds rare multi-word matches missing from the cached lists', () => {
+        expect(index(5).suggest('bone mar').map(({ ref }) => ref)).toEqual(['rare']);
+        expect(index(5).suggest('mice bo').map(({ ref }) => ref)).toEqual(['rare']);
+        expect(index(5).suggest('zebrafish bo')).toEqual([]);
+    });
+
+    test('reorders cached lists when popularity grows', () => {
+        const prefixIndex = index(5);
+        prefixIndex.bump('rare', 100);
+        expect(prefixIndex.suggest('bo', 1)[0].ref).toBe('rare');
+    });
+});
@@ -0,0 +1,34 @@
+const { TrigramIndex } = require('../trigram-index');
+
+function index() {
+    const trigramIndex = new TrigramIndex(['title', 'organism']);
+    trigramIndex.add('BRIC-24', { title: 'Arabidopsis root growth in microgravity', organism: 'Arabidopsis thaliana' });
+    trigramIndex.add('RR-1', { title: 'Bone loss in microgravity', organism: 'Mus musculus' });
+    trigramIndex.add('MVP-1', { title: 'Staphylococcus aureus virulence', organism: 'Staphylococcus aureus' });
+    return trigramIndex;
+}
+
+describe('TrigramIndex', () => {
+    test('matches misspelled and abbreviated words', () => {
+        expect(index().search('arabidopsis groth')[0].id).toBe('BRIC-24');
+        expect(index().search('staph')[0].id).toBe('MVP-1');
+        expect(index().search('zzzz')).toEqual([]);
+    });
+
+    test('filters before applying the limit', () => {
+        const trigramIndex = index();
+        for (let i = 0; i < 100; i++) {
+            trigramIndex.add(`PLANT-${i}`, { title: `Microgravity plant study ${i}`, organism: 'Brassica rapa' });
+        }
+
+        const matches = trigramIndex.search('microgravty', { limit: 5, filter: id => id === 'RR-1' });
+        expect(matches.map(match => match.id)).toEqual(['RR-1']);
+    });
+
+    test('forgets removed documents', () => {
+        const trigramIndex = index();
+        trigramIndex.remove('MVP-1');
+        expect(trigramIndex.search('staphylococcus')).toEqual([]);
+        expect(trigramIndex.size).toBe(2);
+    });
+});
@@ -0,0 +1,64 @@
+const { normalizeUnit, pointValue, toCanonical } = require('../units');
+
+describe('normalizeUnit', () => {
+    test('treats case, spacing and micro-sign variants alike', () => {
+        expect(normalizeUnit(' °C ')).toBe('°c');
+        expect(normalizeUnit('Cells / mL')).toBe('cells/ml');
+        expect(normalizeUnit('µg/mL')).toBe('μg/ml');
+        expect(normalizeUnit('ug/ml')).toBe('μg/ml');
+        expect(normalizeUnit('cells/uL')).toBe('cells/μl');
+    });
+});
+
+describe('toCanonical', () => {
+    test('converts temperatures to °C', () => {
+        expect(toCanonical('temperature', 22, '°C')).toEqual({ numericValue: 22, numericUnit: '°C' });
+        expect(toCanonical('temperature', 295.15, 'K').numericValue).toBeCloseTo(22, 10);
+        expect(toCanonical('temperature', 71.6, 'degF').numericValue).toBeCloseTo(22, 10);
+        expect(toCanonical('temperature', 32, '°F').numericValue).toBeCloseTo(0, 10);
+    });
+
+    test('applies scale factors', () => {
+        expect(toCanonical('pressure', 1, 'atm')).toEqual({ numericValue: 101.325, numericUnit: 'kPa' });
+        expect(toCanonical('pressure', 1013.25, 'hPa').numericValue).toBeCloseTo(101.325, 10);
+        expect(toCanonical('radiation', 0.5, 'Gy')).toEqual({ numericValue: 500, numericUnit: 'mGy' });
+        expect(toCanonical('protein_level', 250, 'µg/mL').numericValue).toBeCloseTo(0.25, 10);
+    });
+
+    test('parses numeric strings', () => {
+        expect(toCanonical('humidity', ' 45.5 ', '%')).toEqual({ numericValue: 45.5, numericUnit: '%RH' });
+    });
+
+    test('takes readings without a unit to be canonical', () => {
+        expect(toCanonical('temperature', 21, undefined)).toEqual({ numericValue: 21, numericUnit: '°C' });
+        expect(toCanonical('temperature', 21, '  ')).toEqual({ numericValue: 21, numericUnit: '°C' });
+    });
+
+    test('keeps number and unit for measurement types without a table', () => {
+        expect(toCanonical('ph', 7.2, 'pH')).toEqual({ numericValue: 7.2, numericUnit: 'pH' });
+        expect(toCanonical('ph', 7.2)).toEqual({ numericValue: 7.2, numericUnit: undefined });
+    });
+
+    test('gives no value rather than a wrong one', () => {
+        expect(toCanonical('temperature', 22, 'furlongs')).toBeNull();
+        expect(toCanonical('temperature', 'warm', '°C')).toBeNull();
+        expect(toCanonical('temperature', '', '°C')).toBeNull();
+        expect(toCanonical('temperature', Infinity, '°C')).toBeNull();
+        expect(toCanonical('temperature', { celsius: 22 }, '°C')).toBeNull();
+    });
+});
+
+describe('pointValue', () => {
+    test('prefers numericValue', () => {
+        expect(pointValue({ value: 71.6, numericValue: 22 })).toBe(22);
+    });
+
+    test('is NaN for readings stored without a comparable value', () => {
+        expect(pointValue({ value: 'warm', numericValue: null })).toBeNaN();
+    });
+
+    test('parses value for points stored before numericValue existed', () => {
+        expect(pointValue({ value: '12.5' })).toBe(12.5);
+        expect(pointValue({ value: 'n/a' })).toBeNaN();
+    });
+});
@@ -1,9 +1,26 @@
 
 // services/ai-services.js - AI/ML Services for Space Biology Data Analysis
 
+const fs = require('fs');
+const path = require('path');
 const tf = require('@tensorflow/tfjs-node');
 const natural = require('natural');
 const { Experiment, DataPoint } = require('../models');
+const { DataQualityAggregator } = require('./data-quality');
+const { pointValue } = require('./units');
+
+// Feature vector layout for the trained outcome model. Must match
+// FEATURE_NAMES / encode_features in ai_features.py.
+const PREDICTION_FEATURE_ENCODERS = {
+    duration: f => f.duration,
+    categoryScore: f => f.categoryScore,
+    complexityScore: f => f.complexityScore,
+    hasPlants: f => (f.hasPlants ? 1 : 0),
+    hasRadiation: f => (f.hasRadiation ? 1 : 0),
+    hasLongDuration: f => (f.hasLongDuration ? 1 : 0),
+    missionMars: f => (f.missionType === 'mars' ? 1 : 0),
+    missionMoon: f => (f.missionType === 'moon' ? 1 : 0)
+};
 
 class SpaceBiologyAI {
     constructor() {
@@ -29,6 +46,12 @@ class SpaceBiologyAI {
             // Initialize TF-IDF for document similarity
             this.tfidf = new natural.TfIdf();
 
+            // Load the offline-trained outcome model (see train_prediction_model.py)
+            this.predictionModel = this.loadPredictionModel();
+
+            // Load the precompiled stem -> score lexicon (see build_sentiment_lexicon.py)
+            this.sentimentLexicon = this.loadSentimentLexicon();
+
             this.isInitialized = true;
             console.log('✅ AI/ML models initialized successfully');
         } catch (error) {
@@ -45,7 +68,9 @@ class SpaceBiologyAI {
             const stems = tokens.map(token => natural.PorterStemmer.stem(token));
 
             // Sentiment analysis
-            const sentiment = this.sentimentAnalyzer.getSentiment(stems);
+            const sentiment = this.sentimentLexicon
+                ? this.scoreSentiment(stems)
+                : this.sentimentAnalyzer.getSentiment(stems);
 
             // Complexity analysis
             const complexity = this.calculateComplexity(text);
@@ -70,6 +95,55 @@ class SpaceBiologyAI {
         }
     }
 
+    loadSentimentLexicon() {
+        const lexiconPath = path.resolve(
+            process.env.AI_MODEL_PATH || 'models',
+            'sentiment-lexicon.json'
+        );
+
+        try {
+            if (!fs.existsSync(lexiconPath)) {
+                console.log('ℹ️ No precompiled sentiment lexicon found, using natural AFINN analyzer');
+                return null;
+            }
+
+            const artifact = JSON.parse(fs.readFileSync(lexiconPath, 'utf8'));
+            if (artifact.format !== 'afinn-stem-lexicon') {
+                throw new Error(`Unsupported lexicon format: ${artifact.format}`);
+            }
+
+            return {
+                scores: new Map(Object.entries(artifact.scores)),
+                negations: new Set(artifact.negations)
+            };
+        } catch (error) {
+            console.error('❌ Sentiment lexicon load error:', error);
+            return null;
+        }
+    }
+
+    // Same scoring rule as natural.SentimentAnalyzer (AFINN sum with negation
+    // flipping, normalised by token count) in one pass over the stems
+    scoreSentiment(stems) {
+        if (stems.length === 0) return 0;
+
+        const { scores, negations } = this.sentimentLexicon;
+        let score = 0;
+        let negator = 1;
+
+        for (let i = 0; i < stems.length; i++) {
+            const stem = stems[i];
+            if (negations.has(stem)) {
+                negator = -1;
+                continue;
+            }
+            const value = scores.get(stem);
+            if (value !== undefined) score += negator * value;
+        }
+
+        return score / stems.length;
+    }
+
     calculateComplexity(text) {
         const sentences = text.split(/[.!?]+/).filter(s => s.trim().length > 0);
         const words = text.split(/\s+/).filter(w => w.length > 0);
@@ -234,8 +308,48 @@ class SpaceBiologyAI {
         return 'iss';
     }
 
+    loadPredictionModel() {
+        const modelPath = path.resolve(
+            process.env.AI_MODEL_PATH || 'models',
+            'prediction-model.json'
+        );
+
+        try {
+            if (!fs.existsSync(modelPath)) {
+                console.log('ℹ️ No trained prediction model found, using heuristic model');
+                return null;
+            }
+
+            const artifact = JSON.parse(fs.readFileSync(modelPath, 'utf8'));
+            if (artifact.format !== 'logistic-regression' ||
+                artifact.features.length !== artifact.coefficients.length) {
+                throw new Error(`Unsupported model artifact format: ${artifact.format}`);
+            }
+
+            const encoders = artifact.features.map(name => {
+                const encoder = PREDICTION_FEATURE_ENCODERS[name];
+                if (!encoder) throw new Error(`Unknown model feature: ${name}`);
+                return encoder;
+            });
+
+            console.log(`✅ Loaded prediction model trained ${artifact.trainedAt}`);
+            return {
+                encoders,
+                coefficients: Float64Array.from(artifact.coefficients),
+                intercept: artifact.intercept
+            };
+        } catch (error) {
+            console.error('❌ Prediction model load error:', error);
+            return null;
+        }
+    }
+
     async runPredictionModel(features) {
-        // Simple heuristic model - in production, you'd use a trained ML model
+        if (this.predictionModel) {
+            return this.scorePredictionModel(features);
+        }
+
+        // Simple heuristic model, used until a trained artifact is available
         let probability = 0.7; // Base probability
 
         // Adjust based on features
@@ -257,6 +371,22 @@ class SpaceBiologyAI {
         };
     }
 
+    scorePredictionModel(features) {
+        const { encoders, coefficients, intercept } = this.predictionModel;
+
+        let z = intercept;
+        for (let i = 0; i < coefficients.length; i++) {
+            z += coefficients[i] * encoders[i](features);
+        }
+        const probability = 1 / (1 + Math.exp(-z));
+
+        return {
+            probability: Math.round(probability * 100) / 100,
+            // Distance from the decision boundary, scaled to [0, 1]
+            confidence: Math.round(Math.abs(probability - 0.5) * 200) / 100
+        };
+    }
+
     identifyRiskFactors(features) {
         const risks = [];
 
@@ -334,7 +464,7 @@ class SpaceBiologyAI {
         for (const [type, points] of Object.entries(groupedByType)) {
             if (points.length < 3) continue;
 
-            const values = points.map(p => parseFloat(p.value)).filter(v => !isNaN(v));
+            const values = points.map(pointValue).filter(v => !isNaN(v));
             if (values.length < 3) continue;
 
             const trend = this.calculateTrend(values);
@@ -379,7 +509,7 @@ class SpaceBiologyAI {
         const groupedByType = this.groupDataByType(dataPoints);
 
         for (const [type, points] of Object.entries(groupedByType)) {
-            const values = points.map(p => parseFloat(p.value)).filter(v => !isNaN(v));
+            const values = points.map(pointValue).filter(v => !isNaN(v));
             if (values.length < 5) continue;
 
             const mean = values.reduce((sum, val) => sum + val, 0) / values.length;
@@ -388,7 +518,7 @@ class SpaceBiologyAI {
             const threshold = 2.5 * stdDev;
 
             points.forEach((point, index) => {
-                const value = parseFloat(point.value);
+                const value = pointValue(point);
                 if (!isNaN(value) && Math.abs(value - mean) > threshold) {
                     anomalies.push({
                         pointId: point._id,
@@ -435,8 +565,8 @@ class SpaceBiologyAI {
         const minLength = Math.min(points1.length, points2.length);
         if (minLength < 3) return 0;
 
-        const values1 = points1.slice(0, minLength).map(p => parseFloat(p.value));
-        const values2 = points2.slice(0, minLength).map(p => parseFloat(p.value));
+        const values1 = points1.slice(0, minLength).map(pointValue);
+        const values2 = points2.slice(0, minLength).map(pointValue);
 
         const mean1 = values1.reduce((sum, val) => sum + val, 0) / values1.length;
         const mean2 = values2.reduce((sum, val) => sum + val, 0) / values2.length;
@@ -467,45 +597,7 @@ class SpaceBiologyAI {
     }
 
     assessDataQuality(dataPoints) {
-        let qualityScore = 1.0;
-        let issues = [];
-
-        // Check for missing values
-        const missingCount = dataPoints.filter(p => !p.value || p.value === null).length;
-        if (missingCount > 0) {
-            const missingRate = missingCount / dataPoints.length;
-            qualityScore -= missingRate * 0.3;
-            issues.push(`${Math.round(missingRate * 100)}% missing values`);
-        }
-
-        // Check for duplicate timestamps
-        const timestamps = dataPoints.map(p => p.timestamp.getTime());
-        const uniqueTimestamps = new Set(timestamps);
-        if (uniqueTimestamps.size !== timestamps.length) {
-            qualityScore -= 0.1;
-            issues.push('Duplicate timestamps detected');
-        }
-
-        // Check for reasonable value ranges
-        const numericValues = dataPoints
-            .map(p => parseFloat(p.value))
-            .filter(v => !isNaN(v));
-
-        if (numericValues.length > 0) {
-            const min = Math.min(...numericValues);
-            const max = Math.max(...numericValues);
-            if (max - min === 0) {
-                qualityScore -= 0.2;
-                issues.push('No variation in values');
-            }
-        }
-
-        return {
-            score: Math.max(0, qualityScore),
-            issues,
-            totalPoints: dataPoints.length,
-            missingPoints: missingCount
-        };
+        return DataQualityAggregator.fromPoints(dataPoints).summary();
     }
 
     generateInsights(analysis) {
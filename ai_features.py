@@ -0,0 +1,129 @@
+# ai_features.py - Python port of the feature extraction in ai-services.js
+#
+# The offline training jobs must see exactly the same features the Node service
+# computes at request time, so every helper here mirrors its JavaScript
+# counterpart in SpaceBiologyAI. Keep the two in sync when either side changes.
+
+import os
+import re
+
+CATEGORY_SCORES = {
+    'Plant Biology': 0.8,
+    'Cell Biology': 0.7,
+    'Microbiology': 0.75,
+    'Animal Biology': 0.6,
+}
+
+PLANT_KEYWORDS = ['plant', 'arabidopsis', 'tomato', 'lettuce', 'root', 'leaf']
+RADIATION_KEYWORDS = ['radiation', 'cosmic', 'space radiation', 'particle']
+
+SPACE_BIOLOGY_TOPICS = {
+    'microgravity': ['microgravity', 'weightless', 'zero-g', 'gravity'],
+    'radiation': ['radiation', 'cosmic', 'solar', 'particle'],
+    'plant-biology': ['plant', 'photosynthesis', 'root', 'leaf', 'growth'],
+    'cell-biology': ['cell', 'cellular', 'mitosis', 'dna', 'protein'],
+    'microbiology': ['bacteria', 'microbe', 'biofilm', 'pathogen'],
+    'animal-biology': ['mouse', 'tissue', 'bone', 'muscle', 'organ'],
+}
+
+# Order matters: this is the layout of the vector the exported model expects,
+# and is written into the artifact so the Node side can check it.
+FEATURE_NAMES = [
+    'duration',
+    'categoryScore',
+    'complexityScore',
+    'hasPlants',
+    'hasRadiation',
+    'hasLongDuration',
+    'missionMars',
+    'missionMoon',
+]
+
+
+def count_syllables(word):
+    word = word.lower()
+    if len(word) <= 3:
+        return 1
+    word = re.sub(r'(?:[^laeiouy]es|ed|[^laeiouy]e)$', '', word, count=1)
+    word = re.sub(r'^y', '', word, count=1)
+    matches = re.findall(r'[aeiouy]{1,2}', word)
+    return len(matches) if matches else 1
+
+
+def calculate_complexity(text):
+    sentences = [s for s in re.split(r'[.!?]+', text) if s.strip()]
+    words = [w for w in re.split(r'\s+', text) if w]
+    if not sentences or not words:
+        return 0
+    avg_words_per_sentence = len(words) / len(sentences)
+    avg_syllables_per_word = sum(count_syllables(w) for w in words) / len(words)
+    return min(10, max(0, (avg_words_per_sentence + avg_syllables_per_word) / 2))
+
+
+def parse_duration(duration):
+    match = re.search(r'\d+', duration or '')
+    return int(match.group(0)) if match else 30
+
+
+def get_mission_type(experiment):
+    impact = (experiment.get('impact') or '').lower()
+    if 'mars' in impact:
+        return 'mars'
+    if 'moon' in impact:
+        return 'moon'
+    return 'iss'
+
+
+def classify_topics(text):
+    """Mirror of SpaceBiologyAI.classifyTopics: keyword occurrence counts per topic."""
+    text_lower = (text or '').lower()
+    topics = []
+    for topic, keywords in SPACE_BIOLOGY_TOPICS.items():
+        score = sum(text_lower.count(keyword) for keyword in keywords)
+        if score > 0:
+            topics.append({'topic': topic, 'score': score})
+    return sorted(topics, key=lambda t: -t['score'])
+
+
+def extract_experiment_features(experiment):
+    """Mirror of SpaceBiologyAI.extractExperimentFeatures."""
+    duration = parse_duration(experiment.get('duration'))
+    description = experiment.get('description') or ''
+    organism = experiment.get('organism') or ''
+    impact = experiment.get('impact') or ''
+
+    plant_text = (organism + ' ' + description).lower()
+    radiation_text = (description + ' ' + impact).lower()
+
+    return {
+        'duration': duration,
+        'categoryScore': CATEGORY_SCORES.get(experiment.get('category'), 0.5),
+        'complexityScore': calculate_complexity(description) if description else 5,
+        'hasPlants': any(k in plant_text for k in PLANT_KEYWORDS),
+        'hasRadiation': any(k in radiation_text for k in RADIATION_KEYWORDS),
+        'hasLongDuration': duration > 90,
+        'missionType': get_mission_type(experiment),
+    }
+
+
+def encode_features(features):
+    """Flatten a feature dict into the numeric vector described by FEATURE_NAMES."""
+    return [
+        float(features['duration']),
+        float(features['categoryScore']),
+        float(features['complexityScore']),
+        1.0 if features['hasPlants'] else 0.0,
+        1.0 if features['hasRadiation'] else 0.0,
+        1.0 if features['hasLongDuration'] else 0.0,
+        1.0 if features['missionType'] == 'mars' else 0.0,
+        1.0 if features['missionType'] == 'moon' else 0.0,
+    ]
+
+
+def get_database():
+    """Connect to the dashboard database using the same MONGODB_URI as the Node service."""
+    from pymongo import MongoClient
+
+    uri = os.environ.get('MONGODB_URI', 'mongodb://localhost:27017/nasa_space_biology')
+    client = MongoClient(uri)
+    return client.get_default_database('nasa_space_biology')
@@ -0,0 +1,87 @@
+
+// analytics-snapshot.js - Materialized dashboard analytics
+
+// The dashboard figures are kept in memory and moved incrementally as
+// experiments and data points are written, instead of being recounted on
+// every GET /api/analytics. A periodic full refresh from the database
+// (enhanced_server.js) corrects anything the increments cannot see, such as
+// experiments ageing out of the "active" window or writes from other
+// processes.
+
+const ACTIVE_WINDOW_MS = 30 * 24 * 60 * 60 * 1000;
+
+// Same classification as the mission distribution aggregation
+function missionFromImpact(impact) {
+    if (/Mars/i.test(impact || '')) return 'Mars';
+    if (/Moon/i.test(impact || '')) return 'Moon';
+    return 'Other';
+}
+
+function increment(distribution, key) {
+    const bucket = distribution.find(entry => entry._id === key);
+    if (bucket) {
+        bucket.count++;
+    } else {
+        distribution.push({ _id: key, count: 1 });
+    }
+}
+
+class AnalyticsSnapshot {
+    constructor() {
+        this.state = null;
+        // Every change bumps the version; the epoch keeps ETags from another
+        // process or an earlier run from matching
+        this.epoch = Date.now().toString(36);
+        this.version = 0;
+    }
+
+    get loaded() {
+        return this.state !== null;
+    }
+
+    get etag() {
+        return `"analytics-${this.epoch}-${this.version}"`;
+    }
+
+    // state: { totalExperiments, activeExperiments, dataPointsProcessed,
+    //          categoryDistribution, missionDistribution }
+    reset(state) {
+        this.state = { ...state, lastUpdated: new Date() };
+        this.version++;
+    }
+
+    recordExperiment(experiment) {
+        if (!this.state) return;
+
+        this.state.totalExperiments++;
+        if (Date.now() - new Date(experiment.dateCreated || Date.now()).getTime() < ACTIVE_WINDOW_MS) {
+            this.state.activeExperiments++;
+        }
+        increment(this.state.categoryDistribution, experiment.category);
+        increment(this.state.missionDistribution, missionFromImpact(experiment.impact));
+        this.state.lastUpdated = new Date();
+        this.version++;
+    }
+
+    recordDataPoints(count = 1) {
+        if (!this.state) return;
+
+        this.state.dataPointsProcessed += count;
+        this.state.lastUpdated = new Date();
+        this.version++;
+    }
+
+    toJSON() {
+        return this.state && {
+            ...this.state,
+            categoryDistribution: this.state.categoryDistribution.map(entry => ({ ...entry })),
+            missionDistribution: this.state.missionDistribution.map(entry => ({ ...entry }))
+        };
+    }
+}
+
+module.exports = {
+    ACTIVE_WINDOW_MS,
+    AnalyticsSnapshot,
+    missionFromImpact
+};
@@ -0,0 +1,113 @@
+# backfill_rollups.py - Rebuild data point rollups from raw DataPoint documents
+#
+# The Node service keeps minute/hour/day rollups (see rollups.js) up to date
+# as data points arrive. Points stored before rollups existed, or imported
+# around the service, are covered by this job: it groups raw readings with
+# $dateTrunc inside MongoDB and $merge-s the totals into the rollup
+# collection, replacing whatever the affected buckets held. Nothing is pulled
+# into Python, so the job costs one aggregation per resolution.
+#
+# Buckets still receiving live data while the job runs can end up a few
+# readings off; rerun with --since covering them to settle them.
+#
+# Usage:
+#   python backfill_rollups.py                                 # rebuild every rollup
+#   python backfill_rollups.py --experiment BRIC-24            # one experiment
+#   python backfill_rollups.py --since 2025-01-01T00:00:00Z    # recent buckets only
+
+import argparse
+from datetime import datetime, timezone
+
+from ai_features import get_database
+
+# Must match RESOLUTIONS in rollups.js
+RESOLUTIONS = ['minute', 'hour', 'day']
+ROLLUP_COLLECTION = 'datapointrollups'
+
+
+def parse_datetime(value):
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def truncate(moment, resolution):
+    if resolution == 'minute':
+        return moment.replace(second=0, microsecond=0)
+    if resolution == 'hour':
+        return moment.replace(minute=0, second=0, microsecond=0)
+    return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+# Readings in canonical units; points stored before numericValue existed
+# fall back to a numeric value (see pointValue in units.js)
+HAS_NUMERIC_VALUE = {'$or': [
+    {'numericValue': {'$type': 'number'}},
+    {'numericValue': {'$exists': False}, 'value': {'$type': 'number'}},
+]}
+NUMERIC_VALUE = {'$ifNull': ['$numericValue', '$value']}
+
+
+def rollup_pipeline(resolution, experiment_id=None, since=None):
+    match = {**HAS_NUMERIC_VALUE, 'timestamp': {'$type': 'date'}}
+    if experiment_id:
+        match['experimentId'] = experiment_id
+    if since:
+        # Start from the first bucket the cutoff falls in, so partial buckets
+        # are not replaced with partial totals
+        match['timestamp']['$gte'] = truncate(since, resolution)
+
+    return [
+        {'$match': match},
+        {'$group': {
+            '_id': {
+                'experimentId': '$experimentId',
+                'measurementType': '$measurementType',
+                'bucket': {'$dateTrunc': {'date': '$timestamp', 'unit': resolution, 'timezone': 'UTC'}},
+            },
+            'count': {'$sum': 1},
+            'sum': {'$sum': NUMERIC_VALUE},
+            'sumSq': {'$sum': {'$multiply': [NUMERIC_VALUE, NUMERIC_VALUE]}},
+            'min': {'$min': NUMERIC_VALUE},
+            'max': {'$max': NUMERIC_VALUE},
+        }},
+        {'$project': {
+            '_id': 0,
+            'experimentId': '$_id.experimentId',
+            'measurementType': '$_id.measurementType',
+            'resolution': {'$literal': resolution},
+            'bucket': '$_id.bucket',
+            'count': 1, 'sum': 1, 'sumSq': 1, 'min': 1, 'max': 1,
+        }},
+        {'$merge': {
+            'into': ROLLUP_COLLECTION,
+            'on': ['experimentId', 'resolution', 'measurementType', 'bucket'],
+            'whenMatched': 'merge',
+            'whenNotMatched': 'insert',
+        }},
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Rebuild data point rollups from raw readings')
+    parser.add_argument('--experiment', help='only rebuild this experiment id')
+    parser.add_argument('--since', type=parse_datetime, help='only rebuild buckets from this time (ISO 8601)')
+    args = parser.parse_args()
+
+    db = get_database()
+    # $merge needs a unique index on its "on" fields; the Node service
+    # declares the same one on DataPointRollup
+    db[ROLLUP_COLLECTION].create_index(
+        [('experimentId', 1), ('resolution', 1), ('measurementType', 1), ('bucket', 1)],
+        unique=True)
+
+    for resolution in RESOLUTIONS:
+        print(f'📈 Rebuilding {resolution} rollups...')
+        db.datapoints.aggregate(rollup_pipeline(resolution, args.experiment, args.since))
+        query = {'resolution': resolution}
+        if args.experiment:
+            query['experimentId'] = args.experiment
+        print(f'✅ {db[ROLLUP_COLLECTION].count_documents(query)} {resolution} buckets')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+# backfill_summaries.py - Rebuild per-experiment summaries from raw DataPoint documents
+#
+# The Node service keeps one summary document per experiment up to date as
+# data points arrive (see experiment-summary.js). Experiments whose points
+# were stored before summaries existed, or imported around the service, are
+# rebuilt here with a single aggregation that groups by experiment and
+# measurement type inside MongoDB and $merge-s the result over the summary
+# collection.
+#
+# Experiments still receiving live data while the job runs can end up a few
+# readings off; rerun with --experiment to settle them.
+#
+# Usage:
+#   python backfill_summaries.py                         # rebuild every summary
+#   python backfill_summaries.py --experiment BRIC-24    # one experiment
+
+import argparse
+
+from ai_features import get_database
+
+SUMMARY_COLLECTION = 'experimentsummaries'
+
+# Same rule as pointValue in units.js: numericValue, or the raw number for
+# points stored before numericValue existed
+NUMERIC_VALUE = {'$cond': [
+    {'$isNumber': '$numericValue'},
+    '$numericValue',
+    {'$cond': [
+        {'$and': [{'$eq': [{'$type': '$numericValue'}, 'missing']}, {'$isNumber': '$value'}]},
+        '$value',
+        None,
+    ]},
+]}
+
+
+def summary_pipeline(experiment_id=None):
+    match = {'experimentId': experiment_id} if experiment_id else {}
+
+    return [
+        {'$match': match},
+        {'$set': {'numeric': NUMERIC_VALUE}},
+        {'$group': {
+            '_id': {'experimentId': '$experimentId', 'measurementType': '$measurementType'},
+            'count': {'$sum': 1},
+            'numericCount': {'$sum': {'$cond': [{'$isNumber': '$numeric'}, 1, 0]}},
+            'sum': {'$sum': '$numeric'},
+            'min': {'$min': '$numeric'},
+            'max': {'$max': '$numeric'},
+            'first': {'$min': '$timestamp'},
+            'last': {'$max': '$timestamp'},
+            # Newest reading, compared by timestamp first as in the live path
+            'latest': {'$max': {
+                'timestamp': '$timestamp',
+                'value': {'$ifNull': ['$numeric', '$value']},
+                'unit': {'$ifNull': [
+                    {'$cond': [{'$isNumber': '$numeric'}, '$numericUnit', '$unit']},
+                    None,
+                ]},
+            }},
+        }},
+        {'$group': {
+            '_id': '$_id.experimentId',
+            'count': {'$sum': '$count'},
+            'firstTimestamp': {'$min': '$first'},
+            'lastTimestamp': {'$max': '$last'},
+            'measurements': {'$push': {
+                'k': '$_id.measurementType',
+                'v': {
+                    'count': '$count',
+                    'numericCount': '$numericCount',
+                    'sum': '$sum',
+                    'min': '$min',
+                    'max': '$max',
+                    'latest': '$latest',
+                },
+            }},
+        }},
+        {'$project': {
+            '_id': 0,
+            'experimentId': '$_id',
+            'count': 1,
+            'firstTimestamp': 1,
+            'lastTimestamp': 1,
+            # Same restriction as MEASUREMENT_KEY in experiment-summary.js
+            'measurements': {'$arrayToObject': {'$filter': {
+                'input': '$measurements',
+                'cond': {'$regexMatch': {'input': '$$this.k', 'regex': '^[A-Za-z0-9_ -]+$'}},
+            }}},
+            'updatedAt': '$$NOW',
+        }},
+        {'$merge': {
+            'into': SUMMARY_COLLECTION,
+            'on': 'experimentId',
+            'whenMatched': 'replace',
+            'whenNotMatched': 'insert',
+        }},
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Rebuild experiment summaries from raw readings')
+    parser.add_argument('--experiment', help='only rebuild this experiment id')
+    args = parser.parse_args()
+
+    db = get_database()
+    # $merge needs a unique index on its "on" field; the Node service
+    # declares the same one on ExperimentSummary
+    db[SUMMARY_COLLECTION].create_index('experimentId', unique=True)
+
+    print('📊 Rebuilding experiment summaries...')
+    db.datapoints.aggregate(summary_pipeline(args.experiment), allowDiskUse=True)
+    query = {'experimentId': args.experiment} if args.experiment else {}
+    print(f'✅ {db[SUMMARY_COLLECTION].count_documents(query)} experiment summaries')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,139 @@
+
+// bloom-filter.js - Bloom filter over string keys
+
+// Answers "definitely not seen" or "possibly seen" in constant memory. Used
+// in front of the idempotency key unique index: keys the filter has never
+// seen skip the duplicate lookup, and only possible hits pay a round trip.
+// False positives cost an extra lookup; nothing is ever wrongly rejected.
+//
+// A Bloom filter cannot forget, so one that keeps receiving keys drifts
+// towards answering "possibly seen" for everything. RotatingBloomFilter
+// keeps two generations: keys go into the current one, lookups check both,
+// and every windowMs the older generation is dropped. A key is remembered
+// for at least one window and at most two, and each generation only ever
+// holds one window's keys.
+
+const DEFAULT_FALSE_POSITIVE_RATE = 0.01;
+
+function fmix32(h) {
+    h ^= h >>> 16;
+    h = Math.imul(h, 0x85ebca6b);
+    h ^= h >>> 13;
+    h = Math.imul(h, 0xc2b2ae35);
+    h ^= h >>> 16;
+    return h >>> 0;
+}
+
+// FNV-1a over UTF-16 code units, finalized with the murmur3 mixer
+function hashString(text, seed) {
+    let h = (0x811c9dc5 ^ seed) >>> 0;
+    for (let i = 0; i < text.length; i++) {
+        h ^= text.charCodeAt(i);
+        h = Math.imul(h, 0x01000193);
+    }
+    return fmix32(h);
+}
+
+class BloomFilter {
+    constructor(bits, hashes) {
+        this.bits = Math.max(8, bits);
+        this.hashes = Math.max(1, hashes);
+        this.words = new Uint32Array(Math.ceil(this.bits / 32));
+        this.count = 0;
+    }
+
+    // Optimal size for an expected number of keys and false positive rate
+    static forCapacity(capacity, falsePositiveRate = DEFAULT_FALSE_POSITIVE_RATE) {
+        const bits = Math.ceil(-capacity * Math.log(falsePositiveRate) / (Math.LN2 * Math.LN2));
+        const hashes = Math.round((bits / capacity) * Math.LN2);
+        return new BloomFilter(bits, hashes);
+    }
+
+    // Double hashing: position i is h1 + i * h2
+    positions(key) {
+        const h1 = hashString(key, 0);
+        const h2 = hashString(key, 0x9e3779b9) | 1;
+        const positions = new Array(this.hashes);
+        for (let i = 0; i < this.hashes; i++) {
+            positions[i] = ((h1 + Math.imul(i, h2)) >>> 0) % this.bits;
+        }
+        return positions;
+    }
+
+    add(key) {
+        for (const position of this.positions(key)) {
+            this.words[position >>> 5] |= 1 << (position & 31);
+        }
+        this.count++;
+    }
+
+    mightContain(key) {
+        return this.positions(key).every(position => (this.words[position >>> 5] & (1 << (position & 31))) !== 0);
+    }
+
+    clear() {
+        this.words.fill(0);
+        this.count = 0;
+    }
+
+    // Expected false positive rate for the keys added so far
+    get falsePositiveRate() {
+        return Math.pow(1 - Math.exp(-this.hashes * this.count / this.bits), this.hashes);
+    }
+}
+
+class RotatingBloomFilter {
+    constructor(capacity, windowMs, falsePositiveRate = DEFAULT_FALSE_POSITIVE_RATE, now = Date.now()) {
+        this.capacity = capacity;
+        this.windowMs = windowMs;
+        this.targetRate = falsePositiveRate;
+        this.current = BloomFilter.forCapacity(capacity, falsePositiveRate);
+        this.previous = BloomFilter.forCapacity(capacity, falsePositiveRate);
+        this.rotatedAt = now;
+        this.rotations = 0;
+    }
+
+    // Called on every add and lookup, so no timer is needed
+    rotate(now = Date.now()) {
+        if (now - this.rotatedAt < this.windowMs) return;
+        const expired = this.previous;
+        expired.clear();
+        // After a gap longer than two windows both generations are stale
+        if (now - this.rotatedAt >= 2 * this.windowMs) this.current.clear();
+        this.previous = this.current;
+        this.current = expired;
+        this.rotatedAt = now;
+        this.rotations++;
+    }
+
+    add(key, now = Date.now()) {
+        this.rotate(now);
+        this.current.add(key);
+    }
+
+    mightContain(key, now = Date.now()) {
+        this.rotate(now);
+        return this.current.mightContain(key) || this.previous.mightContain(key);
+    }
+
+    get count() {
+        return this.current.count + this.previous.count;
+    }
+
+    // A lookup is a false positive when either generation reports one
+    get falsePositiveRate() {
+        return 1 - (1 - this.current.falsePositiveRate) * (1 - this.previous.falsePositiveRate);
+    }
+
+    stats() {
+        return {
+            keys: this.count,
+            capacity: this.capacity,
+            windowMs: this.windowMs,
+            rotations: this.rotations,
+            falsePositiveRate: this.falsePositiveRate
+        };
+    }
+}
+
+module.exports = { BloomFilter, RotatingBloomFilter };
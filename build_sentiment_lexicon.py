@@ -0,0 +1,232 @@
+# build_sentiment_lexicon.py - Precompile the AFINN lexicon into a stem -> score table
+#
+# natural.SentimentAnalyzer stems the whole AFINN vocabulary every time it is
+# constructed and then re-stems each (already stemmed) token on lookup. This
+# step does the stemming once at build time and writes a compact JSON table
+# that ai-services.js loads at startup, so scoring a description is a single
+# hash lookup per token.
+#
+# Usage:
+#   python build_sentiment_lexicon.py
+#   python build_sentiment_lexicon.py --afinn AFINN-165.txt --output models/sentiment-lexicon.json
+
+import argparse
+import json
+import os
+import re
+
+NATURAL_SENTIMENT_DIR = os.path.join('node_modules', 'natural', 'lib', 'natural', 'sentiment', 'English')
+DEFAULT_AFINN = os.path.join(NATURAL_SENTIMENT_DIR, 'afinn_en_165.json')
+DEFAULT_NEGATIONS = os.path.join(NATURAL_SENTIMENT_DIR, 'negations_en.json')
+
+# Used when natural's negation list is not available
+FALLBACK_NEGATIONS = [
+    'not', 'no', 'never', 'neither', 'nor', 'none', 'nobody', 'nothing',
+    'nowhere', 'cannot', "can't", "don't", "doesn't", "didn't", "isn't",
+    "aren't", "wasn't", "weren't", "won't", "wouldn't", "shouldn't",
+]
+
+
+class PorterStemmer:
+    """Martin Porter's original algorithm, as implemented by natural.PorterStemmer."""
+
+    def _cons(self, word, i):
+        ch = word[i]
+        if ch in 'aeiou':
+            return False
+        if ch == 'y':
+            return i == 0 or not self._cons(word, i - 1)
+        return True
+
+    def _measure(self, stem):
+        """Number of VC sequences in the stem."""
+        m, i, n = 0, 0, len(stem)
+        while i < n and self._cons(stem, i):
+            i += 1
+        while i < n:
+            while i < n and not self._cons(stem, i):
+                i += 1
+            if i >= n:
+                break
+            while i < n and self._cons(stem, i):
+                i += 1
+            m += 1
+        return m
+
+    def _has_vowel(self, stem):
+        return any(not self._cons(stem, i) for i in range(len(stem)))
+
+    def _double_cons(self, word):
+        return len(word) >= 2 and word[-1] == word[-2] and self._cons(word, len(word) - 1)
+
+    def _cvc(self, word):
+        if len(word) < 3:
+            return False
+        n = len(word)
+        return (self._cons(word, n - 3) and not self._cons(word, n - 2)
+                and self._cons(word, n - 1) and word[-1] not in 'wxy')
+
+    def _replace(self, word, suffix, replacement, min_measure):
+        if word.endswith(suffix):
+            stem = word[:len(word) - len(suffix)]
+            if self._measure(stem) > min_measure:
+                return stem + replacement, True
+            return word, True
+        return word, False
+
+    def _step1a(self, w):
+        if w.endswith('sses'):
+            return w[:-2]
+        if w.endswith('ies'):
+            return w[:-2]
+        if w.endswith('ss'):
+            return w
+        if w.endswith('s'):
+            return w[:-1]
+        return w
+
+    def _step1b(self, w):
+        if w.endswith('eed'):
+            return w[:-1] if self._measure(w[:-3]) > 0 else w
+        for suffix in ('ed', 'ing'):
+            if w.endswith(suffix) and self._has_vowel(w[:-len(suffix)]):
+                w = w[:-len(suffix)]
+                if w.endswith(('at', 'bl', 'iz')):
+                    return w + 'e'
+                if self._double_cons(w) and w[-1] not in 'lsz':
+                    return w[:-1]
+                if self._measure(w) == 1 and self._cvc(w):
+                    return w + 'e'
+                return w
+        return w
+
+    def _step1c(self, w):
+        if w.endswith('y') and self._has_vowel(w[:-1]):
+            return w[:-1] + 'i'
+        return w
+
+    STEP2 = [
+        ('ational', 'ate'), ('tional', 'tion'), ('enci', 'ence'), ('anci', 'ance'),
+        ('izer', 'ize'), ('bli', 'ble'), ('alli', 'al'), ('entli', 'ent'),
+        ('eli', 'e'), ('ousli', 'ous'), ('ization', 'ize'), ('ation', 'ate'),
+        ('ator', 'ate'), ('alism', 'al'), ('iveness', 'ive'), ('fulness', 'ful'),
+        ('ousness', 'ous'), ('aliti', 'al'), ('iviti', 'ive'), ('biliti', 'ble'),
+        ('logi', 'log'),
+    ]
+
+    STEP3 = [
+        ('icate', 'ic'), ('ative', ''), ('alize', 'al'), ('iciti', 'ic'),
+        ('ical', 'ic'), ('ful', ''), ('ness', ''),
+    ]
+
+    STEP4 = [
+        'al', 'ance', 'ence', 'er', 'ic', 'able', 'ible', 'ant', 'ement',
+        'ment', 'ent', 'ion', 'ou', 'ism', 'ate', 'iti', 'ous', 'ive', 'ize',
+    ]
+
+    def _step_table(self, w, table):
+        # Longest matching suffix wins, as in the reference implementation
+        for suffix, replacement in sorted(table, key=lambda pair: -len(pair[0])):
+            w, matched = self._replace(w, suffix, replacement, 0)
+            if matched:
+                return w
+        return w
+
+    def _step4(self, w):
+        for suffix in sorted(self.STEP4, key=len, reverse=True):
+            if w.endswith(suffix):
+                stem = w[:-len(suffix)]
+                if suffix == 'ion' and not stem.endswith(('s', 't')):
+                    return w
+                return stem if self._measure(stem) > 1 else w
+        return w
+
+    def _step5(self, w):
+        if w.endswith('e'):
+            stem = w[:-1]
+            m = self._measure(stem)
+            if m > 1 or (m == 1 and not self._cvc(stem)):
+                w = stem
+        if w.endswith('ll') and self._measure(w) > 1:
+            w = w[:-1]
+        return w
+
+    def stem(self, word):
+        word = word.lower()
+        if len(word) < 3:
+            return word
+        word = self._step1a(word)
+        word = self._step1b(word)
+        word = self._step1c(word)
+        word = self._step_table(word, self.STEP2)
+        word = self._step_table(word, self.STEP3)
+        word = self._step4(word)
+        word = self._step5(word)
+        return word
+
+
+def load_afinn(path):
+    """Read AFINN either as natural's JSON object or as the original tab-separated list."""
+    with open(path, encoding='utf-8') as f:
+        if path.endswith('.json'):
+            return json.load(f)
+        lexicon = {}
+        for line in f:
+            line = line.rstrip('\n')
+            if not line:
+                continue
+            word, score = line.rsplit('\t', 1)
+            lexicon[word] = int(score)
+        return lexicon
+
+
+def load_negations(path):
+    if path and os.path.exists(path):
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        return data['words'] if isinstance(data, dict) else data
+    return FALLBACK_NEGATIONS
+
+
+def compile_lexicon(afinn, stemmer):
+    # Later entries overwrite earlier ones on stem collisions, matching the
+    # vocabulary stemming loop in natural.SentimentAnalyzer.
+    scores = {}
+    for word, score in afinn.items():
+        if re.search(r'\s', word):
+            continue  # multi-word phrases never match a single token
+        scores[stemmer.stem(word)] = score
+    return scores
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Precompile the AFINN sentiment lexicon')
+    parser.add_argument('--afinn', default=DEFAULT_AFINN)
+    parser.add_argument('--negations', default=DEFAULT_NEGATIONS)
+    parser.add_argument('--output', default=os.path.join(
+        os.environ.get('AI_MODEL_PATH', 'models'), 'sentiment-lexicon.json'))
+    args = parser.parse_args()
+
+    print('📚 Compiling AFINN sentiment lexicon...')
+    stemmer = PorterStemmer()
+    afinn = load_afinn(args.afinn)
+    negations = load_negations(args.negations)
+    scores = compile_lexicon(afinn, stemmer)
+
+    artifact = {
+        'format': 'afinn-stem-lexicon',
+        'version': 1,
+        'stemmer': 'porter',
+        'negations': sorted({stemmer.stem(w) for w in negations} | {w.lower() for w in negations}),
+        'scores': scores,
+    }
+
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(artifact, f, separators=(',', ':'), ensure_ascii=False)
+
+    print(f'✅ {len(afinn)} AFINN entries compiled to {len(scores)} stems in {args.output}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+
+// data-import.js - Streaming CSV/NDJSON data point import
+
+// Uploaded files are never buffered: ImportStorage is a multer storage
+// engine that reads the file stream as it arrives, parses it row by row
+// (csv-parser for CSV, readline for NDJSON) and hands fixed-size batches to
+// the ingest function. The parser is iterated with for await, so while a
+// batch is being written the stream is paused and the upload is throttled
+// by TCP backpressure; memory stays at about one batch however large the
+// file is.
+
+const readline = require('readline');
+const path = require('path');
+const { pipeline } = require('stream');
+const csv = require('csv-parser');
+
+const DEFAULT_BATCH_SIZE = 1000;
+const MAX_REPORTED_ERRORS = 100;
+
+function detectFormat(file) {
+    const extension = path.extname(file.originalname || '').toLowerCase();
+    if (extension === '.csv' || /csv/.test(file.mimetype)) return 'csv';
+    if (['.ndjson', '.jsonl'].includes(extension) || /ndjson|jsonl/.test(file.mimetype)) return 'ndjson';
+    return null;
+}
+
+// CSV cells are strings: numeric values become numbers and empty cells are
+// dropped so schema defaults apply
+function fromCsvRow(row) {
+    const point = {};
+    for (const [column, cell] of Object.entries(row)) {
+        const text = cell.trim();
+        if (text === '') continue;
+        point[column] = column === 'value' && Number.isFinite(Number(text))
+            ? Number(text)
+            : text;
+    }
+    return point;
+}
+
+async function* readRecords(input, format) {
+    if (format === 'csv') {
+        const parser = pipeline(input, csv({ mapHeaders: ({ header }) => header.trim() }), () => {});
+        for await (const row of parser) yield fromCsvRow(row);
+        return;
+    }
+
+    const lines = readline.createInterface({ input, crlfDelay: Infinity });
+    for await (const line of lines) {
+        if (line.trim() === '') continue;
+        try {
+            yield JSON.parse(line);
+        } catch (error) {
+            // Reported as invalid by the ingest function
+            yield null;
+        }
+    }
+}
+
+// Streams records from input into ingest(batch), which resolves with one
+// { status, error? } per record as DataProcessor.ingestBatch does.
+// onProgress(summary) is called after every batch.
+async function importStream(input, format, { ingest, batchSize = DEFAULT_BATCH_SIZE, onProgress = () => {} }) {
+    const summary = { rows: 0, created: 0, duplicate: 0, invalid: 0, failed: 0, bytes: 0, errors: [] };
+    input.on('data', chunk => {
+        summary.bytes += chunk.length;
+    });
+
+    let batch = [];
+    const flush = async () => {
+        const results = await ingest(batch);
+        results.forEach((result, index) => {
+            summary[result.status]++;
+            if (result.error && summary.errors.length < MAX_REPORTED_ERRORS) {
+                summary.errors.push({ row: summary.rows + index + 1, status: result.status, error: result.error });
+            }
+        });
+        summary.rows += batch.length;
+        batch = [];
+        onProgress(summary);
+    };
+
+    try {
+        for await (const record of readRecords(input, format)) {
+            batch.push(record);
+            if (batch.length >= batchSize) await flush();
+        }
+        if (batch.length > 0) await flush();
+    } catch (error) {
+        input.destroy();
+        error.summary = summary;
+        throw error;
+    }
+
+    return summary;
+}
+
+// multer storage engine: the import summary becomes req.file.import
+class ImportStorage {
+    constructor({ ingest, batchSize = DEFAULT_BATCH_SIZE, onProgress = () => {} }) {
+        this.ingest = ingest;
+        this.batchSize = batchSize;
+        this.onProgress = onProgress;
+    }
+
+    _handleFile(req, file, cb) {
+        const format = detectFormat(file);
+        if (!format) {
+            file.stream.resume();
+            return cb(new Error('Unsupported file type: upload a .csv or .ndjson file'));
+        }
+
+        importStream(file.stream, format, {
+            ingest: this.ingest,
+            batchSize: this.batchSize,
+            onProgress: summary => this.onProgress(req, file, summary)
+        })
+            .then(summary => cb(null, { size: summary.bytes, import: { format, ...summary } }))
+            .catch(cb);
+    }
+
+    _removeFile(req, file, cb) {
+        // Nothing is kept on disk; stored rows are not rolled back
+        cb(null);
+    }
+}
+
+module.exports = {
+    DEFAULT_BATCH_SIZE,
+    ImportStorage,
+    detectFormat,
+    importStream
+};
@@ -0,0 +1,267 @@
+
+// data-quality.js - Streaming, mergeable data quality aggregation
+
+const { pointValue } = require('./units');
+
+// Duplicate timestamps are counted with a HyperLogLog sketch so memory stays
+// constant no matter how many points an experiment accumulates. 2^12
+// registers give ~1.6% relative error on the distinct count, too coarse to
+// see a handful of duplicates, so up to EXACT_TIMESTAMP_LIMIT timestamped
+// points the distinct timestamps are also kept in a set and counted exactly.
+const EXACT_TIMESTAMP_LIMIT = 4096;
+const HLL_PRECISION = 12;
+const HLL_REGISTERS = 1 << HLL_PRECISION;
+const HLL_ALPHA = 0.7213 / (1 + 1.079 / HLL_REGISTERS);
+
+function fmix32(h) {
+    h ^= h >>> 16;
+    h = Math.imul(h, 0x85ebca6b);
+    h ^= h >>> 13;
+    h = Math.imul(h, 0xc2b2ae35);
+    h ^= h >>> 16;
+    return h >>> 0;
+}
+
+// Millisecond timestamps exceed 32 bits, so mix the high and low words
+function hashTimestamp(ms) {
+    const high = Math.floor(ms / 0x100000000);
+    const low = ms >>> 0;
+    return fmix32(low ^ fmix32(high + 0x9e3779b9));
+}
+
+function isMissing(value) {
+    return value === undefined || value === null || value === '';
+}
+
+class DataQualityAggregator {
+    constructor() {
+        this.count = 0;
+        this.missing = 0;
+        this.timestamped = 0;
+        this.numericCount = 0;
+        this.sum = 0;
+        this.sumSq = 0;
+        this.min = Infinity;
+        this.max = -Infinity;
+        this.registers = new Uint8Array(HLL_REGISTERS);
+        this.touched = new Map(); // register index -> rank changed since creation
+        this.timestamps = new Set(); // distinct ms timestamps, null once past the limit
+    }
+
+    static fromPoints(points) {
+        const aggregator = new DataQualityAggregator();
+        for (const point of points) aggregator.add(point);
+        return aggregator;
+    }
+
+    // Rebuild from a stored DataQuality document
+    static fromDocument(doc) {
+        const aggregator = new DataQualityAggregator();
+        if (!doc) return aggregator;
+
+        aggregator.count = doc.count || 0;
+        aggregator.missing = doc.missing || 0;
+        aggregator.timestamped = doc.timestamped || 0;
+        aggregator.numericCount = doc.numericCount || 0;
+        aggregator.sum = doc.sum || 0;
+        aggregator.sumSq = doc.sumSq || 0;
+        aggregator.min = doc.min ?? Infinity;
+        aggregator.max = doc.max ?? -Infinity;
+        for (const [index, rank] of Object.entries(doc.hll || {})) {
+            aggregator.registers[Number(index)] = rank;
+        }
+        // Documents written before timestamps were kept have no set
+        aggregator.timestamps = Array.isArray(doc.distinctTimestamps) && aggregator.timestamped <= EXACT_TIMESTAMP_LIMIT
+            ? new Set(doc.distinctTimestamps.map(timestamp => new Date(timestamp).getTime()))
+            : null;
+        return aggregator;
+    }
+
+    add(point) {
+        this.count++;
+
+        if (isMissing(point.value)) {
+            this.missing++;
+        } else {
+            const value = pointValue(point);
+            if (!isNaN(value)) {
+                this.numericCount++;
+                this.sum += value;
+                this.sumSq += value * value;
+                if (value < this.min) this.min = value;
+                if (value > this.max) this.max = value;
+            }
+        }
+
+        if (point.timestamp) {
+            this.timestamped++;
+            this.addTimestamp(new Date(point.timestamp).getTime());
+        }
+        return this;
+    }
+
+    addTimestamp(ms) {
+        if (this.timestamps) {
+            this.timestamps.add(ms);
+            if (this.timestamped > EXACT_TIMESTAMP_LIMIT) this.timestamps = null;
+        }
+
+        const hash = hashTimestamp(ms);
+        const index = hash >>> (32 - HLL_PRECISION);
+        const rest = (hash << HLL_PRECISION) >>> 0;
+        const rank = rest === 0 ? 32 - HLL_PRECISION + 1 : Math.clz32(rest) + 1;
+
+        if (rank > this.registers[index]) {
+            this.registers[index] = rank;
+            this.touched.set(index, rank);
+        }
+    }
+
+    // Combine with an aggregator built on another shard or batch
+    merge(other) {
+        this.count += other.count;
+        this.missing += other.missing;
+        this.timestamped += other.timestamped;
+        this.numericCount += other.numericCount;
+        this.sum += other.sum;
+        this.sumSq += other.sumSq;
+        this.min = Math.min(this.min, other.min);
+        this.max = Math.max(this.max, other.max);
+        for (let i = 0; i < HLL_REGISTERS; i++) {
+            if (other.registers[i] > this.registers[i]) {
+                this.registers[i] = other.registers[i];
+                this.touched.set(i, other.registers[i]);
+            }
+        }
+        if (this.timestamps && other.timestamps && this.timestamped <= EXACT_TIMESTAMP_LIMIT) {
+            for (const ms of other.timestamps) this.timestamps.add(ms);
+        } else {
+            this.timestamps = null;
+        }
+        return this;
+    }
+
+    estimateDistinctTimestamps() {
+        let inverseSum = 0;
+        let zeros = 0;
+        for (let i = 0; i < HLL_REGISTERS; i++) {
+            inverseSum += 2 ** -this.registers[i];
+            if (this.registers[i] === 0) zeros++;
+        }
+
+        const estimate = HLL_ALPHA * HLL_REGISTERS * HLL_REGISTERS / inverseSum;
+        if (estimate <= 2.5 * HLL_REGISTERS && zeros > 0) {
+            // Linear counting is far more accurate for small cardinalities
+            return HLL_REGISTERS * Math.log(HLL_REGISTERS / zeros);
+        }
+        return estimate;
+    }
+
+    // Exact while the distinct timestamps are kept. Past that, sketch noise
+    // must not be reported as duplicates, so only estimates beyond three
+    // standard errors of the distinct count are counted.
+    estimateDuplicateTimestamps() {
+        if (this.timestamped < 2) return 0;
+        if (this.timestamps) return this.timestamped - this.timestamps.size;
+
+        const distinct = this.estimateDistinctTimestamps();
+        const load = distinct / HLL_REGISTERS;
+        const stdError = distinct <= 2.5 * HLL_REGISTERS
+            ? Math.sqrt(HLL_REGISTERS * (Math.exp(load) - load - 1))
+            : 1.04 / Math.sqrt(HLL_REGISTERS) * distinct;
+
+        const duplicates = this.timestamped - distinct;
+        return duplicates > 3 * stdError ? Math.round(duplicates) : 0;
+    }
+
+    summary() {
+        let qualityScore = 1.0;
+        const issues = [];
+        const missingRate = this.count > 0 ? this.missing / this.count : 0;
+
+        if (this.missing > 0) {
+            qualityScore -= missingRate * 0.3;
+            issues.push(`${Math.round(missingRate * 100)}% missing values`);
+        }
+
+        const duplicateTimestamps = this.estimateDuplicateTimestamps();
+        if (duplicateTimestamps > 0) {
+            qualityScore -= 0.1;
+            issues.push('Duplicate timestamps detected');
+        }
+
+        let variation = null;
+        if (this.numericCount > 0) {
+            const mean = this.sum / this.numericCount;
+            const variance = Math.max(0, this.sumSq / this.numericCount - mean * mean);
+            variation = {
+                min: this.min,
+                max: this.max,
+                range: this.max - this.min,
+                mean,
+                stdDev: Math.sqrt(variance)
+            };
+            if (variation.range === 0) {
+                qualityScore -= 0.2;
+                issues.push('No variation in values');
+            }
+        }
+
+        return {
+            score: Math.max(0, qualityScore),
+            issues,
+            totalPoints: this.count,
+            missingPoints: this.missing,
+            missingRate,
+            duplicateTimestamps,
+            variation
+        };
+    }
+
+    // Atomic upsert for the DataQuality collection, as an update pipeline so
+    // the stored timestamp set can be extended or dropped depending on the
+    // stored count. Counters add up, min/max and the sketch registers only
+    // move one way, so concurrent batches can be applied in any order.
+    toUpdate() {
+        const add = (field, amount) => ({ $add: [{ $ifNull: [`$${field}`, 0] }, amount] });
+        const set = {
+            count: add('count', this.count),
+            missing: add('missing', this.missing),
+            timestamped: add('timestamped', this.timestamped),
+            numericCount: add('numericCount', this.numericCount),
+            sum: add('sum', this.sum),
+            sumSq: add('sumSq', this.sumSq),
+            lastUpdated: new Date()
+        };
+
+        if (this.numericCount > 0) {
+            // $min/$max expressions skip a missing field
+            set.min = { $min: ['$min', this.min] };
+            set.max = { $max: ['$max', this.max] };
+        }
+
+        for (const [index, rank] of this.touched) {
+            set[`hll.${index}`] = { $max: [`$hll.${index}`, rank] };
+        }
+
+        // The set stays complete only if it was kept from the first point on
+        set.distinctTimestamps = this.timestamps
+            ? {
+                $cond: [
+                    {
+                        $and: [
+                            { $lte: [set.timestamped, EXACT_TIMESTAMP_LIMIT] },
+                            { $or: [{ $isArray: '$distinctTimestamps' }, { $eq: [{ $ifNull: ['$timestamped', 0] }, 0] }] }
+                        ]
+                    },
+                    { $setUnion: [{ $ifNull: ['$distinctTimestamps', []] }, [...this.timestamps].map(ms => new Date(ms))] },
+                    '$$REMOVE'
+                ]
+            }
+            : '$$REMOVE';
+
+        return [{ $set: set }];
+    }
+}
+
+module.exports = { DataQualityAggregator, EXACT_TIMESTAMP_LIMIT };
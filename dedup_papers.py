@@ -0,0 +1,207 @@
+# dedup_papers.py - Near-duplicate detection for research papers (MinHash + LSH)
+#
+# The same study often arrives from PMC, the publisher and OSDR under
+# different URLs. Each paper's title + summary is shingled into character
+# 5-grams and reduced to a 128-value MinHash signature, which is cut into
+# 16 bands of 8 rows. Band hashes are stored on the paper (dedup.bands, a
+# multikey index), so checking a new paper is one indexed lookup for papers
+# that share a band plus a signature comparison per candidate - never an
+# all-pairs scan.
+#
+# Usage:
+#   python dedup_papers.py                 # report duplicates among new papers
+#   python dedup_papers.py --apply         # also mark them with duplicateOf
+#   python dedup_papers.py --apply --merge # and fold their metadata into the original
+#                                          # (once per duplicate, recorded in mergedInto)
+#   python dedup_papers.py --watch --apply # process papers as they are inserted
+#   python dedup_papers.py --full          # re-sign every paper
+
+import argparse
+import hashlib
+import random
+import re
+import struct
+from datetime import datetime, timezone
+
+from ai_features import get_database
+
+SIGNATURE_VERSION = 1
+NUM_PERMUTATIONS = 128
+BANDS = 16
+ROWS_PER_BAND = NUM_PERMUTATIONS // BANDS
+SHINGLE_SIZE = 5
+MERSENNE_PRIME = (1 << 61) - 1
+MAX_HASH = (1 << 32) - 1
+DEFAULT_THRESHOLD = 0.8
+
+# Fixed seed: signatures stored in the database must stay comparable
+_rng = random.Random(20250101)
+PERMUTATIONS = [
+    (_rng.randrange(1, MERSENNE_PRIME), _rng.randrange(0, MERSENNE_PRIME))
+    for _ in range(NUM_PERMUTATIONS)
+]
+
+
+def normalize(text):
+    text = re.sub(r'[^a-z0-9]+', ' ', (text or '').lower())
+    return ' '.join(text.split())
+
+
+def shingles(text, size=SHINGLE_SIZE):
+    text = normalize(text)
+    if len(text) <= size:
+        return {text} if text else set()
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+
+def hash_shingle(shingle):
+    digest = hashlib.blake2b(shingle.encode('utf-8'), digest_size=4).digest()
+    return struct.unpack('<I', digest)[0]
+
+
+def minhash(shingle_set):
+    hashes = [hash_shingle(s) for s in shingle_set]
+    if not hashes:
+        return [MAX_HASH] * NUM_PERMUTATIONS
+    return [
+        min(((a * h + b) % MERSENNE_PRIME) & MAX_HASH for h in hashes)
+        for a, b in PERMUTATIONS
+    ]
+
+
+def band_keys(signature):
+    keys = []
+    for band in range(BANDS):
+        rows = signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND]
+        digest = hashlib.blake2b(struct.pack(f'<{ROWS_PER_BAND}I', *rows), digest_size=8)
+        keys.append(f'{band}:{digest.hexdigest()}')
+    return keys
+
+
+def estimate_similarity(sig_a, sig_b):
+    return sum(1 for a, b in zip(sig_a, sig_b) if a == b) / NUM_PERMUTATIONS
+
+
+def paper_text(paper):
+    return f"{paper.get('title', '')} {paper.get('summary', '')}"
+
+
+class PaperDeduplicator:
+    def __init__(self, db, threshold=DEFAULT_THRESHOLD, apply=False, merge=False):
+        self.papers = db.papers
+        self.threshold = threshold
+        self.apply = apply
+        self.merge = merge
+        self.papers.create_index('dedup.bands')
+        self.papers.create_index('duplicateOf', sparse=True)
+
+    def pending_papers(self, full=False):
+        query = {} if full else {'dedup.version': {'$ne': SIGNATURE_VERSION}}
+        # Oldest first, so the earliest copy of a study becomes the original
+        return self.papers.find(query, {'title': 1, 'summary': 1, 'url': 1}).sort('_id', 1)
+
+    def find_original(self, paper, signature, bands):
+        candidates = self.papers.find(
+            {
+                '_id': {'$lt': paper['_id']},
+                'dedup.bands': {'$in': bands},
+                'dedup.version': SIGNATURE_VERSION,
+            },
+            {'dedup.signature': 1, 'duplicateOf': 1, 'url': 1, 'title': 1}
+        )
+
+        best, best_score = None, 0.0
+        for candidate in candidates:
+            score = estimate_similarity(signature, candidate['dedup']['signature'])
+            if score >= self.threshold and score > best_score:
+                best, best_score = candidate, score
+        return best, best_score
+
+    def process(self, paper):
+        signature = minhash(shingles(paper_text(paper)))
+        bands = band_keys(signature)
+        original, score = self.find_original(paper, signature, bands)
+
+        update = {'$set': {'dedup': {
+            'version': SIGNATURE_VERSION,
+            'signature': signature,
+            'bands': bands,
+            'processedAt': datetime.now(timezone.utc),
+        }}}
+
+        if original is not None:
+            # Always point at the root of a duplicate chain
+            original_id = original.get('duplicateOf') or original['_id']
+            print(f"🔁 {paper.get('url')} duplicates {original.get('url')} (similarity {score:.2f})")
+            if self.apply:
+                update['$set']['duplicateOf'] = original_id
+                update['$set']['duplicateSimilarity'] = round(score, 3)
+                if self.merge:
+                    self.merge_into(original_id, paper['_id'])
+        elif self.apply:
+            update['$unset'] = {'duplicateOf': '', 'duplicateSimilarity': ''}
+
+        self.papers.update_one({'_id': paper['_id']}, update)
+        return original is not None
+
+    def merge_into(self, original_id, duplicate_id):
+        # Claim the duplicate first: downloads and views are added to the
+        # original, so reruns, --full and --watch must merge each paper once
+        duplicate = self.papers.find_one_and_update(
+            {'_id': duplicate_id, 'mergedInto': {'$exists': False}},
+            {'$set': {'mergedInto': original_id}},
+            {'url': 1, 'keywords': 1, 'categories': 1, 'citations': 1, 'downloads': 1, 'views': 1}
+        )
+        if duplicate is None:
+            return
+        self.papers.update_one({'_id': original_id}, {
+            '$addToSet': {
+                'alternateUrls': duplicate['url'],
+                'keywords': {'$each': duplicate.get('keywords') or []},
+                'categories': {'$each': duplicate.get('categories') or []},
+            },
+            '$max': {'citations': duplicate.get('citations') or 0},
+            '$inc': {
+                'downloads': duplicate.get('downloads') or 0,
+                'views': duplicate.get('views') or 0,
+            },
+        })
+
+    def run(self, full=False):
+        processed = duplicates = 0
+        for paper in self.pending_papers(full):
+            duplicates += self.process(paper)
+            processed += 1
+        return processed, duplicates
+
+    def watch(self):
+        """Process papers as they are inserted (requires a replica set)."""
+        pipeline = [{'$match': {'operationType': 'insert'}}]
+        with self.papers.watch(pipeline) as stream:
+            for change in stream:
+                self.process(change['fullDocument'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Detect near-duplicate papers')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='minimum estimated Jaccard similarity')
+    parser.add_argument('--apply', action='store_true', help='mark duplicates with duplicateOf')
+    parser.add_argument('--merge', action='store_true', help='fold duplicate metadata into the original')
+    parser.add_argument('--full', action='store_true', help='re-sign every paper')
+    parser.add_argument('--watch', action='store_true', help='keep running and process new inserts')
+    args = parser.parse_args()
+
+    dedup = PaperDeduplicator(get_database(), args.threshold, args.apply, args.merge)
+
+    print('🔍 Checking papers for near-duplicates...')
+    processed, duplicates = dedup.run(full=args.full)
+    print(f'✅ Processed {processed} papers, found {duplicates} near-duplicates')
+
+    if args.watch:
+        print('👀 Watching for new papers...')
+        dedup.watch()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,192 @@
+
+// downsample.js - Chart-ready downsampling of data point series
+
+// Downsampling runs in two stages (MinMaxLTTB). MongoDB first splits the time
+// range into fixed-width buckets and keeps only the lowest and highest reading
+// of each, so the number of documents leaving the database depends on the
+// point budget rather than on how long the experiment has run. Largest-
+// Triangle-Three-Buckets then picks the final points from that preselection,
+// keeping the visual shape of the series (peaks, dips, trends).
+//
+// Values are read in canonical units (numericValue, see units.js).
+//
+// The time range comes from the first and last matching reading, each found
+// with a sort and limit(1) on the (experimentId, timestamp) index rather than
+// a scan. When a preselection bucket is at least as wide as one of the
+// rollup resolutions (rollups.js), the buckets are read from those rollups
+// instead of from the raw readings, so long ranges cost one document per
+// rollup bucket; each such bucket contributes its min and max at the bucket
+// midpoint, and buckets at the edges of the range may include readings just
+// outside it.
+
+const { HAS_NUMERIC_VALUE, NUMERIC_VALUE } = require('./units');
+const { RESOLUTIONS, bucketStart } = require('./rollups');
+
+// Buckets preselected per output point; each bucket contributes two points
+const PRESELECT_RATIO = 2;
+
+// Largest-Triangle-Three-Buckets over points sorted by x:
+// [{ x, y, ... }] -> at most `threshold` of the same objects
+function lttb(points, threshold) {
+    if (threshold >= points.length || threshold < 3) {
+        return threshold < 3 ? points.slice(0, Math.max(threshold, 0)) : points;
+    }
+
+    const sampled = [points[0]];
+    const bucketSize = (points.length - 2) / (threshold - 2);
+    let previous = 0;
+
+    for (let i = 0; i < threshold - 2; i++) {
+        // Average of the next bucket is the third corner of the triangle
+        const nextStart = Math.floor((i + 1) * bucketSize) + 1;
+        const nextEnd = Math.min(Math.floor((i + 2) * bucketSize) + 1, points.length);
+        let avgX = 0;
+        let avgY = 0;
+        for (let j = nextStart; j < nextEnd; j++) {
+            avgX += points[j].x;
+            avgY += points[j].y;
+        }
+        avgX /= nextEnd - nextStart;
+        avgY /= nextEnd - nextStart;
+
+        const start = Math.floor(i * bucketSize) + 1;
+        const end = Math.floor((i + 1) * bucketSize) + 1;
+        const a = points[previous];
+        let maxArea = -1;
+        let chosen = start;
+
+        for (let j = start; j < end; j++) {
+            const area = Math.abs(
+                (a.x - avgX) * (points[j].y - a.y) - (a.x - points[j].x) * (avgY - a.y)
+            );
+            if (area > maxArea) {
+                maxArea = area;
+                chosen = j;
+            }
+        }
+
+        sampled.push(points[chosen]);
+        previous = chosen;
+    }
+
+    sampled.push(points[points.length - 1]);
+    return sampled;
+}
+
+// Aggregation stages that reduce numeric readings matching `match` to the
+// min and max reading of each time bucket, per measurementType.
+// Output documents: { _id: { measurementType, bucket }, low, high, count }
+function minMaxBucketStages(match, { from, to, buckets }) {
+    const width = Math.max(1, Math.ceil((to.getTime() - from.getTime() + 1) / buckets));
+
+    return [
+        { $match: { ...match, ...HAS_NUMERIC_VALUE } },
+        {
+            $group: {
+                _id: {
+                    measurementType: '$measurementType',
+                    bucket: {
+                        $floor: { $divide: [{ $subtract: ['$timestamp', from] }, width] }
+                    }
+                },
+                // Subdocuments compare by their first field, so these carry
+                // the timestamp of the extreme reading along with it
+                low: { $min: { value: NUMERIC_VALUE, timestamp: '$timestamp' } },
+                high: { $max: { value: NUMERIC_VALUE, timestamp: '$timestamp' } },
+                count: { $sum: 1 }
+            }
+        }
+    ];
+}
+
+// First and last timestamp of the numeric readings matching `match`, or
+// null when there are none
+async function seriesRange(model, match) {
+    const filter = { ...match, ...HAS_NUMERIC_VALUE };
+    const [first, last] = await Promise.all([
+        model.findOne(filter, { timestamp: 1 }).sort({ timestamp: 1 }).lean(),
+        model.findOne(filter, { timestamp: 1 }).sort({ timestamp: -1 }).lean()
+    ]);
+    if (!first || !last) return null;
+    return { from: first.timestamp, to: last.timestamp };
+}
+
+// Coarsest rollup resolution no wider than a preselection bucket, or null
+// when the range is too short for rollups
+function rollupResolution({ from, to }, buckets) {
+    const width = (to.getTime() - from.getTime() + 1) / buckets;
+    const fitting = RESOLUTIONS.filter(({ ms }) => ms <= width);
+    return fitting.length > 0 ? fitting[fitting.length - 1] : null;
+}
+
+// Rollups can answer a filter on experimentId, timestamp and measurementType
+// only
+function rollupFilter(match) {
+    const { experimentId, measurementType, timestamp, ...rest } = match;
+    if (typeof experimentId !== 'string' || Object.keys(rest).length > 0) return null;
+    if (measurementType !== undefined && typeof measurementType !== 'string') return null;
+    return measurementType === undefined ? { experimentId } : { experimentId, measurementType };
+}
+
+async function rollupPoints(rollupModel, filter, range, resolution) {
+    const rollups = await rollupModel.find({
+        ...filter,
+        resolution: resolution.name,
+        bucket: { $gte: bucketStart(range.from, resolution.ms), $lte: range.to }
+    }, { measurementType: 1, bucket: 1, count: 1, min: 1, max: 1 }).lean();
+
+    return rollups.map(rollup => {
+        const x = rollup.bucket.getTime() + resolution.ms / 2;
+        return {
+            measurementType: rollup.measurementType,
+            readings: rollup.count === 1 ? [{ x, y: rollup.min }] : [{ x, y: rollup.min }, { x, y: rollup.max }]
+        };
+    });
+}
+
+async function rawPoints(model, match, range, buckets) {
+    const groups = await model.aggregate(minMaxBucketStages(match, { from: range.from, to: range.to, buckets }));
+    return groups.map(bucket => ({
+        measurementType: bucket._id.measurementType,
+        readings: (bucket.count === 1 ? [bucket.low] : [bucket.low, bucket.high])
+            .map(reading => ({ x: reading.timestamp.getTime(), y: reading.value }))
+    }));
+}
+
+// Series per measurementType with at most maxPoints points each; pass the
+// rollup model as rollupModel to serve long ranges from rollups.
+// Returns { [measurementType]: [{ timestamp, value }] }
+async function downsampleSeries(model, match, maxPoints, { rollupModel } = {}) {
+    const range = await seriesRange(model, match);
+    if (!range) return {};
+
+    const buckets = maxPoints * PRESELECT_RATIO;
+    const filter = rollupModel ? rollupFilter(match) : null;
+    const resolution = filter ? rollupResolution(range, buckets) : null;
+    const preselected = resolution
+        ? await rollupPoints(rollupModel, filter, range, resolution)
+        : await rawPoints(model, match, range, buckets);
+
+    const byType = new Map();
+    for (const { measurementType, readings } of preselected) {
+        if (!byType.has(measurementType)) byType.set(measurementType, []);
+        byType.get(measurementType).push(...readings);
+    }
+
+    const series = {};
+    for (const [type, points] of byType) {
+        points.sort((a, b) => a.x - b.x);
+        series[type] = lttb(points, maxPoints).map(point => ({
+            timestamp: new Date(point.x),
+            value: point.y
+        }));
+    }
+    return series;
+}
+
+module.exports = {
+    lttb,
+    minMaxBucketStages,
+    rollupResolution,
+    downsampleSeries
+};
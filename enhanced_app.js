@@ -8,8 +8,24 @@ const API_BASE_URL = '/api';
 const WEBSOCKET_URL = `ws://${window.location.host}`;
 
 // API Service Class
+const VALIDATED_CACHE_SIZE = 100;
+
 class APIService {
+    // url -> { etag, data, response } of the last 200 response
+    static validated = new Map();
+
     static async request(endpoint, options = {}) {
+        const { data } = await this.send(endpoint, options);
+        return data;
+    }
+
+    // Paginated listings return the cursor for the next page in X-Next-Cursor
+    static async requestPage(endpoint) {
+        const { data, response } = await this.send(endpoint);
+        return { items: data, nextCursor: response.headers.get('X-Next-Cursor') };
+    }
+
+    static async send(endpoint, options = {}) {
         const url = `${API_BASE_URL}${endpoint}`;
         const config = {
             headers: {
@@ -22,15 +38,36 @@ class APIService {
             config.body = JSON.stringify(config.body);
         }
 
+        // GETs revalidate with the ETag of the copy we already hold, so an
+        // unchanged resource costs a 304 instead of the whole payload
+        const method = (config.method || 'GET').toUpperCase();
+        const cached = method === 'GET' ? this.validated.get(url) : null;
+        if (cached) {
+            config.headers = { ...config.headers, 'If-None-Match': cached.etag };
+        }
+
         try {
             const response = await fetch(url, config);
+            if (response.status === 304 && cached) {
+                return { data: cached.data, response: cached.response };
+            }
+
             const data = await response.json();
 
             if (!response.ok) {
                 throw new Error(data.error || 'API request failed');
             }
 
-            return data;
+            const etag = response.headers.get('ETag');
+            if (method === 'GET' && etag) {
+                this.validated.delete(url);
+                this.validated.set(url, { etag, data, response });
+                if (this.validated.size > VALIDATED_CACHE_SIZE) {
+                    this.validated.delete(this.validated.keys().next().value);
+                }
+            }
+
+            return { data, response };
         } catch (error) {
             console.error('API Error:', error);
             throw error;
@@ -43,10 +80,41 @@ class APIService {
         return this.request(`/experiments?${params}`);
     }
 
+    static getExperimentsPage(filters = {}, cursor = null) {
+        const params = new URLSearchParams(filters);
+        if (cursor) params.set('cursor', cursor);
+        return this.requestPage(`/experiments?${params}`);
+    }
+
+    static getSuggestions(query, limit = 5) {
+        const params = new URLSearchParams({ q: query, limit });
+        return this.request(`/suggest?${params}`);
+    }
+
+    static getExperimentFacets(filters = {}) {
+        const params = new URLSearchParams(filters);
+        return this.request(`/experiments/facets?${params}`);
+    }
+
     static getExperiment(id) {
         return this.request(`/experiments/${id}`);
     }
 
+    static getDataQuality(id) {
+        return this.request(`/experiments/${id}/quality`);
+    }
+
+    // Running statistics maintained at ingest: count, last update, and
+    // latest/min/max/mean per measurement type
+    static getExperimentSummary(id) {
+        return this.request(`/experiments/${id}/summary`);
+    }
+
+    static getExperimentSummaries(ids) {
+        const params = new URLSearchParams({ ids: ids.join(',') });
+        return this.request(`/experiments/summaries?${params}`);
+    }
+
     static createExperiment(data) {
         return this.request('/experiments', {
             method: 'POST',
@@ -55,8 +123,14 @@ class APIService {
     }
 
     // Data Points APIs
-    static getDataPoints(experimentId) {
-        return this.request(`/data-points/${experimentId}`);
+    static getDataPoints(experimentId, filters = {}) {
+        const params = new URLSearchParams(filters);
+        return this.request(`/data-points/${experimentId}?${params}`);
+    }
+
+    // Downsampled series per measurementType, sized for a chart
+    static getDataSeries(experimentId, maxPoints = 400) {
+        return this.request(`/data-points/${experimentId}?maxPoints=${maxPoints}`);
     }
 
     static addDataPoint(data) {
@@ -264,6 +338,7 @@ const SearchSection = ({
     missionFilter, setMissionFilter 
 }) => {
     const [suggestions, setSuggestions] = useState([]);
+    const [facets, setFacets] = useState(null);
     const [isLoading, setIsLoading] = useState(false);
 
     const handleSearch = async (e) => {
@@ -277,19 +352,18 @@ const SearchSection = ({
     };
 
     useEffect(() => {
-        if (searchQuery.length > 2) {
+        if (searchQuery.length > 0) {
+            // Suggestions come from an in-memory prefix index, so a short
+            // debounce is enough to keep up with typing
             const timer = setTimeout(async () => {
                 try {
-                    const results = await APIService.getExperiments({ 
-                        search: searchQuery, 
-                        limit: 5 
-                    });
-                    setSuggestions(results.slice(0, 5));
+                    const results = await APIService.getSuggestions(searchQuery, 5);
+                    setSuggestions(results);
                 } catch (error) {
                     console.error('Search suggestions error:', error);
                     setSuggestions([]);
                 }
-            }, 300);
+            }, 100);
 
             return () => clearTimeout(timer);
         } else {
@@ -297,6 +371,41 @@ const SearchSection = ({
         }
     }, [searchQuery]);
 
+    useEffect(() => {
+        const timer = setTimeout(async () => {
+            try {
+                const filters = {};
+                if (categoryFilter) filters.category = categoryFilter;
+                if (missionFilter) filters.mission = missionFilter;
+                if (searchQuery) filters.search = searchQuery;
+                setFacets(await APIService.getExperimentFacets(filters));
+            } catch (error) {
+                console.error('Facet counts error:', error);
+                setFacets(null);
+            }
+        }, 300);
+
+        return () => clearTimeout(timer);
+    }, [searchQuery, categoryFilter, missionFilter]);
+
+    // Mission buckets are keyed by the lowercased family the filter matches
+    const facetKey = (facet, value) => (facet === 'mission' ? value.toLowerCase() : value);
+
+    const facetLabel = (facet, value) => {
+        if (!facets) return value;
+        const bucket = facets[facet].find(b => b._id === facetKey(facet, value));
+        return `${value} (${bucket ? bucket.count : 0})`;
+    };
+
+    const missionOptions = ['Moon', 'Mars', 'ISS'];
+    if (facets) {
+        facets.mission.forEach(b => {
+            if (b._id && !missionOptions.some(option => facetKey('mission', option) === b._id)) {
+                missionOptions.push(b.name || b._id);
+            }
+        });
+    }
+
     const handleSuggestionClick = (title) => {
         setSearchQuery(title);
         setSuggestions([]);
@@ -323,12 +432,14 @@ const SearchSection = ({
                 <div className="suggestions" role="listbox">
                     {suggestions.map((s) => (
                         <button 
-                            key={s.id} 
+                            key={`${s.type}:${s.ref}`} 
                             className="suggestion-item" 
-                            onClick={() => handleSuggestionClick(s.title)}
+                            onClick={() => handleSuggestionClick(s.text)}
                         >
-                            {s.title}
-                            <small className="suggestion-meta">{s.id}</small>
+                            {s.text}
+                            <small className="suggestion-meta">
+                                {s.type === 'experiment' ? s.ref : s.type}
+                            </small>
                         </button>
                     ))}
                 </div>
@@ -343,10 +454,11 @@ const SearchSection = ({
                         onChange={(e) => setCategoryFilter(e.target.value)}
                     >
                         <option value="">All Categories</option>
-                        <option value="Plant Biology">Plant Biology</option>
-                        <option value="Cell Biology">Cell Biology</option>
-                        <option value="Microbiology">Microbiology</option>
-                        <option value="Animal Biology">Animal Biology</option>
+                        {['Plant Biology', 'Cell Biology', 'Microbiology', 'Animal Biology'].map(category => (
+                            <option key={category} value={category}>
+                                {facetLabel('category', category)}
+                            </option>
+                        ))}
                     </select>
                 </div>
 
@@ -358,9 +470,11 @@ const SearchSection = ({
                         onChange={(e) => setMissionFilter(e.target.value)}
                     >
                         <option value="">All Missions</option>
-                        <option value="Moon">Moon</option>
-                        <option value="Mars">Mars</option>
-                        <option value="ISS">ISS</option>
+                        {missionOptions.map(mission => (
+                            <option key={mission} value={mission}>
+                                {facetLabel('mission', mission)}
+                            </option>
+                        ))}
                     </select>
                 </div>
             </div>
@@ -471,6 +585,9 @@ const AISummary = ({ searchQuery, isLoading }) => {
 // Enhanced Experiments Grid with Backend Data
 const ExperimentsGrid = ({ categoryFilter, missionFilter, searchQuery }) => {
     const [experiments, setExperiments] = useState([]);
+    const [summaries, setSummaries] = useState({});
+    const [nextCursor, setNextCursor] = useState(null);
+    const [isLoadingMore, setIsLoadingMore] = useState(false);
     const [isLoading, setIsLoading] = useState(true);
     const [error, setError] = useState(null);
     const [selectedExperiment, setSelectedExperiment] = useState(null);
@@ -479,18 +596,40 @@ const ExperimentsGrid = ({ categoryFilter, missionFilter, searchQuery }) => {
         loadExperiments();
     }, [categoryFilter, missionFilter, searchQuery]);
 
+    const currentFilters = () => {
+        const filters = {};
+        if (categoryFilter) filters.category = categoryFilter;
+        if (missionFilter) filters.mission = missionFilter;
+        if (searchQuery) filters.search = searchQuery;
+        return filters;
+    };
+
+    // Card statistics arrive separately so a slow summary read never holds
+    // back the grid
+    const loadSummaries = async (items) => {
+        const ids = items.map(experiment => experiment.id).filter(Boolean);
+        if (ids.length === 0) return;
+        try {
+            const loaded = await APIService.getExperimentSummaries(ids);
+            setSummaries(prev => {
+                const next = { ...prev };
+                loaded.forEach(summary => { next[summary.experimentId] = summary; });
+                return next;
+            });
+        } catch (error) {
+            console.error('Error loading experiment summaries:', error);
+        }
+    };
+
     const loadExperiments = async () => {
         setIsLoading(true);
         setError(null);
 
         try {
-            const filters = {};
-            if (categoryFilter) filters.category = categoryFilter;
-            if (missionFilter) filters.mission = missionFilter;
-            if (searchQuery) filters.search = searchQuery;
-
-            const data = await APIService.getExperiments(filters);
-            setExperiments(data);
+            const page = await APIService.getExperimentsPage(currentFilters());
+            setExperiments(page.items);
+            setNextCursor(page.nextCursor);
+            loadSummaries(page.items);
         } catch (error) {
             console.error('Error loading experiments:', error);
             setError(error.message);
@@ -499,6 +638,20 @@ const ExperimentsGrid = ({ categoryFilter, missionFilter, searchQuery }) => {
         }
     };
 
+    const loadMoreExperiments = async () => {
+        setIsLoadingMore(true);
+        try {
+            const page = await APIService.getExperimentsPage(currentFilters(), nextCursor);
+            setExperiments(prev => [...prev, ...page.items]);
+            setNextCursor(page.nextCursor);
+            loadSummaries(page.items);
+        } catch (error) {
+            console.error('Error loading more experiments:', error);
+        } finally {
+            setIsLoadingMore(false);
+        }
+    };
+
     const getCategoryClass = (category) => {
         const categoryMap = {
             'Plant Biology': 'category-plant',
@@ -536,6 +689,7 @@ const ExperimentsGrid = ({ categoryFilter, missionFilter, searchQuery }) => {
                     <ExperimentCard
                         key={experiment.id || experiment._id}
                         experiment={experiment}
+                        summary={summaries[experiment.id]}
                         onOpen={() => setSelectedExperiment(experiment)}
                         getCategoryClass={getCategoryClass}
                     />
@@ -548,6 +702,18 @@ const ExperimentsGrid = ({ categoryFilter, missionFilter, searchQuery }) => {
                 )}
             </div>
 
+            {nextCursor && (
+                <div className="load-more">
+                    <button
+                        onClick={loadMoreExperiments}
+                        className="btn btn--outline"
+                        disabled={isLoadingMore}
+                    >
+                        {isLoadingMore ? 'Loading...' : 'Load more experiments'}
+                    </button>
+                </div>
+            )}
+
             {selectedExperiment && (
                 <ExperimentModal
                     experiment={selectedExperiment}
@@ -558,8 +724,41 @@ const ExperimentsGrid = ({ categoryFilter, missionFilter, searchQuery }) => {
     );
 };
 
+// Line chart of a downsampled series from /api/data-points?maxPoints=
+const Sparkline = ({ points, width = 400, height = 60 }) => {
+    if (points.length < 2) return null;
+
+    const times = points.map(p => new Date(p.timestamp).getTime());
+    const values = points.map(p => p.value);
+    const [t0, t1] = [Math.min(...times), Math.max(...times)];
+    const [v0, v1] = [Math.min(...values), Math.max(...values)];
+    const x = t => ((t - t0) / (t1 - t0 || 1)) * width;
+    const y = v => height - ((v - v0) / (v1 - v0 || 1)) * height;
+
+    return (
+        <svg className="sparkline" viewBox={`0 0 ${width} ${height}`} preserveAspectRatio="none">
+            <polyline points={points.map((p, i) => `${x(times[i])},${y(values[i])}`).join(' ')} />
+        </svg>
+    );
+};
+
 // Enhanced Experiment Card with AI Analysis
-const ExperimentCard = ({ experiment, onOpen, getCategoryClass }) => {
+// Renders search highlight offsets returned by /api/experiments
+const HighlightedText = ({ text, ranges }) => {
+    if (!ranges || ranges.length === 0) return text;
+
+    const parts = [];
+    let cursor = 0;
+    ranges.forEach(([start, end]) => {
+        if (start > cursor) parts.push(text.slice(cursor, start));
+        parts.push(<mark key={start}>{text.slice(start, end)}</mark>);
+        cursor = end;
+    });
+    parts.push(text.slice(cursor));
+    return <>{parts}</>;
+};
+
+const ExperimentCard = ({ experiment, summary, onOpen, getCategoryClass }) => {
     const handleKeyDown = (e) => {
         if (e.key === 'Enter' || e.key === ' ') {
             e.preventDefault();
@@ -582,8 +781,12 @@ const ExperimentCard = ({ experiment, onOpen, getCategoryClass }) => {
                 </div>
             </div>
 
-            <h3 className="experiment-title">{experiment.title}</h3>
-            <p className="experiment-description">{experiment.description}</p>
+            <h3 className="experiment-title">
+                <HighlightedText text={experiment.title} ranges={experiment.highlights?.title} />
+            </h3>
+            <p className="experiment-description">
+                <HighlightedText text={experiment.description} ranges={experiment.highlights?.description} />
+            </p>
 
             {/* AI Analysis Indicators */}
             {experiment.aiAnalysis && (
@@ -613,6 +816,13 @@ const ExperimentCard = ({ experiment, onOpen, getCategoryClass }) => {
                 <div><strong>Mission:</strong> {experiment.mission}</div>
                 <div><strong>Impact:</strong> {experiment.impact}</div>
             </div>
+
+            {summary && summary.count > 0 && (
+                <div className="experiment-stats">
+                    📊 {summary.count.toLocaleString()} data points
+                    {summary.lastTimestamp && ` • last reading ${new Date(summary.lastTimestamp).toLocaleString()}`}
+                </div>
+            )}
         </div>
     );
 };
@@ -820,9 +1030,15 @@ const Dashboard = () => {
 };
 
 // Enhanced Modal Component
+const formatReading = (value) =>
+    typeof value === 'number' ? value.toLocaleString(undefined, { maximumFractionDigits: 2 }) : value;
+
 const ExperimentModal = ({ experiment, onClose }) => {
-    const [dataPoints, setDataPoints] = useState([]);
+    const [summary, setSummary] = useState(null);
+    const [dataSeries, setDataSeries] = useState({});
     const [aiPrediction, setAiPrediction] = useState(null);
+    const [dataQuality, setDataQuality] = useState(null);
+    const [relatedPapers, setRelatedPapers] = useState([]);
     const [isLoadingData, setIsLoadingData] = useState(true);
 
     useEffect(() => {
@@ -835,13 +1051,23 @@ const ExperimentModal = ({ experiment, onClose }) => {
         try {
             setIsLoadingData(true);
 
-            // Load data points
-            const data = await APIService.getDataPoints(experiment.id);
-            setDataPoints(data);
+            // Running statistics plus downsampled series, so the payload
+            // stays the same size however long the experiment has run
+            setSummary(await APIService.getExperimentSummary(experiment.id));
+            const { series } = await APIService.getDataSeries(experiment.id);
+            setDataSeries(series);
 
             // Get AI prediction
             const prediction = await APIService.predictOutcome(experiment);
             setAiPrediction(prediction);
+
+            // Quality is aggregated at ingest time, so this is a single lookup
+            const quality = await APIService.getDataQuality(experiment.id);
+            setDataQuality(quality);
+
+            // Related papers are linked offline by link_experiments_papers.py
+            const details = await APIService.getExperiment(experiment.id);
+            setRelatedPapers(details.relatedPapers || []);
         } catch (error) {
             console.error('Error loading experiment data:', error);
         } finally {
@@ -922,18 +1148,57 @@ const ExperimentModal = ({ experiment, onClose }) => {
                     </div>
                 )}
 
+                {relatedPapers.length > 0 && (
+                    <div className="related-papers">
+                        <h3>📄 Related Papers</h3>
+                        <ul>
+                            {relatedPapers.map((paper) => (
+                                <li key={paper._id}>
+                                    <a href={paper.url} target="_blank" rel="noopener noreferrer">
+                                        {paper.title}
+                                    </a>
+                                </li>
+                            ))}
+                        </ul>
+                    </div>
+                )}
+
                 {/* Data Points Section */}
-                {dataPoints.length > 0 && (
+                {summary && summary.count > 0 && (
                     <div className="data-points-section">
-                        <h3>📊 Recent Data ({dataPoints.length} points)</h3>
+                        <h3>
+                            📊 Recent Data ({summary.count.toLocaleString()} points)
+                        </h3>
+                        {dataQuality && dataQuality.totalPoints > 0 && (
+                            <div className="metric">
+                                <span className="metric-label">Data Quality:</span>
+                                <span className="metric-value">
+                                    {(dataQuality.score * 100).toFixed(0)}%
+                                    {dataQuality.issues.length > 0 && ` (${dataQuality.issues.join(', ')})`}
+                                </span>
+                            </div>
+                        )}
                         <div className="data-points-summary">
-                            {dataPoints.slice(0, 5).map((point, index) => (
-                                <div key={index} className="data-point">
-                                    <span className="data-type">{point.measurementType}:</span>
-                                    <span className="data-value">{point.value} {point.unit}</span>
+                            {Object.entries(summary.measurements).map(([type, stats]) => (
+                                <div key={type} className="data-point">
+                                    <span className="data-type">{type}:</span>
+                                    <span className="data-value">
+                                        {stats.latest ? `${formatReading(stats.latest.value)} ${stats.latest.unit || ''}` : '—'}
+                                    </span>
+                                    {stats.mean !== null && (
+                                        <span className="data-range">
+                                            min {formatReading(stats.min)} • mean {formatReading(stats.mean)} • max {formatReading(stats.max)}
+                                        </span>
+                                    )}
                                 </div>
                             ))}
                         </div>
+                        {Object.entries(dataSeries).map(([type, points]) => (
+                            <div key={type} className="data-series">
+                                <span className="data-type">{type}</span>
+                                <Sparkline points={points} />
+                            </div>
+                        ))}
                     </div>
                 )}
 
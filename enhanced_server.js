@@ -5,11 +5,34 @@ const cors = require('cors');
 const path = require('path');
 const axios = require('axios');
 require('dotenv').config();
+const cron = require('node-cron');
 
 // AI/ML libraries
 const tf = require('@tensorflow/tfjs-node');
 const natural = require('natural');
 
+const { DataQualityAggregator } = require('./data-quality');
+const {
+    MISSION_FAMILY,
+    highlightOffsets,
+    migrateTextIndex,
+    missionFamily
+} = require('./text-search');
+const { TrigramIndex } = require('./trigram-index');
+const { PrefixIndex } = require('./prefix-index');
+const { findPage, keysetQuery, pageSize, InvalidCursorError } = require('./pagination');
+const { downsampleSeries } = require('./downsample');
+const { AnalyticsSnapshot, ACTIVE_WINDOW_MS } = require('./analytics-snapshot');
+const { SingleFlight, requestKey } = require('./single-flight');
+const { createResponseCache } = require('./response-cache');
+const { BufferFullError, DeriveQueue, createIngestBuffer } = require('./ingest-buffer');
+const { ImportStorage } = require('./data-import');
+const { RotatingBloomFilter } = require('./bloom-filter');
+const { toCanonical } = require('./units');
+const { formatSummary, summaryOperations } = require('./experiment-summary');
+const multer = require('multer');
+const { RESOLUTIONS, bucketStart, rollupOperations, chooseResolution, summarizeRollup } = require('./rollups');
+
 const app = express();
 const PORT = process.env.PORT || 3000;
 const MONGODB_URI = process.env.MONGODB_URI || 'mongodb://localhost:27017/nasa_space_biology';
@@ -27,7 +50,15 @@ mongoose.connect(MONGODB_URI, {
 })
 .then(() => {
     console.log('🔗 Connected to MongoDB Atlas/Local');
-    initializeData();
+    // Sole owner of the experiments text index (not declared on the schema)
+    migrateTextIndex(Experiment.collection).catch(error => console.error('❌ Text index migration error:', error));
+    Experiment.updateMany({ missionFamily: { $exists: false } }, [{ $set: { missionFamily: MISSION_FAMILY } }])
+        .catch(error => console.error('❌ Mission family backfill error:', error));
+    initializeData().then(() => Promise.all([
+        rebuildSearchIndexes(),
+        refreshAnalytics(),
+        DataProcessor.loadSeenKeys().catch(error => console.error('❌ Idempotency filter load error:', error))
+    ]));
 })
 .catch(err => console.error('❌ MongoDB connection error:', err));
 
@@ -39,14 +70,23 @@ const ExperimentSchema = new mongoose.Schema({
     impact: { type: String, required: true },
     organism: { type: String, required: true },
     mission: { type: String, required: true },
+    // Lowercased first word of mission, see missionFamily in text-search.js
+    missionFamily: { type: String, index: true },
     duration: { type: String, required: true },
     category: { 
         type: String, 
         enum: ['Plant Biology', 'Cell Biology', 'Microbiology', 'Animal Biology'],
         required: true 
     },
+    status: {
+        type: String,
+        enum: ['planned', 'active', 'completed', 'cancelled'],
+        default: 'planned'
+    },
     dateCreated: { type: Date, default: Date.now },
     dataPoints: [{ type: mongoose.Schema.Types.ObjectId, ref: 'DataPoint' }],
+    // Populated by link_experiments_papers.py
+    relatedPapers: [{ type: mongoose.Schema.Types.ObjectId, ref: 'Paper' }],
     aiAnalysis: {
         sentiment: Number,
         complexity: Number,
@@ -55,17 +95,88 @@ const ExperimentSchema = new mongoose.Schema({
     }
 });
 
+// The EXPERIMENT_TEXT_INDEX text index is owned by migrateTextIndex (see the
+// connection setup), not autoIndex, so the two never race to replace the
+// single text index a collection may have
+ExperimentSchema.pre('validate', function () {
+    this.missionFamily = missionFamily(this.mission);
+});
+// Keyset pagination over (dateCreated, _id), with and without a category filter
+ExperimentSchema.index({ dateCreated: -1, _id: -1 });
+ExperimentSchema.index({ category: 1, dateCreated: -1, _id: -1 });
+
 const DataPointSchema = new mongoose.Schema({
     experimentId: { type: String, required: true },
     timestamp: { type: Date, default: Date.now },
     measurementType: { type: String, required: true },
     value: { type: mongoose.Schema.Types.Mixed, required: true },
     unit: String,
+    // value in the canonical unit of measurementType (units.js); null when
+    // the reading is not numeric or its unit is unknown
+    numericValue: Number,
+    numericUnit: String,
     quality: { type: Number, min: 0, max: 1 },
     source: { type: String, default: 'ISS' },
-    processed: { type: Boolean, default: false }
+    sensor: String,
+    processed: { type: Boolean, default: false },
+    // Client-supplied, or experimentId|sensor|measurementType|timestamp
+    idempotencyKey: String
+});
+
+// Time-range reads and keyset pages over (timestamp, _id) per experiment
+DataPointSchema.index({ experimentId: 1, timestamp: -1, _id: -1 });
+// A retried reading is stored once
+DataPointSchema.index(
+    { idempotencyKey: 1 },
+    { unique: true, partialFilterExpression: { idempotencyKey: { $type: 'string' } } }
+);
+
+// Running data quality state per experiment, maintained at ingest time
+const DataQualitySchema = new mongoose.Schema({
+    experimentId: { type: String, required: true, unique: true },
+    count: { type: Number, default: 0 },
+    missing: { type: Number, default: 0 },
+    timestamped: { type: Number, default: 0 },
+    numericCount: { type: Number, default: 0 },
+    sum: { type: Number, default: 0 },
+    sumSq: { type: Number, default: 0 },
+    min: Number,
+    max: Number,
+    hll: { type: mongoose.Schema.Types.Mixed, default: {} },
+    // Distinct timestamps while there are few enough to count exactly
+    distinctTimestamps: { type: [Date], default: undefined },
+    lastUpdated: Date
+}, { minimize: false });
+
+// Time-series rollups of numeric readings, see rollups.js
+const DataPointRollupSchema = new mongoose.Schema({
+    experimentId: { type: String, required: true },
+    measurementType: { type: String, required: true },
+    resolution: { type: String, enum: RESOLUTIONS.map(r => r.name), required: true },
+    bucket: { type: Date, required: true },
+    count: Number,
+    sum: Number,
+    sumSq: Number,
+    min: Number,
+    max: Number
 });
 
+DataPointRollupSchema.index(
+    { experimentId: 1, resolution: 1, measurementType: 1, bucket: 1 },
+    { unique: true }
+);
+
+// Running statistics per experiment, see experiment-summary.js
+const ExperimentSummarySchema = new mongoose.Schema({
+    experimentId: { type: String, required: true, unique: true },
+    count: { type: Number, default: 0 },
+    firstTimestamp: Date,
+    lastTimestamp: Date,
+    // measurementType -> { count, numericCount, sum, min, max, latest: { timestamp, value, unit } }
+    measurements: { type: mongoose.Schema.Types.Mixed, default: {} },
+    updatedAt: Date
+}, { minimize: false });
+
 const PaperSchema = new mongoose.Schema({
     title: { type: String, required: true },
     summary: { type: String, required: true },
@@ -74,15 +185,23 @@ const PaperSchema = new mongoose.Schema({
     publishDate: Date,
     authors: [String],
     keywords: [String],
-    citations: { type: Number, default: 0 }
+    citations: { type: Number, default: 0 },
+    // Set by dedup_papers.py when this paper is a near-duplicate of another
+    duplicateOf: { type: mongoose.Schema.Types.ObjectId, ref: 'Paper' },
+    alternateUrls: [String]
 });
 
+// Keyset pagination over (relevance, _id) for the non-duplicate listing
+PaperSchema.index({ duplicateOf: 1, relevance: -1, _id: -1 });
+
 const AnalyticsSchema = new mongoose.Schema({
     date: { type: Date, default: Date.now },
     totalExperiments: Number,
     activeExperiments: Number,
     dataPointsProcessed: Number,
     aiInsights: [String],
+    categoryDistribution: mongoose.Schema.Types.Mixed,
+    missionDistribution: mongoose.Schema.Types.Mixed,
     trendsIdentified: mongoose.Schema.Types.Mixed,
     predictions: mongoose.Schema.Types.Mixed
 });
@@ -92,6 +211,9 @@ const Experiment = mongoose.model('Experiment', ExperimentSchema);
 const DataPoint = mongoose.model('DataPoint', DataPointSchema);
 const Paper = mongoose.model('Paper', PaperSchema);
 const Analytics = mongoose.model('Analytics', AnalyticsSchema);
+const DataQuality = mongoose.model('DataQuality', DataQualitySchema);
+const DataPointRollup = mongoose.model('DataPointRollup', DataPointRollupSchema);
+const ExperimentSummary = mongoose.model('ExperimentSummary', ExperimentSummarySchema);
 
 // AI/ML Utilities
 class AIAnalyzer {
@@ -142,29 +264,223 @@ class AIAnalyzer {
     }
 }
 
+// Idempotency keys of stored data points. Keys the filter has not seen are
+// new, so the duplicate lookup is only paid on possible hits; the unique
+// index stays the authority, so keys missing from the filter (stored by
+// another process, or before the recent window loaded at startup) are still
+// caught as duplicate key errors. The filter rotates on the same window as
+// the startup load, so its false positive rate stays near 1% however long
+// the process runs.
+const SEEN_KEYS_WINDOW_MS = 24 * 60 * 60 * 1000;
+const seenKeys = new RotatingBloomFilter(
+    parseInt(process.env.IDEMPOTENCY_FILTER_CAPACITY, 10) || 1000000,
+    SEEN_KEYS_WINDOW_MS
+);
+
+// Derived state of points stored by the synchronous ingest paths whose
+// afterInsert failed (see DeriveQueue in ingest-buffer.js)
+const deriveRetry = new DeriveQueue(points => DataProcessor.afterInsert(points));
+
+function isDuplicateKeyError(error) {
+    return error && error.code === 11000;
+}
+
 // Data Processing Pipeline
 class DataProcessor {
+    // Stores one point; a point whose idempotency key is already stored is
+    // not written again and the stored document is returned with
+    // duplicate: true
     static async processRealTimeData(dataPoint) {
-        // Validate data quality
-        const quality = this.calculateQuality(dataPoint);
+        const existing = await this.findDuplicate(dataPoint);
+        if (existing) return { dataPoint: existing, duplicate: true };
+
+        // Store in database
+        let savedDataPoint;
+        try {
+            savedDataPoint = await DataPoint.create(this.prepare(dataPoint));
+        } catch (error) {
+            if (!isDuplicateKeyError(error)) throw error;
+            const stored = await DataPoint.findOne({ idempotencyKey: this.idempotencyKey(dataPoint) }).lean();
+            return { dataPoint: stored, duplicate: true };
+        }
+        await this.deriveOrDefer([savedDataPoint]);
+
+        // Trigger AI analysis if quality is high
+        if (savedDataPoint.quality > 0.8) {
+            this.triggerAIAnalysis(savedDataPoint);
+        }
+
+        return { dataPoint: savedDataPoint, duplicate: false };
+    }
+
+    // A client-supplied key wins; otherwise a reading is identified by the
+    // sensor (or source, when none is named) and when it was taken. Points
+    // without a timestamp get the server time and cannot be recognised when
+    // retried. A prepared point carries its key, or null when it had none,
+    // so the timestamp stamped during preparation never produces one later.
+    static idempotencyKey(dataPoint) {
+        if (typeof dataPoint.idempotencyKey === 'string' && dataPoint.idempotencyKey !== '') {
+            return dataPoint.idempotencyKey;
+        }
+        if (dataPoint.idempotencyKey === null) return undefined;
+        const timestamp = dataPoint.timestamp ? new Date(dataPoint.timestamp) : null;
+        if (!timestamp || Number.isNaN(timestamp.getTime())) return undefined;
+        return [
+            dataPoint.experimentId,
+            dataPoint.sensor || dataPoint.source || 'ISS',
+            dataPoint.measurementType,
+            timestamp.toISOString()
+        ].join('|');
+    }
+
+    // Stored points for the keys the filter may have seen: key -> _id
+    static async findStoredKeys(keys) {
+        const candidates = keys.filter(key => key !== undefined && seenKeys.mightContain(key));
+        if (candidates.length === 0) return new Map();
+
+        const stored = await DataPoint.find({ idempotencyKey: { $in: candidates } }, { idempotencyKey: 1 }).lean();
+        return new Map(stored.map(doc => [doc.idempotencyKey, doc._id]));
+    }
+
+    static async findDuplicate(dataPoint) {
+        const key = this.idempotencyKey(dataPoint);
+        if (key === undefined || !seenKeys.mightContain(key)) return null;
+        return DataPoint.findOne({ idempotencyKey: key }).lean();
+    }
+
+    // Loads the keys stored recently, where retries land
+    static async loadSeenKeys() {
+        const since = mongoose.Types.ObjectId.createFromTime(Math.floor((Date.now() - SEEN_KEYS_WINDOW_MS) / 1000));
+        const cursor = DataPoint.find(
+            { _id: { $gte: since }, idempotencyKey: { $type: 'string' } },
+            { idempotencyKey: 1, _id: 0 }
+        ).lean().cursor({ batchSize: 5000 });
+        for await (const { idempotencyKey } of cursor) seenKeys.add(idempotencyKey);
+        console.log(`🧮 Idempotency filter loaded with ${seenKeys.count} recent keys`);
+    }
 
-        // Apply filters and transformations
-        const processed = {
+    // Validate data quality and apply filters and transformations
+    static prepare(dataPoint) {
+        const numeric = toCanonical(dataPoint.measurementType, dataPoint.value, dataPoint.unit);
+        return {
             ...dataPoint,
-            quality,
+            numericValue: numeric ? numeric.numericValue : null,
+            numericUnit: numeric ? numeric.numericUnit : undefined,
+            idempotencyKey: this.idempotencyKey(dataPoint) ?? null,
+            quality: this.calculateQuality(dataPoint),
             processed: true,
             processedAt: new Date()
         };
+    }
 
-        // Store in database
-        const savedDataPoint = await DataPoint.create(processed);
+    // Prepared DataPoint document for a raw item, or the reason it is rejected
+    static validate(item) {
+        if (!item || typeof item !== 'object' || Array.isArray(item)) {
+            return { error: 'Data point must be a JSON object' };
+        }
+        const document = new DataPoint(this.prepare(item));
+        const validationError = document.validateSync();
+        return validationError ? { error: validationError.message } : { document };
+    }
 
-        // Trigger AI analysis if quality is high
-        if (quality > 0.8) {
-            this.triggerAIAnalysis(savedDataPoint);
+    // Validates and scores every item in memory, writes the valid ones with
+    // one unordered bulkWrite, and reports a status per input item:
+    // { index, status: 'created' | 'duplicate' | 'invalid' | 'failed', id?, error? }
+    static async ingestBatch(items) {
+        const { results, inserted } = await this.insertBatch(items);
+        await this.deriveOrDefer(inserted);
+        return results;
+    }
+
+    // The write half of ingestBatch: resolves with the per-item results and
+    // the documents inserted, leaving the derived state to the caller
+    static async insertBatch(items) {
+        const results = new Array(items.length);
+        const validated = [];
+
+        items.forEach((item, index) => {
+            const { document, error } = this.validate(item);
+            if (error) {
+                results[index] = { index, status: 'invalid', error };
+                return;
+            }
+            validated.push({ index, document });
+        });
+
+        const storedKeys = await this.findStoredKeys(validated.map(({ document }) => document.idempotencyKey));
+        const documents = validated.filter(({ index, document }) => {
+            if (!storedKeys.has(document.idempotencyKey)) return true;
+            results[index] = { index, status: 'duplicate', id: storedKeys.get(document.idempotencyKey) };
+            return false;
+        });
+
+        const failed = new Map(); // position in documents -> write error
+        if (documents.length > 0) {
+            try {
+                await DataPoint.bulkWrite(
+                    documents.map(({ document }) => ({ insertOne: { document: document.toObject() } })),
+                    { ordered: false }
+                );
+            } catch (error) {
+                const writeErrors = [].concat(error.writeErrors || []);
+                if (writeErrors.length === 0) throw error;
+                for (const writeError of writeErrors) {
+                    failed.set(writeError.index, writeError);
+                }
+            }
+        }
+
+        // Duplicates within the batch, or stored since the lookup, are
+        // rejected by the unique index
+        const inserted = [];
+        documents.forEach(({ index, document }, position) => {
+            const writeError = failed.get(position);
+            if (writeError && isDuplicateKeyError(writeError)) {
+                results[index] = { index, status: 'duplicate' };
+            } else if (writeError) {
+                results[index] = { index, status: 'failed', error: writeError.errmsg || writeError.message };
+            } else {
+                results[index] = { index, status: 'created', id: document._id };
+                inserted.push(document);
+            }
+        });
+
+        return { results, inserted };
+    }
+
+    // The points are stored whatever happens here: a failed derived-state
+    // update is retried in the background rather than failing the request
+    static async deriveOrDefer(dataPoints) {
+        try {
+            await this.afterInsert(dataPoints);
+        } catch (error) {
+            console.error('❌ Derived state update error, retrying in background:', error.message);
+            deriveRetry.push(dataPoints);
+        }
+    }
+
+    // Derived state maintained on every insert, one round trip per store
+    // however many points were written
+    static async afterInsert(dataPoints) {
+        if (dataPoints.length === 0) return;
+
+        for (const point of dataPoints) {
+            if (point.idempotencyKey) seenKeys.add(point.idempotencyKey);
+        }
+
+        const byExperiment = new Map();
+        for (const point of dataPoints) {
+            if (!byExperiment.has(point.experimentId)) byExperiment.set(point.experimentId, []);
+            byExperiment.get(point.experimentId).push(point);
         }
 
-        return savedDataPoint;
+        await Promise.all([
+            ...[...byExperiment].map(([experimentId, points]) => this.updateDataQuality(experimentId, points)),
+            this.updateRollups(dataPoints),
+            this.updateSummaries(dataPoints)
+        ]);
+        analyticsSnapshot.recordDataPoints(dataPoints.length);
+        await responseCache.invalidate([...byExperiment.keys()].map(id => `datapoints:${id}`));
     }
 
     static calculateQuality(dataPoint) {
@@ -183,6 +499,29 @@ class DataProcessor {
         return Math.max(quality, 0);
     }
 
+    static async updateDataQuality(experimentId, dataPoints) {
+        const aggregator = DataQualityAggregator.fromPoints(dataPoints);
+        await DataQuality.updateOne(
+            { experimentId },
+            aggregator.toUpdate(),
+            { upsert: true }
+        );
+    }
+
+    static async updateRollups(dataPoints) {
+        const operations = rollupOperations(dataPoints);
+        if (operations.length > 0) {
+            await DataPointRollup.bulkWrite(operations, { ordered: false });
+        }
+    }
+
+    static async updateSummaries(dataPoints) {
+        const operations = summaryOperations(dataPoints);
+        if (operations.length > 0) {
+            await ExperimentSummary.bulkWrite(operations, { ordered: false });
+        }
+    }
+
     static async triggerAIAnalysis(dataPoint) {
         console.log(`🤖 Triggering AI analysis for data point: ${dataPoint._id}`);
         // Here you would implement actual AI/ML analysis
@@ -200,35 +539,210 @@ app.get('/', (req, res) => {
     res.sendFile(path.join(__dirname, 'index.html'));
 });
 
+// Identical reads in flight at the same time are executed once
+const readFlight = new SingleFlight();
+
+// GET responses are cached under tags that writes invalidate (response-cache.js):
+//   experiments          - any experiment listing or facet count
+//   experiment:<id>      - one experiment document
+//   datapoints:<id>      - data points, quality, rollups of one experiment
+//   papers               - paper listings and populated related papers
+const responseCache = createResponseCache();
+
+// Cached entries carry a strong ETag derived from their tag versions, so an
+// unchanged resource is answered with 304 (res.json checks If-None-Match)
+async function cachedRead(req, res, tags, fn, freshness) {
+    const key = requestKey(req);
+    const entry = await readFlight.do(key, () => responseCache.fetch(key, tags, fn, freshness));
+    if (entry.etag) res.set('ETag', entry.etag);
+    return entry;
+}
+
+// Dashboard reads that tolerate slightly old data are served stale while a
+// background refresh runs, and advertise the same windows to nginx
+// (s-maxage) and browsers (stale-while-revalidate)
+const DASHBOARD_FRESHNESS = { ttl: 60 * 1000, staleTtl: 5 * 60 * 1000 };
+
+function cacheControl(res, storedAt, { ttl, staleTtl }) {
+    const now = Date.now();
+    const fresh = Math.max(0, Math.floor((storedAt + ttl - now) / 1000));
+    const stale = Math.max(0, Math.floor((storedAt + ttl + staleTtl - now) / 1000) - fresh);
+    res.set('Cache-Control', `public, max-age=0, s-maxage=${fresh}, stale-while-revalidate=${stale}`);
+}
+
+async function staleWhileRevalidate(req, res, tags, fn, freshness = DASHBOARD_FRESHNESS) {
+    const { value, storedAt } = await cachedRead(req, res, tags, fn, freshness);
+    cacheControl(res, storedAt, freshness);
+    return value;
+}
+
+// Operational counters
+app.get('/api/metrics', (req, res) => {
+    res.json({
+        singleFlight: readFlight.stats(),
+        responseCache: responseCache.stats(),
+        ingestBuffer: ingestBuffer ? ingestBuffer.stats() : null,
+        deriveRetry: deriveRetry.stats(),
+        idempotencyFilter: seenKeys.stats()
+    });
+});
+
 // Experiments API
+function experimentFilters({ category, mission }) {
+    const filter = {};
+
+    if (category && category !== 'All Categories') {
+        filter.category = category;
+    }
+
+    if (mission && mission !== 'All Missions') {
+        // Every mission of the same family, whatever its case
+        filter.missionFamily = missionFamily(mission);
+    }
+
+    return filter;
+}
+
 app.get('/api/experiments', async (req, res) => {
     try {
-        const { category, mission, search } = req.query;
-        let filter = {};
+        const { value: { body, headers } } = await cachedRead(req, res, ['experiments'], () => listExperiments(req.query));
+        res.set(headers).json(body);
+    } catch (error) {
+        res.status(error instanceof InvalidCursorError ? 400 : 500).json({ error: error.message });
+    }
+});
 
-        if (category && category !== 'All Categories') {
-            filter.category = category;
+async function listExperiments(query) {
+    const { search, mode } = query;
+    const filter = experimentFilters(query);
+
+    if (!search) {
+        // Newest first, one page at a time
+        const page = await findPage(Experiment, filter, {
+            field: 'dateCreated',
+            direction: -1,
+            cursor: query.cursor,
+            limit: pageSize(query.limit, 50)
+        });
+        return {
+            body: page.items,
+            headers: page.nextCursor ? { 'X-Next-Cursor': page.nextCursor } : {}
+        };
+    }
+
+    if (mode !== 'fuzzy') {
+        // Ranked search served by the experiment text index
+        const experiments = await Experiment.find(
+            { ...filter, $text: { $search: search } },
+            { score: { $meta: 'textScore' } }
+        )
+            .sort({ score: { $meta: 'textScore' } })
+            .limit(50)
+            .lean();
+
+        // Fall through to fuzzy matching when an exact search finds nothing,
+        // so a typo does not send the user into repeated retries
+        if (experiments.length > 0 || mode === 'text') {
+            return {
+                body: experiments.map(experiment => ({
+                    ...experiment,
+                    highlights: highlightOffsets(experiment, search)
+                })),
+                headers: { 'X-Search-Mode': 'text' }
+            };
         }
+    }
 
-        if (mission && mission !== 'All Missions') {
-            filter.mission = { $regex: mission, $options: 'i' };
+    // Typo-tolerant search served by the in-memory trigram index, filtered
+    // while ranking so matches outside the overall top 50 are not lost
+    const matches = experimentFuzzyIndex.search(search, {
+        limit: 50,
+        filter: id => {
+            const attributes = experimentAttributes.get(id);
+            return Boolean(attributes) && Object.entries(filter).every(([field, value]) => attributes[field] === value);
         }
+    });
+    const scores = new Map(matches.map(match => [match.id, match.score]));
+    const experiments = await Experiment.find({ ...filter, id: { $in: [...scores.keys()] } })
+        .lean();
+
+    return {
+        body: experiments
+            .map(experiment => ({ ...experiment, score: scores.get(experiment.id) }))
+            .sort((a, b) => b.score - a.score),
+        headers: { 'X-Search-Mode': 'fuzzy' }
+    };
+}
+
+// Running statistics for the experiment cards on screen: ?ids=BRIC-24,RR-1
+const MAX_SUMMARY_IDS = 100;
 
-        if (search) {
-            filter.$or = [
-                { title: { $regex: search, $options: 'i' } },
-                { description: { $regex: search, $options: 'i' } },
-                { organism: { $regex: search, $options: 'i' } }
-            ];
+app.get('/api/experiments/summaries', async (req, res) => {
+    try {
+        const ids = [...new Set(String(req.query.ids || '').split(',').map(id => id.trim()).filter(Boolean))];
+        if (ids.length > MAX_SUMMARY_IDS) {
+            return res.status(400).json({ error: `At most ${MAX_SUMMARY_IDS} ids per request` });
         }
 
-        const experiments = await Experiment.find(filter).limit(50);
-        res.json(experiments);
+        const { value: summaries } = await cachedRead(req, res, ids.map(id => `datapoints:${id}`), async () => {
+            const docs = await ExperimentSummary.find({ experimentId: { $in: ids } }).lean();
+            return docs.map(formatSummary);
+        });
+
+        res.json(summaries);
+    } catch (error) {
+        res.status(500).json({ error: error.message });
+    }
+});
+
+// Filter sidebar counts. One $facet aggregation computes every facet; each
+// facet ignores its own filter so the other options keep their counts.
+app.get('/api/experiments/facets', async (req, res) => {
+    try {
+        res.json(await staleWhileRevalidate(req, res, ['experiments'], () => countFacets(req.query)));
     } catch (error) {
         res.status(500).json({ error: error.message });
     }
 });
 
+async function countFacets(query) {
+    const { search } = query;
+    const filter = experimentFilters(query);
+    const { category, missionFamily: family } = filter;
+    const countBy = (field, match = {}, extra = {}) => [
+        { $match: match },
+        { $group: { _id: field, count: { $sum: 1 }, ...extra } },
+        { $sort: { count: -1, _id: 1 } }
+    ];
+
+    const [result] = await Experiment.aggregate([
+        { $match: search ? { $text: { $search: search } } : {} },
+        {
+            $facet: {
+                category: countBy('$category', family ? { missionFamily: family } : {}),
+                // Bucketed by missionFamily, the field the mission filter
+                // matches, with the family as spelled in a mission for display
+                mission: countBy(
+                    { $ifNull: ['$missionFamily', MISSION_FAMILY] },
+                    category ? { category } : {},
+                    { name: { $first: { $arrayElemAt: [{ $split: [{ $trim: { input: '$mission' } }, ' '] }, 0] } } }
+                ),
+                organism: countBy('$organism', filter),
+                status: countBy({ $ifNull: ['$status', 'planned'] }, filter),
+                total: [{ $match: filter }, { $count: 'count' }]
+            }
+        }
+    ]);
+
+    return {
+        total: result.total.length > 0 ? result.total[0].count : 0,
+        category: result.category,
+        mission: result.mission,
+        organism: result.organism,
+        status: result.status
+    };
+}
+
 app.post('/api/experiments', async (req, res) => {
     try {
         const experimentData = req.body;
@@ -249,6 +763,10 @@ app.post('/api/experiments', async (req, res) => {
         });
 
         const saved = await experiment.save();
+        indexExperiment(saved);
+        addExperimentSuggestions(saved);
+        await responseCache.invalidate(['experiments', `experiment:${saved.id}`]);
+        analyticsSnapshot.recordExperiment(saved);
         res.status(201).json(saved);
     } catch (error) {
         if (error.code === 11000) {
@@ -261,120 +779,469 @@ app.post('/api/experiments', async (req, res) => {
 
 app.get('/api/experiments/:id', async (req, res) => {
     try {
-        const experiment = await Experiment.findOne({ id: req.params.id })
-            .populate('dataPoints');
+        const { id } = req.params;
+        const { value: experiment } = await cachedRead(req, res, [`experiment:${id}`, `datapoints:${id}`, 'papers'], () =>
+            Experiment.findOne({ id })
+                .populate('dataPoints')
+                .populate('relatedPapers', 'title summary url relevance')
+                .lean());
 
         if (!experiment) {
             return res.status(404).json({ error: 'Experiment not found' });
         }
 
+        suggestionIndex.bump(`experiment:${experiment.id}`);
         res.json(experiment);
     } catch (error) {
         res.status(500).json({ error: error.message });
     }
 });
 
+app.get('/api/experiments/:id/quality', async (req, res) => {
+    try {
+        const { value: quality } = await cachedRead(req, res, [`datapoints:${req.params.id}`], async () => {
+            const state = await DataQuality.findOne({ experimentId: req.params.id }).lean();
+            return {
+                experimentId: req.params.id,
+                ...DataQualityAggregator.fromDocument(state).summary(),
+                lastUpdated: state ? state.lastUpdated : null
+            };
+        });
+
+        res.json(quality);
+    } catch (error) {
+        res.status(500).json({ error: error.message });
+    }
+});
+
+app.get('/api/experiments/:id/summary', async (req, res) => {
+    try {
+        const { value: summary } = await cachedRead(req, res, [`datapoints:${req.params.id}`], async () => {
+            const doc = await ExperimentSummary.findOne({ experimentId: req.params.id }).lean();
+            return formatSummary(doc || { experimentId: req.params.id });
+        });
+
+        res.json(summary);
+    } catch (error) {
+        res.status(500).json({ error: error.message });
+    }
+});
+
+// Search-as-you-type suggestions served by the in-memory prefix index
+app.get('/api/suggest', (req, res) => {
+    // Node caches hold topN entries, so that is the most one query can return
+    const limit = pageSize(req.query.limit, 8, suggestionIndex.topN);
+    res.json(suggestionIndex.suggest(req.query.q || '', limit));
+});
+
 // Data Points API
+const DATA_POINT_PAGE_SIZE = 500;
+const MAX_BATCH_SIZE = 50000;
+
+// Lines that are not valid JSON become null and are reported as invalid
+function parseNdjson(text) {
+    return text.split('\n')
+        .filter(line => line.trim() !== '')
+        .map(line => {
+            try {
+                return JSON.parse(line);
+            } catch (error) {
+                return null;
+            }
+        });
+}
+
+const MAX_DATA_POINT_PAGE_SIZE = 5000;
+const DEFAULT_CHART_POINTS = 800;
+const MAX_CHART_POINTS = 5000;
+
+// Writes query results as they come off the Mongo cursor, pausing whenever
+// the socket buffer is full so memory stays flat however large the range is
+async function streamNdjson(req, res, query) {
+    const cursor = query.cursor({ batchSize: 1000 });
+    req.on('close', () => cursor.close().catch(() => {}));
+
+    res.set('Content-Type', 'application/x-ndjson');
+    for await (const doc of cursor) {
+        if (res.destroyed) break;
+        if (!res.write(JSON.stringify(doc) + '\n')) {
+            await new Promise(resolve => {
+                const resume = () => {
+                    res.off('drain', resume);
+                    res.off('close', resume);
+                    resolve();
+                };
+                res.on('drain', resume);
+                res.on('close', resume);
+            });
+        }
+    }
+    res.end();
+}
+
+// Single points are acknowledged once they are in the write-behind buffer's
+// WAL and stored in bulk by insertBatch, followed by afterInsert as a separate
+// step so a failed derived-state update never re-inserts (ingest-buffer.js).
+// ?wait=true, or INGEST_BUFFER=off, stores the point before answering with
+// the document.
+const ingestBuffer = createIngestBuffer(points => DataProcessor.insertBatch(points), {
+    derive: points => DataProcessor.afterInsert(points)
+});
+if (ingestBuffer) {
+    ingestBuffer.open().catch(error => console.error('❌ Ingest buffer WAL error:', error));
+}
+
+// Retries carrying the same Idempotency-Key header, or the same derived key,
+// are answered with 200 and the stored point instead of being stored again
 app.post('/api/data-points', async (req, res) => {
+    const point = req.get('Idempotency-Key') && req.body && typeof req.body === 'object'
+        ? { ...req.body, idempotencyKey: req.get('Idempotency-Key') }
+        : req.body;
+
+    if (!ingestBuffer || req.query.wait === 'true') {
+        try {
+            const { dataPoint, duplicate } = await DataProcessor.processRealTimeData(point);
+            return res.status(duplicate ? 200 : 201).json(dataPoint);
+        } catch (error) {
+            return res.status(400).json({ error: error.message });
+        }
+    }
+
     try {
-        const processedData = await DataProcessor.processRealTimeData(req.body);
-        res.status(201).json(processedData);
+        const { document, error } = DataProcessor.validate(point);
+        if (error) {
+            return res.status(400).json({ error });
+        }
+        // Queue the prepared document, so the timestamp default and the
+        // idempotency key reflect the time of arrival rather than of the
+        // flush or of a WAL replay
+        const prepared = document.toObject();
+        const existing = await DataProcessor.findDuplicate(prepared);
+        if (existing) {
+            return res.status(200).json({ status: 'duplicate', id: existing._id });
+        }
+        await ingestBuffer.enqueue(prepared);
+        res.status(202).json({ status: 'queued' });
     } catch (error) {
-        res.status(400).json({ error: error.message });
+        if (error instanceof BufferFullError) {
+            res.set('Retry-After', String(Math.ceil(ingestBuffer.flushIntervalMs / 1000)));
+            return res.status(429).json({ error: error.message });
+        }
+        res.status(500).json({ error: error.message });
     }
 });
 
-app.get('/api/data-points/:experimentId', async (req, res) => {
+// Bulk ingest: a JSON array, or NDJSON with one data point per line
+app.post('/api/data-points/batch',
+    express.text({ type: 'application/x-ndjson', limit: '50mb' }),
+    async (req, res) => {
+        try {
+            const items = typeof req.body === 'string' ? parseNdjson(req.body) : req.body;
+            if (!Array.isArray(items)) {
+                return res.status(400).json({ error: 'Expected a JSON array or NDJSON body' });
+            }
+            if (items.length > MAX_BATCH_SIZE) {
+                return res.status(413).json({ error: `Batches are limited to ${MAX_BATCH_SIZE} data points` });
+            }
+
+            const results = await DataProcessor.ingestBatch(items);
+            const created = results.filter(result => result.status === 'created').length;
+            const duplicates = results.filter(result => result.status === 'duplicate').length;
+            const accepted = created + duplicates;
+
+            // Duplicates count as stored, so a retried batch succeeds; 207
+            // when only some items were accepted
+            res.status(accepted === results.length ? 201 : accepted > 0 ? 207 : 400).json({
+                received: results.length,
+                created,
+                duplicates,
+                results
+            });
+        } catch (error) {
+            res.status(500).json({ error: error.message });
+        }
+    });
+
+// Streaming file import: a multipart upload with one CSV or NDJSON "file"
+// is parsed while it arrives and stored IMPORT_BATCH_SIZE rows at a time
+// (data-import.js). Pass ?socketId= to receive 'import-progress' events on
+// that socket.io connection.
+const IMPORT_BATCH_SIZE = 2000;
+
+const importUpload = multer({
+    storage: new ImportStorage({
+        ingest: points => DataProcessor.ingestBatch(points),
+        batchSize: IMPORT_BATCH_SIZE,
+        onProgress: (req, file, summary) => {
+            if (!req.query.socketId) return;
+            io.to(req.query.socketId).emit('import-progress', {
+                file: file.originalname,
+                rows: summary.rows,
+                created: summary.created,
+                duplicate: summary.duplicate,
+                invalid: summary.invalid,
+                failed: summary.failed,
+                bytes: summary.bytes,
+                totalBytes: parseInt(req.headers['content-length'], 10) || null
+            });
+        }
+    }),
+    limits: { files: 1 }
+}).single('file');
+
+app.post('/api/data-points/import', (req, res) => {
+    importUpload(req, res, error => {
+        if (error) {
+            const status = error instanceof multer.MulterError || !error.summary ? 400 : 500;
+            return res.status(status).json({ error: error.message, import: error.summary });
+        }
+        if (!req.file) {
+            return res.status(400).json({ error: 'Expected a multipart upload with a "file" field' });
+        }
+
+        const summary = req.file.import;
+        if (req.query.socketId) {
+            io.to(req.query.socketId).emit('import-complete', { file: req.file.originalname, ...summary });
+        }
+        const accepted = summary.created + summary.duplicate;
+        res.status(accepted === summary.rows ? 201 : accepted > 0 ? 207 : 400).json(summary);
+    });
+});
+
+// Rollup series for a time range, at the finest resolution whose bucket count
+// fits maxPoints unless a resolution is requested
+app.get('/api/data-points/:experimentId/rollups', async (req, res) => {
     try {
-        const dataPoints = await DataPoint.find({ 
-            experimentId: req.params.experimentId 
-        }).sort({ timestamp: -1 });
+        const to = req.query.to ? new Date(req.query.to) : new Date();
+        const from = req.query.from ? new Date(req.query.from) : new Date(to.getTime() - 7 * 24 * 60 * 60 * 1000);
+        if (isNaN(from) || isNaN(to)) {
+            return res.status(400).json({ error: 'from and to must be valid dates' });
+        }
+
+        let resolution = RESOLUTIONS.find(r => r.name === req.query.resolution);
+        if (req.query.resolution && !resolution) {
+            return res.status(400).json({ error: `resolution must be one of ${RESOLUTIONS.map(r => r.name).join(', ')}` });
+        }
+        resolution = resolution || chooseResolution(from, to, pageSize(req.query.maxPoints, 500, 5000));
+
+        const filter = {
+            experimentId: req.params.experimentId,
+            resolution: resolution.name,
+            bucket: { $gte: bucketStart(from, resolution.ms), $lte: to }
+        };
+        if (req.query.measurementType) {
+            filter.measurementType = req.query.measurementType;
+        }
 
-        res.json(dataPoints);
+        const { value: series } = await cachedRead(req, res, [`datapoints:${req.params.experimentId}`], async () => {
+            const rollups = await DataPointRollup.find(filter).sort({ bucket: 1 }).lean();
+            const byType = {};
+            for (const rollup of rollups) {
+                if (!byType[rollup.measurementType]) byType[rollup.measurementType] = [];
+                byType[rollup.measurementType].push(summarizeRollup(rollup));
+            }
+            return byType;
+        });
+
+        res.json({ experimentId: req.params.experimentId, resolution: resolution.name, from, to, series });
     } catch (error) {
         res.status(500).json({ error: error.message });
     }
 });
 
-// Papers API
-app.get('/api/papers', async (req, res) => {
+// Newest first, bounded by from/to. Pages are keyed on (timestamp, _id);
+// format=ndjson streams the whole range instead, one document per line, and
+// maxPoints returns downsampled chart series per measurementType.
+app.get('/api/data-points/:experimentId', async (req, res) => {
     try {
-        const { search, relevance } = req.query;
-        let filter = {};
+        const { from, to, measurementType, cursor, format } = req.query;
+        const filter = { experimentId: req.params.experimentId };
+
+        if (from || to) {
+            filter.timestamp = {};
+            if (from) filter.timestamp.$gte = new Date(from);
+            if (to) filter.timestamp.$lte = new Date(to);
+            if (Object.values(filter.timestamp).some(date => isNaN(date))) {
+                return res.status(400).json({ error: 'from and to must be valid dates' });
+            }
+        }
 
-        if (search) {
-            filter.$or = [
-                { title: { $regex: search, $options: 'i' } },
-                { summary: { $regex: search, $options: 'i' } }
-            ];
+        if (measurementType) {
+            filter.measurementType = measurementType;
         }
 
-        if (relevance) {
-            filter.relevance = { $gte: parseInt(relevance) };
+        if (req.query.maxPoints) {
+            const maxPoints = pageSize(req.query.maxPoints, DEFAULT_CHART_POINTS, MAX_CHART_POINTS);
+            const { value: series } = await cachedRead(req, res, [`datapoints:${req.params.experimentId}`], () =>
+                downsampleSeries(DataPoint, filter, maxPoints, { rollupModel: DataPointRollup }));
+            return res.json({ experimentId: req.params.experimentId, maxPoints, series });
         }
 
-        const papers = await Paper.find(filter)
-            .sort({ relevance: -1 })
-            .limit(20);
+        const keyset = { field: 'timestamp', direction: -1, cursor };
 
-        res.json(papers);
+        if (format === 'ndjson' || req.accepts(['json', 'application/x-ndjson']) === 'application/x-ndjson') {
+            return streamNdjson(req, res, keysetQuery(DataPoint, filter, keyset).lean());
+        }
+
+        const { value: page } = await cachedRead(req, res, [`datapoints:${req.params.experimentId}`], () =>
+            findPage(DataPoint, filter, {
+                ...keyset,
+                limit: pageSize(req.query.limit, DATA_POINT_PAGE_SIZE, MAX_DATA_POINT_PAGE_SIZE)
+            }));
+
+        if (page.nextCursor) res.set('X-Next-Cursor', page.nextCursor);
+        res.json(page.items);
     } catch (error) {
-        res.status(500).json({ error: error.message });
+        if (res.headersSent) return res.destroy(error);
+        res.status(error instanceof InvalidCursorError ? 400 : 500).json({ error: error.message });
     }
 });
 
-// Analytics API
-app.get('/api/analytics', async (req, res) => {
+// Papers API
+app.get('/api/papers', async (req, res) => {
     try {
-        const totalExperiments = await Experiment.countDocuments();
-        const activeExperiments = await Experiment.countDocuments({
-            dateCreated: { $gte: new Date(Date.now() - 30 * 24 * 60 * 60 * 1000) }
-        });
-        const dataPointsProcessed = await DataPoint.countDocuments({ processed: true });
+        const { body, headers } = await staleWhileRevalidate(req, res, ['papers'], () => listPapers(req.query));
+        res.set(headers).json(body);
+    } catch (error) {
+        res.status(error instanceof InvalidCursorError ? 400 : 500).json({ error: error.message });
+    }
+});
 
-        // Category distribution
-        const categoryDistribution = await Experiment.aggregate([
-            { $group: { _id: '$category', count: { $sum: 1 } } }
-        ]);
+async function listPapers(query) {
+    const { search, relevance, includeDuplicates } = query;
+    let filter = {};
+
+    if (includeDuplicates !== 'true') {
+        filter.duplicateOf = null;
+    }
+
+    if (search) {
+        filter.$or = [
+            { title: { $regex: search, $options: 'i' } },
+            { summary: { $regex: search, $options: 'i' } }
+        ];
+    }
+
+    if (relevance) {
+        filter.relevance = { $gte: parseInt(relevance) };
+    }
+
+    const page = await findPage(Paper, filter, {
+        field: 'relevance',
+        direction: -1,
+        cursor: query.cursor,
+        limit: pageSize(query.limit, 20)
+    });
+
+    return {
+        body: page.items,
+        headers: page.nextCursor ? { 'X-Next-Cursor': page.nextCursor } : {}
+    };
+}
 
-        // Mission distribution
-        const missionDistribution = await Experiment.aggregate([
-            { 
-                $group: { 
-                    _id: { 
-                        $cond: [
-                            { $regexMatch: { input: '$impact', regex: /Mars/i } },
-                            'Mars',
-                            { $cond: [
-                                { $regexMatch: { input: '$impact', regex: /Moon/i } },
-                                'Moon',
-                                'Other'
-                            ]}
-                        ]
-                    },
-                    count: { $sum: 1 }
+// Analytics API
+const AI_INSIGHTS = [
+    'Plant biology experiments show 23% higher success rate in long duration missions',
+    'Microgravity effects are most pronounced in first 30 days',
+    'Cell biology studies require additional radiation protection'
+];
+
+// Dashboard figures are served from memory (analytics-snapshot.js), moved
+// on writes and fully recounted on a schedule
+const analyticsSnapshot = new AnalyticsSnapshot();
+let analyticsRefresh = null;
+
+function refreshAnalytics() {
+    // Concurrent callers share one recount
+    if (!analyticsRefresh) {
+        analyticsRefresh = computeAnalytics()
+            .then(state => analyticsSnapshot.reset(state))
+            .finally(() => { analyticsRefresh = null; });
+    }
+    return analyticsRefresh;
+}
+
+async function computeAnalytics() {
+    const [[experiments], dataPointsProcessed] = await Promise.all([
+        Experiment.aggregate([
+            {
+                $facet: {
+                    total: [{ $count: 'count' }],
+                    active: [
+                        { $match: { dateCreated: { $gte: new Date(Date.now() - ACTIVE_WINDOW_MS) } } },
+                        { $count: 'count' }
+                    ],
+                    categoryDistribution: [
+                        { $group: { _id: '$category', count: { $sum: 1 } } }
+                    ],
+                    missionDistribution: [
+                        { 
+                            $group: { 
+                                _id: { 
+                                    $cond: [
+                                        { $regexMatch: { input: '$impact', regex: /Mars/i } },
+                                        'Mars',
+                                        { $cond: [
+                                            { $regexMatch: { input: '$impact', regex: /Moon/i } },
+                                            'Moon',
+                                            'Other'
+                                        ]}
+                                    ]
+                                },
+                                count: { $sum: 1 }
+                            }
+                        }
+                    ]
                 }
             }
-        ]);
+        ]),
+        DataPoint.countDocuments({ processed: true })
+    ]);
+
+    const count = facet => (facet.length > 0 ? facet[0].count : 0);
+    return {
+        totalExperiments: count(experiments.total),
+        activeExperiments: count(experiments.active),
+        dataPointsProcessed,
+        categoryDistribution: experiments.categoryDistribution,
+        missionDistribution: experiments.missionDistribution
+    };
+}
 
-        const analytics = {
-            totalExperiments,
-            activeExperiments,
-            dataPointsProcessed,
-            categoryDistribution,
-            missionDistribution,
-            aiInsights: [
-                'Plant biology experiments show 23% higher success rate in long duration missions',
-                'Microgravity effects are most pronounced in first 30 days',
-                'Cell biology studies require additional radiation protection'
-            ],
-            lastUpdated: new Date()
-        };
+// One history record per hour, however many servers are running
+async function recordAnalyticsHistory() {
+    if (!analyticsSnapshot.loaded) return;
+
+    const hour = new Date();
+    hour.setUTCMinutes(0, 0, 0);
+    await Analytics.updateOne(
+        { date: hour },
+        { $setOnInsert: { ...analyticsSnapshot.toJSON(), date: hour, aiInsights: AI_INSIGHTS } },
+        { upsert: true }
+    );
+}
 
-        // Save analytics
-        await Analytics.create(analytics);
+cron.schedule('*/5 * * * *', () => {
+    refreshAnalytics().catch(error => console.error('❌ Analytics refresh error:', error));
+});
+
+cron.schedule('0 * * * *', () => {
+    recordAnalyticsHistory().catch(error => console.error('❌ Analytics history error:', error));
+});
+
+app.get('/api/analytics', async (req, res) => {
+    try {
+        if (!analyticsSnapshot.loaded) {
+            await refreshAnalytics();
+        }
 
-        res.json(analytics);
+        // The snapshot moves with every write, so only a short shared window
+        cacheControl(res, Date.now(), { ttl: 10 * 1000, staleTtl: 60 * 1000 });
+        res.set('ETag', analyticsSnapshot.etag);
+        res.json({
+            ...analyticsSnapshot.toJSON(),
+            aiInsights: AI_INSIGHTS
+        });
     } catch (error) {
         res.status(500).json({ error: error.message });
     }
@@ -473,6 +1340,61 @@ setInterval(async () => {
     }
 }, 30000); // Every 30 seconds
 
+// In-memory search indexes, rebuilt at startup and maintained on writes
+const experimentFuzzyIndex = new TrigramIndex(['id', 'title', 'organism', 'mission']);
+const MAX_SUGGESTIONS = 20;
+const suggestionIndex = new PrefixIndex({ topN: MAX_SUGGESTIONS });
+// Fields experimentFilters matches on, per indexed experiment
+const experimentAttributes = new Map();
+
+function indexExperiment(experiment) {
+    experimentFuzzyIndex.add(experiment.id, experiment);
+    experimentAttributes.set(experiment.id, {
+        category: experiment.category,
+        missionFamily: missionFamily(experiment.mission)
+    });
+}
+
+function addExperimentSuggestions(experiment) {
+    const base = { type: 'experiment', ref: experiment.id, popularity: 50 };
+    suggestionIndex.add({ ...base, key: `experiment:${experiment.id}`, text: experiment.title });
+    suggestionIndex.add({ ...base, key: `experiment-id:${experiment.id}`, text: experiment.id });
+    if (experiment.organism) {
+        // Organisms shared by many experiments rank higher
+        suggestionIndex.bump(`organism:${experiment.organism}`, 10);
+        suggestionIndex.add({
+            key: `organism:${experiment.organism}`,
+            type: 'organism',
+            text: experiment.organism,
+            ref: experiment.organism,
+            popularity: 10
+        });
+    }
+}
+
+async function rebuildSearchIndexes() {
+    try {
+        const [experiments, papers] = await Promise.all([
+            Experiment.find({}, 'id title organism mission category').lean(),
+            Paper.find({ duplicateOf: null }, 'title url relevance').lean()
+        ]);
+        experiments.forEach(experiment => {
+            indexExperiment(experiment);
+            addExperimentSuggestions(experiment);
+        });
+        papers.forEach(paper => suggestionIndex.add({
+            key: `paper:${paper._id}`,
+            type: 'paper',
+            text: paper.title,
+            ref: paper.url,
+            popularity: paper.relevance || 0
+        }));
+        console.log(`🔎 Search indexes built for ${experiments.length} experiments and ${papers.length} papers`);
+    } catch (error) {
+        console.error('❌ Search index build error:', error);
+    }
+}
+
 // Initialize database with sample data
 async function initializeData() {
     try {
@@ -515,6 +1437,29 @@ app.use((err, req, res, next) => {
     res.status(500).json({ error: 'Something went wrong!' });
 });
 
+// Graceful shutdown: stop taking connections and store everything the
+// ingest buffer has acknowledged before exiting
+let shuttingDown = false;
+
+async function shutdown(signal) {
+    if (shuttingDown) return;
+    shuttingDown = true;
+    console.log(`🛑 ${signal} received, shutting down...`);
+
+    server.close();
+    try {
+        if (ingestBuffer) await ingestBuffer.close();
+        await deriveRetry.close();
+        await mongoose.disconnect();
+    } catch (error) {
+        console.error('❌ Shutdown error:', error);
+    }
+    process.exit(0);
+}
+
+process.on('SIGTERM', () => shutdown('SIGTERM'));
+process.on('SIGINT', () => shutdown('SIGINT'));
+
 // Start server
 server.listen(PORT, () => {
     console.log(`🚀 NASA Space Biology Dashboard Server running at http://localhost:${PORT}`);
@@ -0,0 +1,123 @@
+
+// experiment-summary.js - Running per-experiment statistics maintained at ingest
+
+// One document per experiment holds its point count, first and last reading
+// times and, per measurement type, count/sum/min/max of numericValue plus the
+// latest reading. Every write is an $inc/$min/$max upsert, so concurrent
+// ingest paths and processes never overwrite each other's totals, and the
+// dashboard reads an experiment's statistics with one indexed lookup instead
+// of scanning its data points.
+//
+// The latest reading is kept with $max on a { timestamp, value, unit }
+// subdocument: subdocuments compare field by field, so the one with the
+// newest timestamp wins regardless of arrival order.
+
+// Measurement types become field names, so only plain names are summarized
+const MEASUREMENT_KEY = /^[A-Za-z0-9_ -]+$/;
+
+function emptyTotals() {
+    return { count: 0, numericCount: 0, sum: 0, min: Infinity, max: -Infinity, latest: null };
+}
+
+// Upserts for a batch of data points, pre-combined in memory so a batch
+// issues one update per experiment
+function summaryOperations(points, now = new Date()) {
+    const experiments = new Map();
+
+    for (const point of points) {
+        let experiment = experiments.get(point.experimentId);
+        if (!experiment) {
+            experiment = { count: 0, first: null, last: null, measurements: new Map() };
+            experiments.set(point.experimentId, experiment);
+        }
+        experiment.count++;
+
+        const timestamp = point.timestamp ? new Date(point.timestamp) : null;
+        if (timestamp) {
+            if (!experiment.first || timestamp < experiment.first) experiment.first = timestamp;
+            if (!experiment.last || timestamp > experiment.last) experiment.last = timestamp;
+        }
+
+        if (!MEASUREMENT_KEY.test(point.measurementType || '')) continue;
+        let totals = experiment.measurements.get(point.measurementType);
+        if (!totals) {
+            totals = emptyTotals();
+            experiment.measurements.set(point.measurementType, totals);
+        }
+        totals.count++;
+
+        const value = point.numericValue;
+        if (typeof value === 'number' && Number.isFinite(value)) {
+            totals.numericCount++;
+            totals.sum += value;
+            totals.min = Math.min(totals.min, value);
+            totals.max = Math.max(totals.max, value);
+        }
+        if (timestamp && (!totals.latest || timestamp >= totals.latest.timestamp)) {
+            // Field order matters: $max compares timestamp first
+            totals.latest = {
+                timestamp,
+                value: typeof value === 'number' ? value : point.value,
+                unit: (typeof value === 'number' ? point.numericUnit : point.unit) ?? null
+            };
+        }
+    }
+
+    return [...experiments].map(([experimentId, experiment]) => {
+        const $inc = { count: experiment.count };
+        const $min = {};
+        const $max = {};
+        if (experiment.first) {
+            $min.firstTimestamp = experiment.first;
+            $max.lastTimestamp = experiment.last;
+        }
+
+        for (const [type, totals] of experiment.measurements) {
+            const field = `measurements.${type}`;
+            $inc[`${field}.count`] = totals.count;
+            if (totals.numericCount > 0) {
+                $inc[`${field}.numericCount`] = totals.numericCount;
+                $inc[`${field}.sum`] = totals.sum;
+                $min[`${field}.min`] = totals.min;
+                $max[`${field}.max`] = totals.max;
+            }
+            if (totals.latest) {
+                $max[`${field}.latest`] = totals.latest;
+            }
+        }
+
+        const update = { $inc, $set: { updatedAt: now } };
+        if (Object.keys($min).length > 0) update.$min = $min;
+        if (Object.keys($max).length > 0) update.$max = $max;
+
+        return { updateOne: { filter: { experimentId }, update, upsert: true } };
+    });
+}
+
+// API shape: mean derived from the running sum
+function formatSummary(doc) {
+    const measurements = {};
+    for (const [type, totals] of Object.entries(doc.measurements || {})) {
+        measurements[type] = {
+            count: totals.count || 0,
+            latest: totals.latest || null,
+            min: totals.numericCount ? totals.min : null,
+            max: totals.numericCount ? totals.max : null,
+            mean: totals.numericCount ? totals.sum / totals.numericCount : null
+        };
+    }
+
+    return {
+        experimentId: doc.experimentId,
+        count: doc.count || 0,
+        firstTimestamp: doc.firstTimestamp || null,
+        lastTimestamp: doc.lastTimestamp || null,
+        updatedAt: doc.updatedAt || null,
+        measurements
+    };
+}
+
+module.exports = {
+    formatSummary,
+    summaryOperations
+};
@@ -35,8 +35,12 @@ const ExperimentSchema = new mongoose.Schema({
     },
     mission: { 
         type: String, 
-        required: true,
-        index: true 
+        required: true
+    },
+    // Lowercased first word of mission; the dashboard filters on it
+    missionFamily: {
+        type: String,
+        index: true
     },
     duration: { 
         type: String, 
@@ -99,6 +103,10 @@ ExperimentSchema.index({ category: 1, status: 1 });
 ExperimentSchema.index({ 'aiAnalysis.predictions.successProbability': -1 });
 ExperimentSchema.index({ dateCreated: -1 });
 
+ExperimentSchema.pre('validate', function () {
+    this.missionFamily = String(this.mission || '').trim().split(' ')[0].toLowerCase();
+});
+
 // Data Point Schema for real-time experiment data
 const DataPointSchema = new mongoose.Schema({
     experimentId: { 
@@ -127,6 +135,9 @@ const DataPointSchema = new mongoose.Schema({
         type: mongoose.Schema.Types.Mixed, 
         required: true 
     },
+    // value in the canonical unit of measurementType (units.js)
+    numericValue: Number,
+    numericUnit: String,
     unit: { 
         type: String,
         required: true 
@@ -153,6 +164,8 @@ const DataPointSchema = new mongoose.Schema({
         enum: ['ISS', 'Ground', 'Simulation', 'External API']
     },
     sensor: String,
+    // Client-supplied, or experimentId|sensor|measurementType|timestamp
+    idempotencyKey: String,
     location: {
         facility: String,
         coordinates: {
@@ -185,9 +198,13 @@ const DataPointSchema = new mongoose.Schema({
 });
 
 // Indexes for time-series data queries
-DataPointSchema.index({ experimentId: 1, timestamp: -1 });
+DataPointSchema.index({ experimentId: 1, timestamp: -1, _id: -1 });
 DataPointSchema.index({ measurementType: 1, timestamp: -1 });
 DataPointSchema.index({ quality: -1, processed: 1 });
+DataPointSchema.index(
+    { idempotencyKey: 1 },
+    { unique: true, partialFilterExpression: { idempotencyKey: { $type: 'string' } } }
+);
 
 // Research Paper Schema
 const PaperSchema = new mongoose.Schema({
@@ -253,7 +270,12 @@ const PaperSchema = new mongoose.Schema({
         type: String,
         enum: ['pending', 'reviewed', 'approved', 'archived'],
         default: 'pending'
-    }
+    },
+
+    // Near-duplicate detection (see dedup_papers.py)
+    duplicateOf: { type: mongoose.Schema.Types.ObjectId, ref: 'Paper', index: { sparse: true } },
+    duplicateSimilarity: Number,
+    alternateUrls: [String]
 }, {
     timestamps: true
 });
@@ -0,0 +1,457 @@
+
+// ingest-buffer.js - Write-behind buffer for single data point inserts
+
+// Sensors that POST one reading at a time would otherwise cost one insert
+// plus the derived-state updates per reading. The buffer acknowledges a
+// point as soon as it is durably queued and writes queued points to MongoDB
+// in bulk once maxBatch points are waiting or flushIntervalMs has passed.
+//
+// Durability comes from a write-ahead log: accepted points are appended to
+// the current segment file under dir, and every append is fsync'd before
+// the callers waiting on it are acknowledged. Appends that arrive while a
+// sync is running are written and synced together (group commit), so the
+// cost of an fsync is shared by everything that queued behind it. A flush
+// seals the current segment and opens a new one; the sealed segments are
+// deleted once their points have been stored. Segments left behind by a
+// crash are loaded again by open().
+//
+// Storing a batch and updating the state derived from it are separate
+// steps. When the derive step fails the stored points are kept in memory
+// and only the derive step is retried, so a batch is never inserted twice
+// and its derived state is not lost. Failed flushes are retried with
+// exponential backoff, from flushIntervalMs up to MAX_RETRY_DELAY_MS.
+//
+// Delivery is at least once: a crash after a batch was stored but before
+// its segment was deleted hands that batch to the store again on restart,
+// which is expected to drop points it already holds (as insertBatch does
+// by idempotency key). Points stored but not yet derived when the process
+// crashes are dropped that way too, so their derived state is missed
+// until the backfill scripts are rerun.
+//
+// Memory is bounded by maxPending points (queued, waiting or being flushed);
+// beyond that enqueue throws BufferFullError and callers should back off.
+
+const fs = require('fs');
+const fsp = require('fs/promises');
+const path = require('path');
+
+const DEFAULT_MAX_BATCH = 1000;
+const DEFAULT_FLUSH_INTERVAL_MS = 250;
+const DEFAULT_MAX_PENDING = 50000;
+const MAX_RETRY_DELAY_MS = 30000;
+const SEGMENT_PATTERN = /^segment-\d+-\d+\.ndjson$/;
+
+class BufferFullError extends Error {
+    constructor(maxPending) {
+        super(`Ingest buffer is full (${maxPending} data points pending)`);
+        this.name = 'BufferFullError';
+    }
+}
+
+class IngestBuffer {
+    // store(points) writes a batch and resolves with { results, inserted },
+    // one { status } result per point and the documents inserted, as
+    // DataProcessor.insertBatch does; a rejection keeps the batch queued for
+    // the next attempt. derive(inserted) then updates the derived state; a
+    // rejection keeps the inserted documents for another derive attempt.
+    constructor(store, {
+        dir,
+        derive = async () => {},
+        maxBatch = DEFAULT_MAX_BATCH,
+        flushIntervalMs = DEFAULT_FLUSH_INTERVAL_MS,
+        maxPending = DEFAULT_MAX_PENDING
+    }) {
+        this.store = store;
+        this.derive = derive;
+        this.dir = dir;
+        this.maxBatch = maxBatch;
+        this.flushIntervalMs = flushIntervalMs;
+        this.maxPending = maxPending;
+
+        this.journal = []; // { point, resolve, reject } waiting for the WAL
+        this.pending = []; // durable points waiting for a flush
+        this.inFlight = 0; // points handed to the store
+        this.underived = []; // stored documents waiting for derive
+        this.sealed = []; // segment paths whose points are all pending or in flight
+        this.segment = null; // { path, handle, records }
+        this.segmentSeq = 0;
+        this.wal = Promise.resolve(); // serializes appends and rotations
+        this.syncScheduled = false;
+        this.flushing = null;
+        this.timer = null;
+        this.closed = false;
+        this.retryDelay = 0;
+        this.retryAt = 0;
+
+        this.accepted = 0;
+        this.rejected = 0;
+        this.batches = 0;
+        this.flushedPoints = 0;
+        this.duplicatePoints = 0;
+        this.droppedPoints = 0;
+        this.flushErrors = 0;
+        this.lastBatchSize = 0;
+        this.lastFlushMs = 0;
+        this.maxFlushMs = 0;
+        this.totalFlushMs = 0;
+    }
+
+    get size() {
+        return this.journal.length + this.pending.length + this.inFlight;
+    }
+
+    // Loads segments left by an earlier run, starts a new segment and the
+    // flush timer; the recovered points are flushed straight away. Points
+    // enqueued before it finishes are appended once the segment is open.
+    open() {
+        return this.serialize(async () => {
+            await fsp.mkdir(this.dir, { recursive: true });
+
+            const names = (await fsp.readdir(this.dir)).filter(name => SEGMENT_PATTERN.test(name)).sort();
+            for (const name of names) {
+                const file = path.join(this.dir, name);
+                this.pending.push(...parseSegment(await fsp.readFile(file, 'utf8')));
+                this.sealed.push(file);
+            }
+
+            await this.openSegment();
+            this.timer = setInterval(() => this.flush(), this.flushIntervalMs);
+            this.timer.unref();
+
+            if (this.pending.length > 0) {
+                console.log(`♻️ Recovered ${this.pending.length} queued data points from ${names.length} WAL segments`);
+                this.flush();
+            }
+        });
+    }
+
+    // Resolves once the point is in a synced WAL segment
+    enqueue(point) {
+        if (this.closed) {
+            return Promise.reject(new Error('Ingest buffer is closed'));
+        }
+        if (this.size >= this.maxPending) {
+            this.rejected++;
+            return Promise.reject(new BufferFullError(this.maxPending));
+        }
+
+        return new Promise((resolve, reject) => {
+            this.journal.push({ point, resolve, reject });
+            if (!this.syncScheduled) {
+                this.syncScheduled = true;
+                this.serialize(() => this.sync());
+            }
+        });
+    }
+
+    serialize(operation) {
+        const result = this.wal.then(operation);
+        this.wal = result.catch(() => {});
+        return result;
+    }
+
+    // Writes everything journaled so far with a single append and fsync
+    async sync() {
+        this.syncScheduled = false;
+        const entries = this.journal;
+        this.journal = [];
+        if (entries.length === 0) return;
+
+        try {
+            await this.segment.handle.write(entries.map(({ point }) => JSON.stringify(point) + '\n').join(''));
+            await this.segment.handle.datasync();
+            this.segment.records += entries.length;
+        } catch (error) {
+            entries.forEach(({ reject }) => reject(error));
+            return;
+        }
+
+        for (const { point, resolve } of entries) {
+            this.pending.push(point);
+            resolve();
+        }
+        this.accepted += entries.length;
+
+        if (this.pending.length >= this.maxBatch) this.flush();
+    }
+
+    async openSegment() {
+        const file = path.join(this.dir, `segment-${Date.now()}-${this.segmentSeq++}.ndjson`);
+        this.segment = { path: file, handle: await fsp.open(file, 'a'), records: 0 };
+        await syncDirectory(this.dir);
+    }
+
+    // Seals the current segment; called between appends, so the sealed
+    // segments hold exactly the points that are pending
+    async rotate() {
+        const previous = this.segment;
+        if (previous.records === 0) return;
+        await this.openSegment();
+        await previous.handle.close();
+        this.sealed.push(previous.path);
+    }
+
+    // One flush at a time; callers arriving during a flush share it. After
+    // a failure, flushes wait for the backoff delay unless forced.
+    flush({ force = false } = {}) {
+        if (!this.flushing && (force || Date.now() >= this.retryAt)) {
+            this.flushing = this.drain()
+                .then(() => {
+                    this.retryDelay = 0;
+                    this.retryAt = 0;
+                })
+                .catch(error => {
+                    this.flushErrors++;
+                    this.retryDelay = Math.min(this.retryDelay * 2 || this.flushIntervalMs, MAX_RETRY_DELAY_MS);
+                    this.retryAt = Date.now() + this.retryDelay;
+                    console.error(`❌ Ingest buffer flush error (retrying in ${this.retryDelay} ms):`, error.message);
+                })
+                .finally(() => {
+                    this.flushing = null;
+                });
+        }
+        return this.flushing;
+    }
+
+    async drain() {
+        if (this.underived.length > 0) {
+            await this.derive(this.underived);
+            this.underived = [];
+        }
+
+        const points = await this.serialize(async () => {
+            if (this.pending.length === 0) return [];
+            await this.rotate();
+            const taken = this.pending;
+            this.pending = [];
+            this.inFlight = taken.length;
+            return taken;
+        });
+
+        let stored = 0;
+        try {
+            while (stored < points.length) {
+                const batch = points.slice(stored, stored + this.maxBatch);
+                const started = Date.now();
+                const { results, inserted } = await this.store(batch);
+                this.recordBatch(batch.length, Date.now() - started);
+                for (const { status } of results) {
+                    if (status === 'duplicate') this.duplicatePoints++;
+                    else if (status !== 'created') this.droppedPoints++;
+                }
+                stored += batch.length;
+                this.inFlight = points.length - stored;
+
+                try {
+                    await this.derive(inserted);
+                } catch (error) {
+                    this.underived = inserted;
+                    throw error;
+                }
+            }
+        } catch (error) {
+            // Keep the unstored points, and the segments holding them, for
+            // the next flush
+            this.pending = points.slice(stored).concat(this.pending);
+            this.inFlight = 0;
+            throw error;
+        }
+
+        // Every point in the sealed segments is now stored and derived
+        const sealed = this.sealed;
+        this.sealed = [];
+        await Promise.all(sealed.map(file => fsp.unlink(file).catch(() => {})));
+    }
+
+    recordBatch(size, elapsed) {
+        this.batches++;
+        this.flushedPoints += size;
+        this.lastBatchSize = size;
+        this.lastFlushMs = elapsed;
+        this.totalFlushMs += elapsed;
+        this.maxFlushMs = Math.max(this.maxFlushMs, elapsed);
+    }
+
+    // Stops accepting points and flushes what is queued. Points that cannot
+    // be stored now stay in the WAL for the next start.
+    async close() {
+        if (this.closed) return;
+        this.closed = true;
+        clearInterval(this.timer);
+
+        await this.wal;
+        await this.flushing;
+        await this.flush({ force: true });
+
+        await this.serialize(async () => {
+            await this.segment.handle.close();
+            if (this.pending.length === 0) {
+                await fsp.unlink(this.segment.path).catch(() => {});
+            }
+        });
+    }
+
+    stats() {
+        return {
+            pending: this.size,
+            capacity: this.maxPending,
+            accepted: this.accepted,
+            rejected: this.rejected,
+            batches: this.batches,
+            flushedPoints: this.flushedPoints,
+            duplicatePoints: this.duplicatePoints,
+            droppedPoints: this.droppedPoints,
+            flushErrors: this.flushErrors,
+            underivedPoints: this.underived.length,
+            retryDelayMs: this.retryDelay,
+            lastBatchSize: this.lastBatchSize,
+            avgBatchSize: this.batches ? this.flushedPoints / this.batches : 0,
+            lastFlushMs: this.lastFlushMs,
+            avgFlushMs: this.batches ? this.totalFlushMs / this.batches : 0,
+            maxFlushMs: this.maxFlushMs,
+            walSegments: this.sealed.length + 1
+        };
+    }
+}
+
+// A crash can leave a torn last line; everything before it was acknowledged
+function parseSegment(text) {
+    const points = [];
+    for (const line of text.split('\n')) {
+        if (line.trim() === '') continue;
+        try {
+            points.push(JSON.parse(line));
+        } catch (error) {
+            console.error('❌ Skipping unreadable WAL record');
+        }
+    }
+    return points;
+}
+
+// Makes a newly created segment file itself survive a crash
+async function syncDirectory(dir) {
+    let handle;
+    try {
+        handle = await fsp.open(dir, fs.constants.O_RDONLY);
+        await handle.sync();
+    } catch (error) {
+        // Not supported on every platform; the segment data is still synced
+    } finally {
+        await handle?.close();
+    }
+}
+
+// Derive steps that failed on the synchronous ingest paths, whose points are
+// already stored. They are retried in the background with the same backoff
+// as failed flushes instead of failing the request, which the client would
+// retry only to find every point a duplicate. At most maxPending points are
+// held; beyond that the oldest are dropped and left to the backfill scripts.
+class DeriveQueue {
+    constructor(derive, {
+        initialDelayMs = 1000,
+        maxDelayMs = MAX_RETRY_DELAY_MS,
+        maxPending = DEFAULT_MAX_PENDING
+    } = {}) {
+        this.derive = derive;
+        this.initialDelayMs = initialDelayMs;
+        this.maxDelayMs = maxDelayMs;
+        this.maxPending = maxPending;
+
+        this.points = [];
+        this.timer = null;
+        this.running = null;
+        this.delay = 0;
+
+        this.deferredPoints = 0;
+        this.derivedPoints = 0;
+        this.droppedPoints = 0;
+        this.failures = 0;
+    }
+
+    push(points) {
+        this.deferredPoints += points.length;
+        this.points.push(...points);
+        this.trim();
+        this.schedule();
+    }
+
+    trim() {
+        const excess = this.points.length - this.maxPending;
+        if (excess > 0) {
+            this.points.splice(0, excess);
+            this.droppedPoints += excess;
+            console.error(`❌ Dropped derived-state updates for ${excess} stored data points`);
+        }
+    }
+
+    schedule() {
+        if (this.timer || this.running || this.points.length === 0) return;
+        this.delay = Math.min(this.delay * 2 || this.initialDelayMs, this.maxDelayMs);
+        this.timer = setTimeout(() => this.retry(), this.delay);
+        this.timer.unref();
+    }
+
+    retry() {
+        clearTimeout(this.timer);
+        this.timer = null;
+        if (this.running || this.points.length === 0) return this.running;
+
+        const points = this.points;
+        this.points = [];
+        this.running = this.derive(points)
+            .then(() => {
+                this.derivedPoints += points.length;
+                this.delay = 0;
+            })
+            .catch(error => {
+                this.failures++;
+                this.points = points.concat(this.points);
+                this.trim();
+                console.error('❌ Derived state retry error:', error.message);
+            })
+            .finally(() => {
+                this.running = null;
+                this.schedule();
+            });
+        return this.running;
+    }
+
+    // One last attempt at shutdown
+    async close() {
+        await this.running;
+        await this.retry();
+        clearTimeout(this.timer);
+        this.timer = null;
+    }
+
+    stats() {
+        return {
+            pending: this.points.length,
+            deferredPoints: this.deferredPoints,
+            derivedPoints: this.derivedPoints,
+            droppedPoints: this.droppedPoints,
+            failures: this.failures,
+            retryDelayMs: this.delay
+        };
+    }
+}
+
+// INGEST_BUFFER=off disables buffering; the other variables tune it
+function createIngestBuffer(store, {
+    enabled = process.env.INGEST_BUFFER !== 'off',
+    derive,
+    dir = process.env.INGEST_WAL_DIR || path.join(__dirname, 'data', 'ingest-wal'),
+    maxBatch = parseInt(process.env.INGEST_BATCH_SIZE, 10) || DEFAULT_MAX_BATCH,
+    flushIntervalMs = parseInt(process.env.INGEST_FLUSH_MS, 10) || DEFAULT_FLUSH_INTERVAL_MS,
+    maxPending = parseInt(process.env.INGEST_MAX_PENDING, 10) || DEFAULT_MAX_PENDING
+} = {}) {
+    if (!enabled) return null;
+    return new IngestBuffer(store, { dir, derive, maxBatch, flushIntervalMs, maxPending });
+}
+
+module.exports = {
+    BufferFullError,
+    DeriveQueue,
+    IngestBuffer,
+    createIngestBuffer
+};
@@ -44,14 +44,35 @@ db.createCollection('users');
 db.experiments.createIndex({ 'id': 1 }, { unique: true });
 db.experiments.createIndex({ 'category': 1 });
 db.experiments.createIndex({ 'status': 1 });
-db.experiments.createIndex({ 'title': 'text', 'description': 'text' });
+db.experiments.createIndex({ 'missionFamily': 1 });
+db.experiments.createIndex({ 'dateCreated': -1, '_id': -1 });
+db.experiments.createIndex({ 'category': 1, 'dateCreated': -1, '_id': -1 });
+// Deployments created before experiment_text_search have a { title, description }
+// text index; a collection can only have one, so drop it first
+db.experiments.getIndexes()
+    .filter(index => index.key._fts === 'text' && index.name !== 'experiment_text_search')
+    .forEach(index => db.experiments.dropIndex(index.name));
+db.experiments.createIndex(
+    { 'title': 'text', 'organism': 'text', 'description': 'text' },
+    { name: 'experiment_text_search', weights: { title: 10, organism: 5, description: 1 } }
+);
 
-db.datapoints.createIndex({ 'experimentId': 1, 'timestamp': -1 });
+db.datapoints.createIndex({ 'experimentId': 1, 'timestamp': -1, '_id': -1 });
 db.datapoints.createIndex({ 'measurementType': 1 });
 db.datapoints.createIndex({ 'timestamp': -1 });
+db.datapoints.createIndex(
+    { 'idempotencyKey': 1 },
+    { unique: true, partialFilterExpression: { 'idempotencyKey': { $type: 'string' } } }
+);
+db.datapointrollups.createIndex(
+    { 'experimentId': 1, 'resolution': 1, 'measurementType': 1, 'bucket': 1 },
+    { unique: true }
+);
+db.experimentsummaries.createIndex({ 'experimentId': 1 }, { unique: true });
 
 db.papers.createIndex({ 'title': 'text', 'summary': 'text' });
 db.papers.createIndex({ 'relevance': -1 });
+db.papers.createIndex({ 'duplicateOf': 1, 'relevance': -1, '_id': -1 });
 
 db.users.createIndex({ 'email': 1 }, { unique: true });
 db.users.createIndex({ 'username': 1 }, { unique: true });
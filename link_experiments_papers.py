@@ -0,0 +1,254 @@
+# link_experiments_papers.py - Blocked similarity join between experiments and papers
+#
+# Populates Experiment.relatedPapers and Paper.aiAnalysis.relatedExperiments.
+# Comparing every experiment with every paper does not scale, so documents are
+# first grouped into blocks keyed by (topic, organism term): topics come from
+# the same classifier ai-services.js uses, organism terms from the experiments'
+# organism field. Only pairs that share a block are scored, using cosine
+# similarity of sparse TF-IDF vectors through a per-block inverted index, and
+# the top-k matches are written in both directions.
+#
+# Experiments also join the "<topic>|*" block, so papers that name no known
+# organism can still be linked by topic.
+#
+# Usage:
+#   python link_experiments_papers.py              # link documents not linked yet
+#   python link_experiments_papers.py --full       # relink everything
+#   python link_experiments_papers.py --top-k 10 --min-score 0.1
+
+import argparse
+import math
+import re
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+
+from ai_features import classify_topics, get_database
+
+DEFAULT_TOP_K = 5
+DEFAULT_MIN_SCORE = 0.05
+MAX_TERMS = 40          # strongest TF-IDF terms kept per document
+MAX_QUERY_TERMS = 12    # strongest experiment terms probed against the block index
+MAX_TOPICS = 2          # topics per document used for blocking
+
+STOPWORDS = {
+    'the', 'and', 'for', 'with', 'from', 'that', 'this', 'are', 'was', 'were',
+    'how', 'into', 'their', 'its', 'has', 'have', 'can', 'may', 'which', 'during',
+    'space', 'study', 'studies', 'analysis', 'effects', 'using', 'over', 'between',
+}
+
+# Organism words too generic to make a useful block
+GENERIC_ORGANISM_TERMS = {'plants', 'plant', 'cells', 'cell', 'laboratory', 'with', 'and'}
+
+
+def tokenize(text):
+    return [t for t in re.findall(r'[a-z][a-z0-9-]{2,}', (text or '').lower()) if t not in STOPWORDS]
+
+
+def experiment_text(experiment):
+    return ' '.join(experiment.get(f) or '' for f in ('title', 'description', 'organism'))
+
+
+def paper_text(paper):
+    return ' '.join([paper.get('title') or '', paper.get('summary') or ''] + (paper.get('keywords') or []))
+
+
+class TopK:
+    """Best k (key, score) pairs, deduplicated by key."""
+
+    def __init__(self, k, keys=(), scores=()):
+        self.k = k
+        self.items = dict(zip(keys, scores))
+        self.changed = False
+
+    def offer(self, key, score):
+        if self.items.get(key, -1) >= score:
+            return
+        if len(self.items) >= self.k and key not in self.items:
+            worst = min(self.items, key=self.items.get)
+            if self.items[worst] >= score:
+                return
+            del self.items[worst]
+        self.items[key] = score
+        self.changed = True
+
+    def ranked(self):
+        return sorted(self.items.items(), key=lambda item: -item[1])
+
+
+class Document:
+    __slots__ = ('key', 'tokens', 'vector', 'query_terms', 'blocks', 'is_new', 'links')
+
+    def __init__(self, key, tokens, is_new):
+        self.key = key
+        self.tokens = tokens
+        self.vector = {}
+        self.query_terms = ()
+        self.blocks = set()
+        self.is_new = is_new
+        self.links = None
+
+
+def vectorize(documents):
+    doc_freq = Counter()
+    for doc in documents:
+        doc_freq.update(set(doc.tokens))
+
+    total = len(documents)
+    for doc in documents:
+        counts = Counter(doc.tokens)
+        weights = {
+            term: (1 + math.log(count)) * math.log((1 + total) / (1 + doc_freq[term]))
+            for term, count in counts.items()
+        }
+        top = sorted(weights.items(), key=lambda item: -item[1])[:MAX_TERMS]
+        norm = math.sqrt(sum(w * w for _, w in top)) or 1.0
+        doc.vector = {term: w / norm for term, w in top}
+        # Low-weight terms barely move the cosine but dominate the posting scans
+        doc.query_terms = [(term, w / norm) for term, w in top[:MAX_QUERY_TERMS]]
+        doc.tokens = None  # no longer needed; keeps memory flat on large corpora
+
+
+def organism_vocabulary(experiments):
+    vocab = set()
+    for experiment in experiments:
+        vocab.update(t for t in tokenize(experiment.get('organism')) if t not in GENERIC_ORGANISM_TERMS)
+    return vocab
+
+
+def block_keys(text, tokens, vocab, include_wildcard):
+    topics = [t['topic'] for t in classify_topics(text)[:MAX_TOPICS]] or ['general']
+    organisms = vocab.intersection(tokens)
+    keys = {f'{topic}|{organism}' for topic in topics for organism in organisms}
+    if include_wildcard or not organisms:
+        keys.update(f'{topic}|*' for topic in topics)
+    return keys
+
+
+class ExperimentPaperLinker:
+    def __init__(self, db, top_k=DEFAULT_TOP_K, min_score=DEFAULT_MIN_SCORE):
+        self.db = db
+        self.top_k = top_k
+        self.min_score = min_score
+
+    def load(self, full):
+        experiments = list(self.db.experiments.find(
+            {}, {'id': 1, 'title': 1, 'description': 1, 'organism': 1,
+                 'relatedPapers': 1, 'linking': 1}))
+        papers = list(self.db.papers.find(
+            {'duplicateOf': None},
+            {'title': 1, 'summary': 1, 'keywords': 1, 'aiAnalysis.relatedExperiments': 1, 'linking': 1}))
+
+        vocab = organism_vocabulary(experiments)
+        exp_docs, paper_docs = [], []
+
+        for experiment in experiments:
+            text = experiment_text(experiment)
+            doc = Document(experiment['id'], tokenize(text), full or 'linking' not in experiment)
+            doc.blocks = block_keys(text, doc.tokens, vocab, include_wildcard=True)
+            doc.links = TopK(self.top_k, *self.stored_links(
+                experiment, experiment.get('relatedPapers'), full))
+            exp_docs.append(doc)
+
+        for paper in papers:
+            text = paper_text(paper)
+            doc = Document(paper['_id'], tokenize(text), full or 'linking' not in paper)
+            doc.blocks = block_keys(text, doc.tokens, vocab, include_wildcard=False)
+            related = (paper.get('aiAnalysis') or {}).get('relatedExperiments')
+            doc.links = TopK(self.top_k, *self.stored_links(paper, related, full))
+            paper_docs.append(doc)
+
+        vectorize(exp_docs + paper_docs)
+        return exp_docs, paper_docs
+
+    @staticmethod
+    def stored_links(doc, keys, full):
+        if full or not keys:
+            return (), ()
+        return keys, (doc.get('linking') or {}).get('scores') or [0.0] * len(keys)
+
+    def join(self, exp_docs, paper_docs):
+        blocks = defaultdict(lambda: ([], []))
+        for doc in exp_docs:
+            for key in doc.blocks:
+                blocks[key][0].append(doc)
+        for doc in paper_docs:
+            for key in doc.blocks:
+                blocks[key][1].append(doc)
+
+        for block_exps, block_papers in blocks.values():
+            if not block_exps or not block_papers:
+                continue
+            if not any(d.is_new for d in block_exps) and not any(d.is_new for d in block_papers):
+                continue
+
+            all_postings = self.postings(block_papers)
+            new_postings = self.postings([p for p in block_papers if p.is_new])
+
+            for exp in block_exps:
+                # Pairs between two already-linked documents were scored before
+                postings = all_postings if exp.is_new else new_postings
+                if not postings:
+                    continue
+                scores = defaultdict(float)
+                for term, weight in exp.query_terms:
+                    for paper, paper_weight in postings.get(term, ()):
+                        scores[paper] += weight * paper_weight
+                for paper, score in scores.items():
+                    if score >= self.min_score:
+                        exp.links.offer(paper.key, score)
+                        paper.links.offer(exp.key, score)
+
+    @staticmethod
+    def postings(papers):
+        index = defaultdict(list)
+        for paper in papers:
+            for term, weight in paper.vector.items():
+                index[term].append((paper, weight))
+        return index
+
+    def save(self, exp_docs, paper_docs):
+        from pymongo import UpdateOne
+
+        now = datetime.now(timezone.utc)
+
+        def operations(docs, id_field, links_field):
+            for doc in docs:
+                if not (doc.is_new or doc.links.changed):
+                    continue
+                ranked = doc.links.ranked()
+                yield UpdateOne({id_field: doc.key}, {'$set': {
+                    links_field: [key for key, _ in ranked],
+                    'linking': {'scores': [round(s, 4) for _, s in ranked], 'linkedAt': now},
+                }})
+
+        written = 0
+        for collection, ops in (
+            (self.db.experiments, list(operations(exp_docs, 'id', 'relatedPapers'))),
+            (self.db.papers, list(operations(paper_docs, '_id', 'aiAnalysis.relatedExperiments'))),
+        ):
+            for start in range(0, len(ops), 1000):
+                collection.bulk_write(ops[start:start + 1000], ordered=False)
+            written += len(ops)
+        return written
+
+    def run(self, full=False):
+        exp_docs, paper_docs = self.load(full)
+        self.join(exp_docs, paper_docs)
+        return self.save(exp_docs, paper_docs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Link experiments to related papers')
+    parser.add_argument('--full', action='store_true', help='relink every document')
+    parser.add_argument('--top-k', type=int, default=DEFAULT_TOP_K)
+    parser.add_argument('--min-score', type=float, default=DEFAULT_MIN_SCORE)
+    args = parser.parse_args()
+
+    print('🔗 Linking experiments and papers...')
+    linker = ExperimentPaperLinker(get_database(), args.top_k, args.min_score)
+    written = linker.run(full=args.full)
+    print(f'✅ Updated links on {written} documents')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+
+// pagination.js - Keyset (cursor) pagination helpers
+
+// A page is requested with an opaque cursor holding the sort key and _id of
+// the last document already seen. The next page is then a range query that
+// starts right after that document, so with an index on (sort key, _id) every
+// page costs the same no matter how deep it is. _id breaks ties between equal
+// sort keys, which keeps the order stable across pages.
+
+const mongoose = require('mongoose');
+
+const DEFAULT_PAGE_SIZE = 20;
+const MAX_PAGE_SIZE = 100;
+
+class InvalidCursorError extends Error {
+    constructor() {
+        super('Invalid cursor');
+        this.name = 'InvalidCursorError';
+    }
+}
+
+function pageSize(value, fallback = DEFAULT_PAGE_SIZE, max = MAX_PAGE_SIZE) {
+    const size = parseInt(value, 10);
+    if (!size || size < 1) return fallback;
+    return Math.min(size, max);
+}
+
+function encodeCursor(doc, field) {
+    const value = doc[field] instanceof Date ? { $date: doc[field].toISOString() } : doc[field];
+    return Buffer.from(JSON.stringify([value, String(doc._id)])).toString('base64url');
+}
+
+function decodeCursor(cursor) {
+    let value, id;
+    try {
+        [value, id] = JSON.parse(Buffer.from(String(cursor), 'base64url').toString('utf8'));
+    } catch (error) {
+        throw new InvalidCursorError();
+    }
+    if (!mongoose.Types.ObjectId.isValid(id)) throw new InvalidCursorError();
+
+    if (value && typeof value === 'object' && value.$date) value = new Date(value.$date);
+    return { value, id: new mongoose.Types.ObjectId(id) };
+}
+
+// Filter for the documents after the cursor, for a sort of
+// { [field]: direction, _id: direction }
+function keysetFilter(field, direction, cursor) {
+    if (!cursor) return {};
+
+    const { value, id } = decodeCursor(cursor);
+    const op = direction < 0 ? '$lt' : '$gt';
+
+    // Missing sort keys sort before everything else; once the cursor is among
+    // them only _id can move it forward
+    if (value === null || value === undefined) {
+        return direction < 0
+            ? { [field]: null, _id: { [op]: id } }
+            : { $or: [{ [field]: null, _id: { [op]: id } }, { [field]: { $ne: null } }] };
+    }
+
+    const after = [{ [field]: { [op]: value } }, { [field]: value, _id: { [op]: id } }];
+    if (direction < 0) after.push({ [field]: null });
+    return { $or: after };
+}
+
+// Query for the documents after the cursor, in keyset order
+function keysetQuery(model, filter, { field, direction = -1, cursor, projection }) {
+    const after = keysetFilter(field, direction, cursor);
+    return model.find({ $and: [filter, after] }, projection)
+        .sort({ [field]: direction, _id: direction });
+}
+
+// Runs a keyset-paginated find. Returns the page and the cursor for the next
+// one, or null when there is nothing left.
+async function findPage(model, filter, { field, direction = -1, cursor, limit, projection, lean = true }) {
+    const query = keysetQuery(model, filter, { field, direction, cursor, projection })
+        .limit(limit + 1);
+
+    const docs = lean ? await query.lean() : await query;
+    const hasMore = docs.length > limit;
+    const items = hasMore ? docs.slice(0, limit) : docs;
+
+    return {
+        items,
+        nextCursor: hasMore ? encodeCursor(items[items.length - 1], field) : null
+    };
+}
+
+module.exports = {
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    InvalidCursorError,
+    pageSize,
+    encodeCursor,
+    decodeCursor,
+    keysetFilter,
+    keysetQuery,
+    findPage
+};
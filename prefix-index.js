@@ -0,0 +1,177 @@
+
+// prefix-index.js - Word-prefix trie for search-as-you-type suggestions
+
+// Every word of every suggestion is inserted into a character trie, and each
+// trie node caches the top-N entries (by popularity) found anywhere below it.
+// Completing a prefix is then a walk of prefix.length nodes plus reading the
+// cached list; nothing is scanned. Popularity only ever increases, which lets
+// the cached lists be maintained incrementally.
+
+const DEFAULT_TOP_N = 10;
+
+function tokenize(text) {
+    return String(text || '').toLowerCase().split(/[^a-z0-9-]+/).filter(Boolean);
+}
+
+class TrieNode {
+    constructor() {
+        this.children = new Map();
+        this.top = []; // entries sorted by popularity, highest first
+        this.entries = null; // entries whose word ends exactly here
+    }
+}
+
+class PrefixIndex {
+    constructor({ topN = DEFAULT_TOP_N } = {}) {
+        this.topN = topN;
+        this.root = new TrieNode();
+        this.entries = new Map(); // key -> entry
+        this.intersection = null; // { key, entries } of the last complete words
+    }
+
+    get size() {
+        return this.entries.size;
+    }
+
+    // entry: { key, type, text, ref, popularity }
+    add(entry) {
+        const existing = this.entries.get(entry.key);
+        if (existing) {
+            this.setPopularity(entry.key, Math.max(existing.popularity, entry.popularity || 0));
+            return existing;
+        }
+
+        const stored = {
+            key: entry.key,
+            type: entry.type,
+            text: entry.text,
+            ref: entry.ref,
+            popularity: entry.popularity || 0,
+            words: new Set(tokenize(entry.text))
+        };
+        this.entries.set(stored.key, stored);
+        this.intersection = null;
+
+        for (const word of stored.words) {
+            let node = this.root;
+            for (const ch of word) {
+                if (!node.children.has(ch)) node.children.set(ch, new TrieNode());
+                node = node.children.get(ch);
+                this.offer(node, stored);
+            }
+            if (!node.entries) node.entries = new Set();
+            node.entries.add(stored);
+        }
+        return stored;
+    }
+
+    setPopularity(key, popularity) {
+        const entry = this.entries.get(key);
+        if (!entry || popularity <= entry.popularity) return;
+
+        entry.popularity = popularity;
+        for (const word of entry.words) {
+            let node = this.root;
+            for (const ch of word) {
+                node = node.children.get(ch);
+                this.offer(node, entry);
+            }
+        }
+    }
+
+    bump(key, amount = 1) {
+        const entry = this.entries.get(key);
+        if (entry) this.setPopularity(key, entry.popularity + amount);
+    }
+
+    offer(node, entry) {
+        const top = node.top;
+        const index = top.indexOf(entry);
+        if (index !== -1) {
+            top.splice(index, 1);
+        } else if (top.length >= this.topN && top[top.length - 1].popularity >= entry.popularity) {
+            return;
+        }
+
+        let position = top.length;
+        while (position > 0 && top[position - 1].popularity < entry.popularity) position--;
+        top.splice(position, 0, entry);
+        if (top.length > this.topN) top.pop();
+    }
+
+    findNode(prefix) {
+        let node = this.root;
+        for (const ch of prefix) {
+            node = node.children.get(ch);
+            if (!node) return null;
+        }
+        return node;
+    }
+
+    // Entries containing every one of the complete words. Successive
+    // keystrokes only change the last, partial word, so the latest
+    // intersection is kept until an entry is added.
+    containingAll(words) {
+        const key = words.join(' ');
+        if (this.intersection && this.intersection.key === key) return this.intersection.entries;
+
+        const sets = words.map(word => this.findNode(word)?.entries);
+        let entries;
+        if (sets.some(set => !set)) {
+            entries = new Set();
+        } else {
+            // Smallest set first; stop as soon as nothing is left
+            sets.sort((a, b) => a.size - b.size);
+            entries = new Set(sets[0]);
+            for (const set of sets.slice(1)) {
+                if (entries.size === 0) break;
+                for (const entry of entries) {
+                    if (!set.has(entry)) entries.delete(entry);
+                }
+            }
+        }
+
+        this.intersection = { key, entries };
+        return entries;
+    }
+
+    // The last query word is treated as a prefix; earlier words must appear
+    // in the suggestion as complete words. limit is clamped to [1, topN].
+    suggest(query, limit = this.topN) {
+        limit = Math.max(1, Math.min(Math.floor(limit) || this.topN, this.topN));
+        const words = tokenize(query);
+        if (words.length === 0) return [];
+
+        const prefix = words.pop();
+        const node = this.findNode(prefix);
+        if (!node) return [];
+
+        let matches = node.top;
+        if (words.length > 0) {
+            const required = this.containingAll(words);
+            if (required.size === 0) return [];
+            matches = node.top.filter(entry => required.has(entry));
+
+            // The cached list may miss rarer multi-word matches; fall back to
+            // the entries containing all full words, keeping only the top
+            // `limit` that also have a word starting with the prefix
+            if (matches.length < limit) {
+                matches = [];
+                for (const entry of required) {
+                    if (matches.length >= limit && matches[matches.length - 1].popularity >= entry.popularity) continue;
+                    if (![...entry.words].some(word => word.startsWith(prefix))) continue;
+                    let position = matches.length;
+                    while (position > 0 && matches[position - 1].popularity < entry.popularity) position--;
+                    matches.splice(position, 0, entry);
+                    if (matches.length > limit) matches.pop();
+                }
+            }
+        }
+
+        return matches.slice(0, limit).map(({ type, text, ref, popularity }) => ({
+            type, text, ref, popularity
+        }));
+    }
+}
+
+module.exports = { PrefixIndex };
@@ -0,0 +1,241 @@
+
+// response-cache.js - Tag-invalidated cache for GET API responses
+
+// Every cached value is stored under its request key plus the current version
+// of each tag it depends on ("experiments", "experiment:BRIC-24",
+// "datapoints:BRIC-24", "papers"). A write bumps the versions of exactly the
+// tags it affects, so later reads compute different keys and miss; entries
+// for old versions are never read again and age out through the TTL or the
+// LRU bound. Invalidation is therefore O(tags), with no key scans.
+//
+// Two backends share the interface: an in-process LRU for single-node and
+// test runs, and Redis so several API processes share entries and versions.
+//
+// Each entry carries a strong ETag derived from its versioned key and the
+// time it was computed, so a client holding it can be answered with 304.
+//
+// Reads may opt into stale-while-revalidate: once an entry is older than its
+// ttl it is still served, up to a hard bound of ttl + staleTtl, while one
+// background refresh per key replaces it.
+
+const crypto = require('crypto');
+
+const DEFAULT_TTL_MS = 60 * 1000;
+const DEFAULT_MAX_ENTRIES = 1000;
+const REFRESH_LOCK_MS = 10 * 1000;
+
+class MemoryCacheBackend {
+    constructor({ maxEntries = DEFAULT_MAX_ENTRIES } = {}) {
+        this.maxEntries = maxEntries;
+        this.entries = new Map(); // key -> { value, expires }, oldest first
+        this.versions = new Map(); // tag -> number
+    }
+
+    async get(key) {
+        const entry = this.entries.get(key);
+        if (!entry) return undefined;
+        if (entry.expires <= Date.now()) {
+            this.entries.delete(key);
+            return undefined;
+        }
+        // Re-insert to mark as most recently used
+        this.entries.delete(key);
+        this.entries.set(key, entry);
+        return entry.value;
+    }
+
+    async set(key, value, ttl) {
+        this.entries.delete(key);
+        this.entries.set(key, { value, expires: Date.now() + ttl });
+        while (this.entries.size > this.maxEntries) {
+            this.entries.delete(this.entries.keys().next().value);
+        }
+    }
+
+    async getVersions(tags) {
+        return tags.map(tag => this.versions.get(tag) || 0);
+    }
+
+    async bumpVersions(tags) {
+        for (const tag of tags) {
+            this.versions.set(tag, (this.versions.get(tag) || 0) + 1);
+        }
+    }
+
+    // Refreshes are already deduplicated within the process
+    async acquire() {
+        return true;
+    }
+}
+
+class RedisCacheBackend {
+    constructor(client, { prefix = 'api-cache:' } = {}) {
+        this.client = client;
+        this.prefix = prefix;
+    }
+
+    async get(key) {
+        const raw = await this.client.get(this.prefix + key);
+        return raw === null ? undefined : JSON.parse(raw);
+    }
+
+    async set(key, value, ttl) {
+        await this.client.set(this.prefix + key, JSON.stringify(value), { PX: ttl });
+    }
+
+    async getVersions(tags) {
+        if (tags.length === 0) return [];
+        const versions = await this.client.mGet(tags.map(tag => `${this.prefix}tag:${tag}`));
+        return versions.map(version => Number(version) || 0);
+    }
+
+    async bumpVersions(tags) {
+        const multi = this.client.multi();
+        for (const tag of tags) multi.incr(`${this.prefix}tag:${tag}`);
+        await multi.exec();
+    }
+
+    // Short lock so only one API process refreshes a stale entry
+    async acquire(key, ttl) {
+        const result = await this.client.set(`${this.prefix}lock:${key}`, '1', { NX: true, PX: ttl });
+        return result === 'OK';
+    }
+}
+
+function createEntry(storageKey, value) {
+    const storedAt = Date.now();
+    // Without a storage key the backend is down; let Express tag the body
+    const etag = storageKey
+        ? `"${crypto.createHash('sha1').update(`${storageKey}|${storedAt}`).digest('base64url')}"`
+        : undefined;
+    return { value, storedAt, etag };
+}
+
+class ResponseCache {
+    constructor(backend, { ttl = DEFAULT_TTL_MS } = {}) {
+        this.backend = backend;
+        this.ttl = ttl;
+        this.refreshing = new Map(); // storage key -> promise
+        this.hits = 0;
+        this.staleHits = 0;
+        this.misses = 0;
+        this.errors = 0;
+    }
+
+    async versionedKey(key, tags) {
+        const versions = await this.backend.getVersions(tags);
+        return `${key}|${tags.map((tag, i) => `${tag}@${versions[i]}`).join(',')}`;
+    }
+
+    // Cached result of fn() for key, valid until ttl passes or a tag changes.
+    // The cache is best effort: if the backend fails, fn() is served directly.
+    async wrap(key, tags, fn, options = {}) {
+        const { value } = await this.fetch(key, tags, fn, options);
+        return value;
+    }
+
+    // Like wrap, but returns the whole entry: { value, storedAt, etag }
+    async fetch(key, tags, fn, { ttl = this.ttl, staleTtl = 0 } = {}) {
+        let storageKey;
+        try {
+            storageKey = await this.versionedKey(key, tags);
+            const entry = await this.backend.get(storageKey);
+            if (entry !== undefined) {
+                const age = Date.now() - entry.storedAt;
+                if (age <= ttl) {
+                    this.hits++;
+                    return entry;
+                }
+                if (age <= ttl + staleTtl) {
+                    this.staleHits++;
+                    this.refresh(storageKey, fn, ttl + staleTtl);
+                    return entry;
+                }
+            }
+        } catch (error) {
+            this.errors++;
+            console.error('❌ Response cache read error:', error.message);
+        }
+
+        this.misses++;
+        const entry = createEntry(storageKey, await fn());
+
+        if (storageKey) {
+            this.store(storageKey, entry, ttl + staleTtl);
+        }
+        return entry;
+    }
+
+    store(storageKey, entry, ttl) {
+        return this.backend.set(storageKey, entry, ttl).catch(error => {
+            this.errors++;
+            console.error('❌ Response cache write error:', error.message);
+        });
+    }
+
+    // One background refresh per key; failures keep serving the stale entry
+    // until the hard bound expires it
+    refresh(storageKey, fn, ttl) {
+        if (this.refreshing.has(storageKey)) return;
+
+        const refresh = (async () => {
+            if (!(await this.backend.acquire(storageKey, REFRESH_LOCK_MS))) return;
+            const entry = createEntry(storageKey, await fn());
+            await this.store(storageKey, entry, ttl);
+        })()
+            .catch(error => {
+                this.errors++;
+                console.error('❌ Response cache refresh error:', error.message);
+            })
+            .finally(() => this.refreshing.delete(storageKey));
+
+        this.refreshing.set(storageKey, refresh);
+    }
+
+    async invalidate(tags) {
+        try {
+            await this.backend.bumpVersions(tags);
+        } catch (error) {
+            this.errors++;
+            console.error('❌ Response cache invalidation error:', error.message);
+        }
+    }
+
+    stats() {
+        return {
+            hits: this.hits,
+            staleHits: this.staleHits,
+            misses: this.misses,
+            errors: this.errors,
+            refreshing: this.refreshing.size
+        };
+    }
+}
+
+// CACHE_BACKEND=redis uses REDIS_URL; anything else keeps entries in process
+function createResponseCache({
+    backend = process.env.CACHE_BACKEND,
+    redisUrl = process.env.REDIS_URL || 'redis://localhost:6379',
+    ttl = parseInt(process.env.CACHE_TTL_MS, 10) || DEFAULT_TTL_MS
+} = {}) {
+    if (backend === 'redis') {
+        const { createClient } = require('redis');
+        // Fail fast while disconnected so requests fall through to the database
+        const client = createClient({ url: redisUrl, disableOfflineQueue: true });
+        client.on('error', error => console.error('❌ Redis error:', error.message));
+        client.connect()
+            .then(() => console.log('🔗 Connected to Redis response cache'))
+            .catch(error => console.error('❌ Redis connection error:', error.message));
+        return new ResponseCache(new RedisCacheBackend(client), { ttl });
+    }
+
+    return new ResponseCache(new MemoryCacheBackend(), { ttl });
+}
+
+module.exports = {
+    DEFAULT_TTL_MS,
+    MemoryCacheBackend,
+    RedisCacheBackend,
+    ResponseCache,
+    createResponseCache
+};
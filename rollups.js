@@ -0,0 +1,91 @@
+
+// rollups.js - Pre-aggregated data point rollups at minute, hour and day resolution
+
+// Each rollup document holds count/sum/sumSq/min/max for one
+// (experimentId, measurementType, resolution, bucket). Buckets are UTC-aligned
+// so the incremental updates made here and the $dateTrunc backfill in
+// backfill_rollups.py land on the same documents. Only readings with a
+// numericValue are rolled up, so every bucket is in the canonical unit of its
+// measurement type (units.js).
+
+const RESOLUTIONS = [
+    { name: 'minute', ms: 60 * 1000 },
+    { name: 'hour', ms: 60 * 60 * 1000 },
+    { name: 'day', ms: 24 * 60 * 60 * 1000 }
+];
+
+const DEFAULT_MAX_BUCKETS = 500;
+
+function bucketStart(timestamp, ms) {
+    return new Date(Math.floor(new Date(timestamp).getTime() / ms) * ms);
+}
+
+// Upserts for a batch of data points, pre-combined in memory so a batch
+// touching the same bucket many times issues one update per bucket
+function rollupOperations(points) {
+    const buckets = new Map();
+
+    for (const point of points) {
+        const value = point.numericValue;
+        if (typeof value !== 'number' || !Number.isFinite(value) || !point.timestamp) {
+            continue;
+        }
+        for (const { name, ms } of RESOLUTIONS) {
+            const bucket = bucketStart(point.timestamp, ms);
+            const key = `${point.experimentId}|${point.measurementType}|${name}|${bucket.getTime()}`;
+            let totals = buckets.get(key);
+            if (!totals) {
+                totals = {
+                    filter: {
+                        experimentId: point.experimentId,
+                        measurementType: point.measurementType,
+                        resolution: name,
+                        bucket
+                    },
+                    count: 0, sum: 0, sumSq: 0, min: Infinity, max: -Infinity
+                };
+                buckets.set(key, totals);
+            }
+            totals.count++;
+            totals.sum += value;
+            totals.sumSq += value * value;
+            totals.min = Math.min(totals.min, value);
+            totals.max = Math.max(totals.max, value);
+        }
+    }
+
+    return [...buckets.values()].map(({ filter, count, sum, sumSq, min, max }) => ({
+        updateOne: {
+            filter,
+            update: {
+                $inc: { count, sum, sumSq },
+                $min: { min },
+                $max: { max }
+            },
+            upsert: true
+        }
+    }));
+}
+
+// Finest resolution whose bucket count over the range fits the budget; the
+// day rollup is the fallback for very long ranges
+function chooseResolution(from, to, maxBuckets = DEFAULT_MAX_BUCKETS) {
+    const span = Math.max(0, new Date(to).getTime() - new Date(from).getTime());
+    return RESOLUTIONS.find(({ ms }) => Math.ceil(span / ms) <= maxBuckets)
+        || RESOLUTIONS[RESOLUTIONS.length - 1];
+}
+
+function summarizeRollup({ bucket, count, sum, sumSq, min, max }) {
+    const mean = sum / count;
+    const variance = Math.max(0, sumSq / count - mean * mean);
+    return { bucket, count, mean, min, max, stdDev: Math.sqrt(variance) };
+}
+
+module.exports = {
+    RESOLUTIONS,
+    DEFAULT_MAX_BUCKETS,
+    bucketStart,
+    rollupOperations,
+    chooseResolution,
+    summarizeRollup
+};
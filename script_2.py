@@ -10,7 +10,8 @@ package_json = """{
     "seed": "node scripts/seed-database.js",
     "test": "jest",
     "lint": "eslint .",
-    "build": "npm run build:client",
+    "build": "npm run build:lexicon && npm run build:client",
+    "build:lexicon": "python build_sentiment_lexicon.py",
     "build:client": "webpack --mode production"
   },
   "keywords": [
@@ -44,6 +45,7 @@ package_json = """{
     "multer": "^1.4.5-lts.1",
     "csv-parser": "^3.0.0",
     "node-cron": "^3.0.3",
+    "redis": "^4.6.12",
     "winston": "^3.11.0"
   },
   "devDependencies": {
@@ -16,6 +16,32 @@ const mimeTypes = {
   '.ico': 'image/x-icon'
 };
 
+// Validators derived from the file's size and modification time, as nginx does
+function fileValidators(stat) {
+  return {
+    etag: `"${Math.floor(stat.mtimeMs).toString(16)}-${stat.size.toString(16)}"`,
+    lastModified: stat.mtime.toUTCString()
+  };
+}
+
+// If-None-Match takes precedence over If-Modified-Since (RFC 9110 13.2.2)
+function isNotModified(req, stat, etag) {
+  const ifNoneMatch = req.headers['if-none-match'];
+  if (ifNoneMatch) {
+    return ifNoneMatch.split(',').some((tag) => {
+      const value = tag.trim().replace(/^W\//, '');
+      return value === '*' || value === etag;
+    });
+  }
+
+  const ifModifiedSince = Date.parse(req.headers['if-modified-since']);
+  if (!isNaN(ifModifiedSince)) {
+    // HTTP dates have one-second resolution
+    return Math.floor(stat.mtimeMs / 1000) * 1000 <= ifModifiedSince;
+  }
+  return false;
+}
+
 const server = http.createServer((req, res) => {
   try {
     const urlPath = decodeURI(req.url.split('?')[0]);
@@ -34,9 +60,28 @@ const server = http.createServer((req, res) => {
 
     const ext = path.extname(filePath).toLowerCase();
     const mime = mimeTypes[ext] || 'application/octet-stream';
+    const stat = fs.statSync(filePath);
+    const { etag, lastModified } = fileValidators(stat);
+    const headers = {
+      'ETag': etag,
+      'Last-Modified': lastModified,
+      // Cache, but check back each time; unchanged files cost a 304
+      'Cache-Control': 'no-cache'
+    };
+
+    if ((req.method === 'GET' || req.method === 'HEAD') && isNotModified(req, stat, etag)) {
+      res.writeHead(304, headers);
+      res.end();
+      return;
+    }
+
+    res.writeHead(200, { ...headers, 'Content-Type': mime, 'Content-Length': stat.size });
+    if (req.method === 'HEAD') {
+      res.end();
+      return;
+    }
 
     // Stream file
-    res.writeHead(200, { 'Content-Type': mime });
     const stream = fs.createReadStream(filePath);
     stream.pipe(res);
     stream.on('error', (err) => {
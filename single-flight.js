@@ -0,0 +1,47 @@
+
+// single-flight.js - Coalesce identical concurrent reads into one execution
+
+// While a call for a key is in flight, further calls for the same key wait
+// on its promise instead of starting their own, so a burst of identical
+// requests costs one database round trip. Nothing is kept once the call
+// settles: this is not a cache, results are never older than the request.
+
+class SingleFlight {
+    constructor() {
+        this.inFlight = new Map(); // key -> promise
+        this.calls = 0;
+        this.executions = 0;
+    }
+
+    do(key, fn) {
+        this.calls++;
+
+        const pending = this.inFlight.get(key);
+        if (pending) return pending;
+
+        this.executions++;
+        const promise = Promise.resolve()
+            .then(fn)
+            .finally(() => this.inFlight.delete(key));
+        this.inFlight.set(key, promise);
+        return promise;
+    }
+
+    stats() {
+        return {
+            calls: this.calls,
+            executions: this.executions,
+            collapsed: this.calls - this.executions,
+            inFlight: this.inFlight.size
+        };
+    }
+}
+
+// Stable key for a route and its query string, independent of parameter order
+function requestKey(req) {
+    const params = Object.keys(req.query).sort()
+        .map(name => `${name}=${JSON.stringify(req.query[name])}`);
+    return `${req.method} ${req.baseUrl}${req.path}?${params.join('&')}`;
+}
+
+module.exports = { SingleFlight, requestKey };
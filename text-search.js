@@ -0,0 +1,82 @@
+
+// text-search.js - Helpers for index-backed experiment search
+
+const natural = require('natural');
+
+const tokenizer = new natural.WordTokenizer();
+
+// Must match the text index declared in init-nasa-db.js
+const EXPERIMENT_TEXT_INDEX = {
+    fields: { title: 'text', organism: 'text', description: 'text' },
+    options: {
+        name: 'experiment_text_search',
+        weights: { title: 10, organism: 5, description: 1 }
+    }
+};
+
+// Deployments created before the weighted index have a { title, description }
+// text index, and MongoDB allows only one text index per collection, so any
+// other text index is dropped before this one is created
+async function migrateTextIndex(collection, { fields, options } = EXPERIMENT_TEXT_INDEX) {
+    const indexes = await collection.indexes();
+    for (const index of indexes) {
+        if (index.key._fts === 'text' && index.name !== options.name) {
+            console.log(`🔧 Dropping old text index ${index.name}`);
+            await collection.dropIndex(index.name);
+        }
+    }
+    await collection.createIndex(fields, options);
+}
+
+// Missions are grouped into families by their first word ("ISS", "Moon",
+// ...). The family is stored lowercased in missionFamily, so the mission
+// filter is an indexed equality match; MISSION_FAMILY is the same rule as an
+// aggregation expression, for backfilling documents stored without it.
+function missionFamily(mission) {
+    return String(mission || '').trim().split(' ')[0].toLowerCase();
+}
+
+const MISSION_FAMILY = { $toLower: { $arrayElemAt: [{ $split: [{ $trim: { input: '$mission' } }, ' '] }, 0] } };
+
+function escapeRegex(value) {
+    return String(value).replace(/[.*+?^${}()|[\]\\]/g, '\\$&');
+}
+
+function queryTerms(query) {
+    return tokenizer.tokenize(String(query).toLowerCase())
+        .filter(term => term.length > 1);
+}
+
+// Character ranges of query terms in each field, for the frontend to
+// highlight. The text index matches on stems, so each term is matched as a
+// word starting with its stem ("plants" highlights "plant" and "planted").
+function highlightOffsets(doc, query, fields = ['title', 'description', 'organism']) {
+    const stems = [...new Set(queryTerms(query).map(term => natural.PorterStemmer.stem(term)))];
+    if (stems.length === 0) return {};
+
+    const pattern = new RegExp(`\\b(?:${stems.map(escapeRegex).join('|')})\\w*`, 'gi');
+    const highlights = {};
+
+    for (const field of fields) {
+        const value = doc[field];
+        if (typeof value !== 'string') continue;
+
+        const ranges = [];
+        for (const match of value.matchAll(pattern)) {
+            ranges.push([match.index, match.index + match[0].length]);
+        }
+        if (ranges.length > 0) highlights[field] = ranges;
+    }
+
+    return highlights;
+}
+
+module.exports = {
+    EXPERIMENT_TEXT_INDEX,
+    MISSION_FAMILY,
+    escapeRegex,
+    missionFamily,
+    migrateTextIndex,
+    queryTerms,
+    highlightOffsets
+};
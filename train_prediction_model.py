@@ -0,0 +1,188 @@
+# train_prediction_model.py - Offline training for the experiment outcome model
+#
+# Fits a small L2-regularised logistic regression on the features that
+# SpaceBiologyAI.extractExperimentFeatures produces and exports it as a compact
+# JSON artifact. ai-services.js loads the artifact once at startup and scores
+# requests with a single dot product, so no TensorFlow model sits on the
+# request path.
+#
+# Labels come from finished experiments: status "completed" is a success and
+# status "cancelled" a failure. Planned and active experiments are skipped.
+#
+# Usage:
+#   python train_prediction_model.py                       # read from MONGODB_URI
+#   python train_prediction_model.py --input experiments.json
+#   python train_prediction_model.py --output models/prediction-model.json
+
+import argparse
+import json
+import math
+import os
+import zlib
+from datetime import datetime, timezone
+
+from ai_features import FEATURE_NAMES, encode_features, extract_experiment_features
+
+LABELS = {'completed': 1, 'cancelled': 0}
+MIN_SAMPLES = 10
+
+
+def default_output_path():
+    model_dir = os.environ.get('AI_MODEL_PATH', 'models')
+    return os.path.join(model_dir, 'prediction-model.json')
+
+
+def load_experiments(input_path):
+    if input_path:
+        with open(input_path, encoding='utf-8') as f:
+            data = json.load(f)
+        # Accept both a mongoexport --jsonArray dump and space_biology_data.json
+        return data['experiments'] if isinstance(data, dict) else data
+
+    from ai_features import get_database
+
+    db = get_database()
+    return list(db.experiments.find(
+        {'status': {'$in': list(LABELS)}},
+        {'id': 1, 'duration': 1, 'category': 1, 'description': 1,
+         'organism': 1, 'impact': 1, 'status': 1}
+    ))
+
+
+def build_dataset(experiments):
+    rows, labels, ids = [], [], []
+    for experiment in experiments:
+        label = LABELS.get(experiment.get('status'))
+        if label is None:
+            continue
+        rows.append(encode_features(extract_experiment_features(experiment)))
+        labels.append(label)
+        ids.append(str(experiment.get('id') or experiment.get('_id')))
+    return rows, labels, ids
+
+
+def sigmoid(z):
+    if z >= 0:
+        return 1.0 / (1.0 + math.exp(-z))
+    e = math.exp(z)
+    return e / (1.0 + e)
+
+
+def standardize(rows):
+    n, d = len(rows), len(rows[0])
+    means = [sum(r[j] for r in rows) / n for j in range(d)]
+    stds = []
+    for j in range(d):
+        var = sum((r[j] - means[j]) ** 2 for r in rows) / n
+        stds.append(math.sqrt(var) or 1.0)
+    scaled = [[(r[j] - means[j]) / stds[j] for j in range(d)] for r in rows]
+    return scaled, means, stds
+
+
+def fit_logistic(rows, labels, l2=0.1, learning_rate=0.5, epochs=2000):
+    """Batch gradient descent on standardized features.
+
+    Returns coefficients and intercept in the *raw* feature space, so the
+    serving side never needs to know the scaling that was used.
+    """
+    scaled, means, stds = standardize(rows)
+    n, d = len(scaled), len(scaled[0])
+    weights = [0.0] * d
+    bias = 0.0
+
+    for _ in range(epochs):
+        grad_w = [0.0] * d
+        grad_b = 0.0
+        for x, y in zip(scaled, labels):
+            error = sigmoid(bias + sum(w * v for w, v in zip(weights, x))) - y
+            for j in range(d):
+                grad_w[j] += error * x[j]
+            grad_b += error
+        for j in range(d):
+            weights[j] -= learning_rate * (grad_w[j] / n + l2 * weights[j])
+        bias -= learning_rate * grad_b / n
+
+    coefficients = [w / s for w, s in zip(weights, stds)]
+    intercept = bias - sum(w * m / s for w, m, s in zip(weights, means, stds))
+    return coefficients, intercept
+
+
+def predict(coefficients, intercept, row):
+    return sigmoid(intercept + sum(c * v for c, v in zip(coefficients, row)))
+
+
+def evaluate(coefficients, intercept, rows, labels):
+    if not rows:
+        return None
+    log_loss, correct = 0.0, 0
+    for row, label in zip(rows, labels):
+        p = min(max(predict(coefficients, intercept, row), 1e-9), 1 - 1e-9)
+        log_loss -= label * math.log(p) + (1 - label) * math.log(1 - p)
+        correct += int((p >= 0.5) == bool(label))
+    return {
+        'logLoss': round(log_loss / len(rows), 4),
+        'accuracy': round(correct / len(rows), 4),
+        'samples': len(rows),
+    }
+
+
+def split_holdout(rows, labels, ids, fraction=0.2):
+    """Deterministic split keyed on the experiment id, so reruns are comparable."""
+    train, holdout = ([], []), ([], [])
+    for row, label, key in zip(rows, labels, ids):
+        bucket = holdout if zlib.crc32(key.encode('utf-8')) % 100 < fraction * 100 else train
+        bucket[0].append(row)
+        bucket[1].append(label)
+    return train, holdout
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Train the experiment outcome model')
+    parser.add_argument('--input', help='JSON file of experiments (defaults to MongoDB)')
+    parser.add_argument('--output', default=default_output_path())
+    parser.add_argument('--l2', type=float, default=0.1)
+    parser.add_argument('--epochs', type=int, default=2000)
+    args = parser.parse_args()
+
+    print('🤖 Training experiment outcome model...')
+    rows, labels, ids = build_dataset(load_experiments(args.input))
+
+    if len(rows) < MIN_SAMPLES or len(set(labels)) < 2:
+        print(f'❌ Need at least {MIN_SAMPLES} completed/cancelled experiments '
+              f'covering both outcomes (found {len(rows)})')
+        raise SystemExit(1)
+
+    (train_rows, train_labels), (holdout_rows, holdout_labels) = split_holdout(rows, labels, ids)
+    if len(set(train_labels)) == 2:
+        coefficients, intercept = fit_logistic(train_rows, train_labels, args.l2, epochs=args.epochs)
+        holdout_metrics = evaluate(coefficients, intercept, holdout_rows, holdout_labels)
+    else:
+        holdout_metrics = None
+
+    # Final model is refit on every labelled experiment
+    coefficients, intercept = fit_logistic(rows, labels, args.l2, epochs=args.epochs)
+
+    artifact = {
+        'format': 'logistic-regression',
+        'version': 1,
+        'features': FEATURE_NAMES,
+        'coefficients': [round(c, 6) for c in coefficients],
+        'intercept': round(intercept, 6),
+        'trainedAt': datetime.now(timezone.utc).isoformat(),
+        'metrics': {
+            'training': evaluate(coefficients, intercept, rows, labels),
+            'holdout': holdout_metrics,
+        },
+    }
+
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(artifact, f, indent=2)
+
+    print(f'✅ Model trained on {len(rows)} experiments and saved to {args.output}')
+    print(f"   Training metrics: {artifact['metrics']['training']}")
+    print(f'   Holdout metrics:  {holdout_metrics}')
+
+
+if __name__ == '__main__':
+    main()
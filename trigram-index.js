@@ -0,0 +1,160 @@
+
+// trigram-index.js - In-memory trigram index for typo-tolerant lookup
+
+// The index works on words rather than whole fields: every distinct word in
+// the indexed fields is broken into trigrams, and a query word is compared
+// only with the vocabulary words that share one of its trigrams. Lookup cost
+// therefore grows with the query length and the vocabulary, which levels off
+// quickly, rather than with the number of documents.
+
+const DEFAULT_THRESHOLD = 0.4;
+// Vocabulary matches followed per query word
+const DEFAULT_MAX_WORDS = 64;
+
+function words(text) {
+    return String(text || '').toLowerCase().split(/[^a-z0-9]+/).filter(Boolean);
+}
+
+// pg_trgm-style padding, so word starts and ends carry extra weight
+function trigrams(word) {
+    const padded = `  ${word} `;
+    const grams = new Set();
+    for (let i = 0; i < padded.length - 2; i++) {
+        grams.add(padded.slice(i, i + 3));
+    }
+    return grams;
+}
+
+class TrigramIndex {
+    constructor(fields, { threshold = DEFAULT_THRESHOLD } = {}) {
+        this.fields = fields;
+        this.threshold = threshold;
+        this.gramWords = new Map();   // trigram -> Set(word)
+        this.wordDocs = new Map();    // word -> Set(docId)
+        this.wordGramCount = new Map(); // word -> number of trigrams
+        this.docWords = new Map();    // docId -> Set(word)
+    }
+
+    get size() {
+        return this.docWords.size;
+    }
+
+    add(id, doc) {
+        this.remove(id);
+
+        const docWords = new Set();
+        for (const field of this.fields) {
+            for (const word of words(doc[field])) docWords.add(word);
+        }
+
+        for (const word of docWords) {
+            if (!this.wordDocs.has(word)) {
+                const grams = trigrams(word);
+                this.wordDocs.set(word, new Set());
+                this.wordGramCount.set(word, grams.size);
+                for (const gram of grams) {
+                    if (!this.gramWords.has(gram)) this.gramWords.set(gram, new Set());
+                    this.gramWords.get(gram).add(word);
+                }
+            }
+            this.wordDocs.get(word).add(id);
+        }
+
+        this.docWords.set(id, docWords);
+    }
+
+    remove(id) {
+        const docWords = this.docWords.get(id);
+        if (!docWords) return;
+
+        for (const word of docWords) {
+            const docs = this.wordDocs.get(word);
+            docs.delete(id);
+            if (docs.size === 0) {
+                this.wordDocs.delete(word);
+                this.wordGramCount.delete(word);
+                for (const gram of trigrams(word)) {
+                    const gramWords = this.gramWords.get(gram);
+                    gramWords.delete(word);
+                    if (gramWords.size === 0) this.gramWords.delete(gram);
+                }
+            }
+        }
+        this.docWords.delete(id);
+    }
+
+    // Vocabulary words similar to a query word. Similarity is trigram Jaccard,
+    // lifted by how much of the query word is covered so abbreviations such as
+    // "staph" still reach "staphylococcus".
+    //
+    // Either measure needs at least ceil(threshold * |query trigrams|)
+    // trigrams in common, so a match must contain one of the rarest
+    // |query trigrams| - minCommon + 1 trigrams: only those posting lists are
+    // walked, and the common trigrams are checked per candidate. At most
+    // maxWords matches are kept, the most similar first.
+    similarWords(queryWord, { maxWords = DEFAULT_MAX_WORDS } = {}) {
+        const queryGrams = [...trigrams(queryWord)];
+        const minCommon = Math.max(1, Math.ceil(this.threshold * queryGrams.length - 1e-9));
+        const postings = queryGrams
+            .map(gram => this.gramWords.get(gram))
+            .filter(Boolean)
+            .sort((a, b) => a.size - b.size);
+        if (postings.length < minCommon) return new Map();
+
+        const probe = postings.length - minCommon + 1;
+        const shared = new Map();
+        for (const gramWords of postings.slice(0, probe)) {
+            for (const word of gramWords) {
+                shared.set(word, (shared.get(word) || 0) + 1);
+            }
+        }
+        for (const gramWords of postings.slice(probe)) {
+            for (const word of shared.keys()) {
+                if (gramWords.has(word)) shared.set(word, shared.get(word) + 1);
+            }
+        }
+
+        const matches = [];
+        for (const [word, common] of shared) {
+            if (common < minCommon) continue;
+            const jaccard = common / (queryGrams.length + this.wordGramCount.get(word) - common);
+            const coverage = queryWord.length >= 4 ? 0.9 * common / queryGrams.length : 0;
+            const similarity = Math.max(jaccard, coverage);
+            if (similarity >= this.threshold) matches.push([word, similarity]);
+        }
+        return new Map(matches.sort((a, b) => b[1] - a[1]).slice(0, maxWords));
+    }
+
+    // Documents ranked by the mean, over query words, of their best word match.
+    // filter(id), when given, drops documents before ranking, so the limit
+    // counts only documents that pass it.
+    search(query, { limit = 50, threshold = this.threshold, filter = null } = {}) {
+        const queryWords = [...new Set(words(query))];
+        if (queryWords.length === 0) return [];
+
+        const docScores = new Map();
+        queryWords.forEach((queryWord, position) => {
+            for (const [word, similarity] of this.similarWords(queryWord)) {
+                for (const id of this.wordDocs.get(word)) {
+                    if (filter && !filter(id)) continue;
+                    let scores = docScores.get(id);
+                    if (!scores) {
+                        scores = new Float64Array(queryWords.length);
+                        docScores.set(id, scores);
+                    }
+                    if (similarity > scores[position]) scores[position] = similarity;
+                }
+            }
+        });
+
+        const results = [];
+        for (const [id, scores] of docScores) {
+            const score = scores.reduce((sum, value) => sum + value, 0) / queryWords.length;
+            if (score >= threshold) results.push({ id, score: Math.round(score * 1000) / 1000 });
+        }
+
+        return results.sort((a, b) => b.score - a.score).slice(0, limit);
+    }
+}
+
+module.exports = { TrigramIndex, trigrams };
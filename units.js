@@ -0,0 +1,133 @@
+
+// units.js - Canonical units and numeric values for data points
+
+// DataPoint.value is Mixed and units are free text ("°C", "degC", "K"), so
+// readings of one measurement type are not comparable as stored. At ingest
+// every numeric reading also gets numericValue, converted to the canonical
+// unit of its measurement type, and numericUnit naming that unit. Analysis
+// and aggregation read numericValue instead of parsing value each time.
+//
+// Conversions are linear: canonical = value * factor + offset. Readings
+// without a unit are taken to be in the canonical unit; readings whose unit
+// is not recognised get no numericValue rather than a wrong one. Measurement
+// types without a table keep their number and unit as sent.
+
+const CONVERSIONS = {
+    temperature: {
+        unit: '°C',
+        units: {
+            '°c': [1, 0], 'c': [1, 0], 'degc': [1, 0], 'celsius': [1, 0],
+            'k': [1, -273.15], 'kelvin': [1, -273.15],
+            '°f': [5 / 9, -160 / 9], 'f': [5 / 9, -160 / 9], 'degf': [5 / 9, -160 / 9], 'fahrenheit': [5 / 9, -160 / 9]
+        }
+    },
+    humidity: {
+        unit: '%RH',
+        units: { '%rh': [1, 0], '%': [1, 0], 'rh': [1, 0], 'percent': [1, 0] }
+    },
+    pressure: {
+        unit: 'kPa',
+        units: {
+            'kpa': [1, 0], 'pa': [0.001, 0], 'hpa': [0.1, 0], 'mbar': [0.1, 0], 'bar': [100, 0],
+            'atm': [101.325, 0], 'psi': [6.894757, 0], 'mmhg': [0.133322, 0], 'torr': [0.133322, 0]
+        }
+    },
+    radiation: {
+        unit: 'mGy',
+        units: {
+            'mgy': [1, 0], 'gy': [1000, 0], 'cgy': [10, 0], 'μgy': [0.001, 0],
+            'rad': [10, 0], 'mrad': [0.01, 0]
+        }
+    },
+    cell_count: {
+        unit: 'cells/ml',
+        units: { 'cells/ml': [1, 0], 'cells/μl': [1000, 0], 'cells/l': [0.001, 0] }
+    },
+    growth_rate: {
+        unit: 'mm/day',
+        units: {
+            'mm/day': [1, 0], 'mm/d': [1, 0], 'cm/day': [10, 0], 'μm/day': [0.001, 0],
+            'mm/h': [24, 0], 'mm/hour': [24, 0]
+        }
+    },
+    gene_expression: {
+        unit: 'fold change',
+        units: { 'foldchange': [1, 0], 'fold': [1, 0], 'fc': [1, 0], 'x': [1, 0] }
+    },
+    protein_level: {
+        unit: 'mg/ml',
+        units: {
+            'mg/ml': [1, 0], 'g/l': [1, 0], 'mg/l': [0.001, 0],
+            'μg/ml': [0.001, 0], 'ng/ml': [0.000001, 0]
+        }
+    },
+    metabolite_concentration: {
+        unit: 'μM',
+        units: { 'μm': [1, 0], 'nm': [0.001, 0], 'pm': [0.000001, 0], 'mm': [1000, 0], 'm': [1000000, 0] }
+    }
+};
+
+// Case, spacing and micro-sign variants of the same unit compare equal
+function normalizeUnit(unit) {
+    return String(unit)
+        .trim()
+        .toLowerCase()
+        .replace(/µ/g, 'μ')
+        .replace(/(^|\/)u(?=[a-z])/g, '$1μ')
+        .replace(/\s+/g, '');
+}
+
+function parseNumber(value) {
+    if (typeof value === 'number') return Number.isFinite(value) ? value : undefined;
+    if (typeof value !== 'string' || value.trim() === '') return undefined;
+    const number = Number(value.trim());
+    return Number.isFinite(number) ? number : undefined;
+}
+
+// { numericValue, numericUnit } for a reading, or null when it has no
+// comparable numeric value
+function toCanonical(measurementType, value, unit) {
+    const number = parseNumber(value);
+    if (number === undefined) return null;
+
+    const conversion = CONVERSIONS[measurementType];
+    if (!conversion) {
+        return { numericValue: number, numericUnit: unit || undefined };
+    }
+    if (unit === undefined || unit === null || String(unit).trim() === '') {
+        return { numericValue: number, numericUnit: conversion.unit };
+    }
+
+    const factors = conversion.units[normalizeUnit(unit)];
+    if (!factors) return null;
+    const [factor, offset] = factors;
+    return { numericValue: number * factor + offset, numericUnit: conversion.unit };
+}
+
+// Numeric value of a stored point, NaN when it has none. Ingest stores
+// numericValue null for readings without a comparable value; points stored
+// before numericValue existed have no field and fall back to parsing value.
+function pointValue(point) {
+    if (typeof point.numericValue === 'number') return point.numericValue;
+    if (point.numericValue === null) return NaN;
+    return parseFloat(point.value);
+}
+
+// The same rule inside aggregation pipelines: $match on HAS_NUMERIC_VALUE,
+// then read NUMERIC_VALUE
+const HAS_NUMERIC_VALUE = {
+    $or: [
+        { numericValue: { $type: 'number' } },
+        { numericValue: { $exists: false }, value: { $type: 'number' } }
+    ]
+};
+const NUMERIC_VALUE = { $ifNull: ['$numericValue', '$value'] };
+
+module.exports = {
+    CONVERSIONS,
+    HAS_NUMERIC_VALUE,
+    NUMERIC_VALUE,
+    normalizeUnit,
+    pointValue,
+    toCanonical
+};